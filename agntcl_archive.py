@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""Columnar, bit-packed archive of AGNTCL messages with random access.
+
+Messages are stored in chunks of up to CHUNK_MESSAGES. Within a chunk the
+token stream is split into columns, each zlib-compressed on its own:
+
+    structure   one symbol per token: which code tier, ( ) { } : ->,
+                string, number, reference, prefix, end of message
+    prefixes    varint per prefixed token: the prefixes in base 6
+    tier1-4     code indices packed at a fixed bit width per tier:
+                position of the code in the archive's table for its
+                tier, in the fewest bits that hold the table (6 for the
+                36 tier-1 codes)
+    refs        varint reference numbers
+    literals    length-prefixed UTF-8 strings, numbers and unknown codes
+    index       per message, its length in every other column; the
+                running sums locate a message without scanning the chunk
+
+The header carries the per-tier code tables the indices point into, so
+an archive decodes on its own: the vocabulary can grow, and the ledger
+keeps existing codes bound to the same words, without invalidating any
+archive already written. The file ends with a chunk directory and a fixed
+footer pointing at it.
+ArchiveReader maps the file and inflates only the chunk and the columns a
+request touches: one message by ID, or a single column such as every
+tier-3 code across the archive. Usage:
+
+    python agntcl_archive.py pack ARCHIVE < messages
+    python agntcl_archive.py get ARCHIVE ID ...
+    python agntcl_archive.py scan ARCHIVE TIER
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate, chain
+
+from agntcl_parser import (ARROW, LBRACE, LPAREN, RBRACE, RPAREN, STRING,
+                           WORD, parse, parse_tokens, parse_word, unparse)
+from gen_agntcl import load_assignments
+
+MAGIC = b'AGAR'
+FORMAT_VERSION = 2
+
+CHUNK_MESSAGES = 4096
+
+COLUMNS = ('structure', 'prefixes', 'tier1', 'tier2', 'tier3', 'tier4',
+           'refs', 'literals', 'index')
+(C_STRUCTURE, C_PREFIXES, C_TIER1, C_TIER2, C_TIER3, C_TIER4, C_REFS,
+ C_LITERALS, C_INDEX) = range(len(COLUMNS))
+
+# Columns measured per message in the index column, in this order.
+_INDEXED = (C_STRUCTURE, C_PREFIXES, C_REFS, C_LITERALS,
+            C_TIER1, C_TIER2, C_TIER3, C_TIER4)
+
+# Structure symbols. S_T1..S_T4 take their code from the tier columns.
+(S_T1, S_T2, S_T3, S_T4, S_RAW, S_LPAREN, S_RPAREN, S_LBRACE, S_RBRACE,
+ S_COLON, S_ARROW, S_STRING, S_NUMBER, S_REF, S_PREFIX, S_END) = range(16)
+
+PREFIXES = ('p.', 'f.', '!', '?', '~')
+
+_HEADER = struct.Struct('<4sHH4II')         # magic, version, columns,
+                                            # codes per tier, table bytes
+_CHUNK = struct.Struct('<QI')               # first message ID, messages
+_COLUMN = struct.Struct('<QII')             # offset, stored bytes, items
+_FOOTER = struct.Struct('<Q4s')             # directory offset, magic
+
+_DELIMITERS = {S_LPAREN: LPAREN, S_RPAREN: RPAREN, S_LBRACE: LBRACE,
+               S_RBRACE: RBRACE, S_ARROW: ARROW}
+
+
+def tier_layout(tiers):
+    """Per tier 1-4: (codes, bit width), from the four code lists."""
+    return [(codes, max(1, (len(codes) - 1).bit_length())) for codes in tiers]
+
+
+def tier_codes(assignments):
+    """The codes of an assign_codes() dict, as one list per tier 1-4."""
+    tiers = ([], [], [], [])
+    for code, tier in assignments.values():
+        tiers[tier - 1].append(code)
+    return tiers
+
+
+# ─── Bit packing ──────────────────────────────────────────────────────────────
+# Eight values of `width` bits fill exactly `width` bytes, so each group is
+# one little-endian int and no value straddles two groups.
+
+def pack_bits(values, width):
+    out = bytearray()
+    for i in range(0, len(values), 8):
+        group = 0
+        for k, value in enumerate(values[i:i + 8]):
+            group |= value << (k * width)
+        out += group.to_bytes(width, 'little')
+    return bytes(out)
+
+
+def unpack_bits(data, width, count):
+    mask = (1 << width) - 1
+    shifts = range(0, 8 * width, width)
+    out = []
+    extend = out.extend
+    for i in range(0, len(data), width):
+        group = int.from_bytes(data[i:i + width], 'little')
+        extend([group >> s & mask for s in shifts])
+    del out[count:]
+    return out
+
+
+def _varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, i):
+    n = shift = 0
+    while True:
+        b = data[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+
+# ─── Writing ──────────────────────────────────────────────────────────────────
+
+class ArchiveWriter:
+    """Append messages; close() writes the chunk directory and footer."""
+
+    def __init__(self, path, assignments, chunk_messages=CHUNK_MESSAGES,
+                 level=6):
+        tiers = tier_codes(assignments)
+        self.layout = tier_layout(tiers)
+        self.where = {code: (tier, i)
+                      for tier, (codes, _) in enumerate(self.layout)
+                      for i, code in enumerate(codes)}
+        self.chunk_messages = chunk_messages
+        self.level = level
+        table = zlib.compress('\n'.join(chain.from_iterable(tiers)).encode(),
+                              9)
+        self.f = open(path, 'wb')
+        self.f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(COLUMNS),
+                                  *map(len, tiers), len(table)))
+        self.f.write(table)
+        self.directory = []
+        self.count = 0
+        self._reset()
+
+    def _reset(self):
+        self.first = self.count
+        self.structure = bytearray()
+        self.prefixes = bytearray()
+        self.tiers = ([], [], [], [])
+        self.refs = bytearray()
+        self.literals = bytearray()
+        self.index = [array('I') for _ in _INDEXED]
+
+    def _sizes(self):
+        return (len(self.structure), len(self.prefixes), len(self.refs),
+                len(self.literals), *map(len, self.tiers))
+
+    def _literal(self, symbol, text):
+        raw = text.encode()
+        self.structure.append(symbol)
+        _varint(self.literals, len(raw))
+        self.literals += raw
+
+    def _node(self, node):
+        tag = node[0]
+        structure = self.structure
+        if tag == 'tok':
+            if node[1]:
+                n = 0
+                for prefix in reversed(node[1]):
+                    n = n * 6 + PREFIXES.index(prefix) + 1
+                structure.append(S_PREFIX)
+                _varint(self.prefixes, n)
+            for k, (code, n) in enumerate(node[2]):
+                if k:
+                    structure.append(S_COLON)
+                where = self.where.get(code)
+                if where is None:
+                    self._literal(S_RAW, code)
+                else:
+                    structure.append(S_T1 + where[0])
+                    self.tiers[where[0]].append(where[1])
+                if n is not None:
+                    structure.append(S_REF)
+                    _varint(self.refs, n)
+        elif tag == 'str':
+            self._literal(S_STRING, node[1])
+        elif tag == 'num':
+            self._literal(S_NUMBER, node[1])
+        elif tag in ('op', 'frame'):
+            structure.append(S_LPAREN if tag == 'op' else S_LBRACE)
+            self._node(node[1])
+            for arg in node[2]:
+                self._node(arg)
+            structure.append(S_RPAREN if tag == 'op' else S_RBRACE)
+        elif tag == 'bind':
+            self._node(node[1])
+            structure.append(S_ARROW)
+            self._node(node[2])
+        else:
+            for item in node[1]:
+                self._node(item)
+
+    def append(self, statements):
+        """Add one parsed message (or AGNTCL text); return its ID."""
+        if isinstance(statements, str):
+            statements = parse(statements)
+        before = self._sizes()
+        for statement in statements:
+            self._node(statement)
+        self.structure.append(S_END)
+        for sizes, a, b in zip(self.index, before, self._sizes()):
+            sizes.append(b - a)
+        self.count += 1
+        if self.count - self.first == self.chunk_messages:
+            self._flush()
+        return self.count - 1
+
+    def _flush(self):
+        if self.count == self.first:
+            return
+        columns = [(bytes(self.structure), len(self.structure)),
+                   (bytes(self.prefixes), len(self.prefixes))]
+        for values, (_, width) in zip(self.tiers, self.layout):
+            columns.append((pack_bits(values, width), len(values)))
+        columns += [(bytes(self.refs), len(self.refs)),
+                    (bytes(self.literals), len(self.literals)),
+                    (b''.join(a.tobytes() for a in self.index),
+                     self.count - self.first)]
+        entry = [self.first, self.count - self.first]
+        for data, items in columns:
+            blob = zlib.compress(data, self.level)
+            entry.append((self.f.tell(), len(blob), items))
+            self.f.write(blob)
+        self.directory.append(entry)
+        self._reset()
+
+    def close(self):
+        self._flush()
+        offset = self.f.tell()
+        self.f.write(struct.pack('<I', len(self.directory)))
+        for first, n, *columns in self.directory:
+            self.f.write(_CHUNK.pack(first, n))
+            for column in columns:
+                self.f.write(_COLUMN.pack(*column))
+        self.f.write(_FOOTER.pack(offset, MAGIC))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ─── Reading ──────────────────────────────────────────────────────────────────
+
+class ArchiveReader:
+    """Memory-mapped random access to an archive by message ID."""
+
+    def __init__(self, path, cache_chunks=8):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_columns, *counts, n_table = _HEADER.unpack_from(
+            self.map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path}: not an AGNTCL archive v{FORMAT_VERSION}")
+        if n_columns != len(COLUMNS):
+            raise ValueError(f"{path}: unexpected column count {n_columns}")
+        table = zlib.decompress(
+            self.map[_HEADER.size:_HEADER.size + n_table]).decode()
+        codes = table.split('\n') if table else []
+        if len(codes) != sum(counts):
+            raise ValueError(f"{path}: corrupt code table")
+        ends = list(accumulate(counts, initial=0))
+        self.layout = tier_layout([codes[a:b]
+                                   for a, b in zip(ends, ends[1:])])
+
+        offset, magic = _FOOTER.unpack_from(self.map,
+                                            len(self.map) - _FOOTER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: truncated archive (no footer)")
+        (n_chunks,) = struct.unpack_from('<I', self.map, offset)
+        pos = offset + 4
+        self.chunks = []
+        for _ in range(n_chunks):
+            first, n = _CHUNK.unpack_from(self.map, pos)
+            pos += _CHUNK.size
+            columns = []
+            for _ in COLUMNS:
+                columns.append(_COLUMN.unpack_from(self.map, pos))
+                pos += _COLUMN.size
+            self.chunks.append((first, n, columns))
+        self.firsts = [first for first, _, _ in self.chunks]
+        self.count = sum(n for _, n, _ in self.chunks)
+        self.column = lru_cache(maxsize=cache_chunks * len(COLUMNS))(
+            self._column)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _column(self, chunk, column):
+        """Inflated column of one chunk: bytes, a list of codes for the tier
+        columns, or per-message start offsets for the index."""
+        offset, stored, items = self.chunks[chunk][2][column]
+        data = zlib.decompress(memoryview(self.map)[offset:offset + stored])
+        if C_TIER1 <= column <= C_TIER4:
+            codes, width = self.layout[column - C_TIER1]
+            return [codes[i] for i in unpack_bits(data, width, items)]
+        if column == C_INDEX:
+            sizes = array('I')
+            sizes.frombytes(data)
+            return [list(accumulate(sizes[k * items:(k + 1) * items],
+                                    initial=0))
+                    for k in range(len(_INDEXED))]
+        return data
+
+    def __getitem__(self, message_id):
+        """Parsed statements of one message."""
+        if not 0 <= message_id < self.count:
+            raise IndexError(f"message {message_id} out of range")
+        chunk = bisect_right(self.firsts, message_id) - 1
+        k = message_id - self.firsts[chunk]
+        index = self.column(chunk, C_INDEX)
+        start = [starts[k] for starts in index]
+        structure = self.column(chunk, C_STRUCTURE)
+        end = index[0][k + 1] - 1                   # the S_END symbol
+        tokens = self._tokens(chunk, structure, start, end, start[4:])
+        return parse_tokens(tokens, end - start[0])
+
+    def text(self, message_id):
+        return unparse(self[message_id])
+
+    def _tokens(self, chunk, structure, start, end, cursors):
+        column = self.column
+        prefixes = column(chunk, C_PREFIXES)
+        refs = column(chunk, C_REFS)
+        literals = column(chunk, C_LITERALS)
+        p_at, r_at, l_at = start[1], start[2], start[3]
+        i = start[0]
+        base = i
+
+        def literal():
+            nonlocal l_at
+            n, l_at = _read_varint(literals, l_at)
+            l_at += n
+            return str(literals[l_at - n:l_at], 'utf-8')
+
+        while i < end:
+            pos = i - base
+            s = structure[i]
+            i += 1
+            kind = _DELIMITERS.get(s)
+            if kind is not None:
+                yield kind, None, pos
+                continue
+            if s == S_STRING:
+                yield STRING, ('str', literal()), pos
+                continue
+            if s == S_NUMBER:
+                yield WORD, ('num', literal()), pos
+                continue
+            prefix = ()
+            if s == S_PREFIX:
+                n, p_at = _read_varint(prefixes, p_at)
+                while n:
+                    n, p = divmod(n, 6)
+                    prefix += (PREFIXES[p - 1],)
+                s = structure[i]
+                i += 1
+            words = []
+            raw = False
+            while True:
+                if s == S_RAW:
+                    code = literal()
+                    raw = True
+                else:
+                    t = s - S_T1
+                    code = column(chunk, C_TIER1 + t)[cursors[t]]
+                    cursors[t] += 1
+                n = None
+                if i < end and structure[i] == S_REF:
+                    n, r_at = _read_varint(refs, r_at)
+                    i += 1
+                words.append((code, n))
+                if i < end and structure[i] == S_COLON:
+                    s = structure[i + 1]
+                    i += 2
+                    continue
+                break
+            if raw:
+                body = ':'.join(code if n is None else f"{code}{n}"
+                                for code, n in words)
+                yield WORD, parse_word(''.join(prefix), body, pos), pos
+            else:
+                yield WORD, ('tok', prefix, tuple(words)), pos
+
+    def scan_codes(self, tier):
+        """Yield every code of one tier, in archive order. Only that tier's
+        column is inflated."""
+        for chunk in range(len(self.chunks)):
+            yield from self._column(chunk, C_TIER1 + tier - 1)
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('pack', help='archive AGNTCL messages from stdin')
+    p.add_argument('archive')
+    p = sub.add_parser('get', help='print messages by ID')
+    p.add_argument('archive')
+    p.add_argument('ids', type=int, nargs='+')
+    p = sub.add_parser('scan', help='print every code of one tier')
+    p.add_argument('archive')
+    p.add_argument('tier', type=int, choices=(1, 2, 3, 4))
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        with ArchiveWriter(args.archive, load_assignments()) as writer:
+            for line in sys.stdin:
+                if line.strip():
+                    writer.append(line)
+        print(f"{writer.count} messages", file=sys.stderr)
+        return
+    with ArchiveReader(args.archive) as reader:
+        if args.command == 'get':
+            for message_id in args.ids:
+                print(reader.text(message_id))
+        else:
+            for code in reader.scan_codes(args.tier):
+                print(code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Vectorized batch encoding of interned word IDs with NumPy.
+
+Offline corpus conversion interns every word once, then encodes whole
+arrays of word IDs: a single gather maps word IDs to code IDs, a second
+gather expands code IDs to zero-padded byte slots, and one compress()
+packs the slots into a preallocated output buffer. Requires numpy.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from gen_agntcl import load_assignments
+
+SEP = ord(' ')
+
+# Tokens rendered per block; bounds the size of the temporary index arrays.
+BLOCK = 1 << 20
+
+
+class BatchEncoder:
+    """Gather/render tables compiled from an assign_codes() dict.
+
+    Word IDs index `vocab` (sorted English words unless given). Code IDs
+    index `codes` (sorted codes).
+    """
+
+    def __init__(self, assignments, vocab=None):
+        if np is None:
+            raise ImportError("agntcl_batch requires numpy")
+        self.vocab = list(vocab) if vocab is not None else sorted(assignments)
+        self.word_ids = {w: i for i, w in enumerate(self.vocab)}
+        self.codes = sorted(code for code, tier in assignments.values())
+        code_ids = {c: i for i, c in enumerate(self.codes)}
+
+        self.code_of_word = np.array(
+            [code_ids[assignments[w][0]] for w in self.vocab], dtype=np.int32)
+        # Each code plus its separator, zero-padded into one machine word,
+        # so rendering is a gather followed by dropping the zero bytes.
+        width = max(len(c) for c in self.codes) + 1
+        if width > 8:
+            raise ValueError(f"codes longer than 7 bytes: {width - 1}")
+        slot_type = np.uint32 if width <= 4 else np.uint64
+        slot_size = np.dtype(slot_type).itemsize
+        packed = b''.join((c + ' ').encode().ljust(slot_size, b'\0')
+                          for c in self.codes)
+        self.slots = np.frombuffer(packed, dtype=slot_type).copy()
+        self.code_len = np.array([len(c) for c in self.codes], dtype=np.uint8)
+
+    def intern(self, words):
+        """English words -> word ID array (KeyError on unknown words)."""
+        ids = self.word_ids
+        return np.fromiter((ids[w] for w in words), dtype=np.int32,
+                           count=len(words))
+
+    def gather(self, word_ids):
+        """Word IDs -> code IDs in one vectorized gather."""
+        return self.code_of_word[word_ids]
+
+    def rendered_size(self, code_ids):
+        """Bytes render() will produce for these code IDs."""
+        if len(code_ids) == 0:
+            return 0
+        total = 0
+        for start in range(0, len(code_ids), BLOCK):
+            block = code_ids[start:start + BLOCK]
+            total += int(self.code_len[block].sum(dtype=np.int64))
+        return total + len(code_ids) - 1
+
+    def render(self, code_ids, out=None):
+        """Render code IDs as space-separated AGNTCL into one buffer.
+
+        `out` may be a preallocated uint8 array of at least
+        rendered_size() bytes; the filled prefix is returned as a view.
+        """
+        size = self.rendered_size(code_ids)
+        if out is None:
+            out = np.empty(size, dtype=np.uint8)
+        elif len(out) < size:
+            raise ValueError(f"output buffer too small: {len(out)} < {size}")
+        n = len(code_ids)
+        slot_size = self.slots.itemsize
+        offset = 0
+        for start in range(0, n, BLOCK):
+            packed = self.slots[code_ids[start:start + BLOCK]].view(np.uint8)
+            if start + BLOCK >= n:
+                # No separator after the final token.
+                last = int(self.code_len[code_ids[n - 1]])
+                packed[len(packed) - slot_size + last] = 0
+            keep = packed != 0
+            count = int(np.count_nonzero(keep))
+            np.compress(keep, packed, out=out[offset:offset + count])
+            offset += count
+        return out[:size]
+
+    def encode(self, word_ids):
+        """Word IDs -> AGNTCL bytes."""
+        return self.render(self.gather(word_ids)).tobytes()
+
+
+def default_batch_encoder():
+    """Batch encoder for the built-in vocabulary."""
+    return BatchEncoder(load_assignments())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Table-driven classifier for the §2 "Token disambiguation" rules.
+
+A token is fed through a precomputed DFA one character at a time. While
+scanning, two positional accumulators build a perfect hash of the letters
+seen so far — base 26 over [a-z] and base 20 over CONSONANTS_20 — so when
+the DFA accepts, the code's meaning is one list index away:
+
+    tier-1   letters[a]            digits[d]
+    tier-2   tier2[26 * a + b]
+    tier-3   tier3[400 * a + 20 * b + c]
+    tier-4   tier4[length, base-20 value]   (sparse: only assigned codes)
+
+No regexes, no slicing, O(len(token)). A bare code needs no scan at all:
+every tier-1/2/3 pool code and every assigned code is classified once up
+front, and classify() tries that dict before the DFA. Compositions (`:`)
+are split by the caller; classify() sees one word at a time.
+"""
+
+import string
+import sys
+
+from gen_agntcl import (CONSONANTS_20, gen_tier2_codes, gen_tier3_codes,
+                        load_assignments)
+
+# ─── Token kinds and prefix flags ─────────────────────────────────────────────
+
+INVALID, TIER1_CODE, TIER2_CODE, TIER3_CODE, NUMBER, REFERENCE, TIER4_CODE = \
+    range(7)
+
+KIND_NAMES = ('invalid', 'tier-1', 'tier-2', 'tier-3', 'number', 'reference',
+              'tier-4')
+
+PAST, FUTURE, NEGATE, QUESTION, APPROX = 1, 2, 4, 8, 16
+
+# ─── Character classes ────────────────────────────────────────────────────────
+# 'p' and 'f' are consonants that also start the tense prefixes 'p.'/'f.'.
+
+C_OTHER, C_VOWEL, C_CONS, C_PF, C_DIGIT, C_DOT, C_MARK = range(7)
+N_CLASSES = 7
+
+CHAR_CLASS = [C_OTHER] * 128
+for _c in string.ascii_lowercase:
+    CHAR_CLASS[ord(_c)] = C_VOWEL          # vowels and 'y'
+for _c in CONSONANTS_20:
+    CHAR_CLASS[ord(_c)] = C_CONS
+CHAR_CLASS[ord('p')] = C_PF
+CHAR_CLASS[ord('f')] = C_PF
+for _c in string.digits:
+    CHAR_CLASS[ord(_c)] = C_DIGIT
+CHAR_CLASS[ord('.')] = C_DOT
+for _c in '!?~':
+    CHAR_CLASS[ord(_c)] = C_MARK
+
+MARK_FLAG = [0] * 128
+MARK_FLAG[ord('!')] = NEGATE
+MARK_FLAG[ord('?')] = QUESTION
+MARK_FLAG[ord('~')] = APPROX
+
+# Base-20 digit of each consonant; only read once the DFA has proven that
+# every letter so far was a consonant.
+CONS_INDEX = [0] * 128
+for _i, _c in enumerate(CONSONANTS_20):
+    CONS_INDEX[ord(_c)] = _i
+
+# ─── DFA ──────────────────────────────────────────────────────────────────────
+# L1V/L1C: one vowel-or-y / one consonant. L2M: two letters, not both
+# consonants (tier-2 only). L2C: two consonants (tier-2, or the start of
+# tier-3). L4: four or more consonants (tier-4). PF: a lone 'p'/'f', which
+# becomes a tense prefix if '.' follows.
+
+(S_START, S_PF, S_L1V, S_L1C, S_L2M, S_L2C, S_L3, S_L4, S_DIGIT, S_NUM,
+ S_REF, S_DEAD) = range(12)
+N_STATES = 12
+
+ACCEPT = [INVALID] * N_STATES
+for _s in (S_PF, S_L1V, S_L1C, S_DIGIT):
+    ACCEPT[_s] = TIER1_CODE
+ACCEPT[S_L2M] = TIER2_CODE
+ACCEPT[S_L2C] = TIER2_CODE
+ACCEPT[S_L3] = TIER3_CODE
+ACCEPT[S_L4] = TIER4_CODE
+ACCEPT[S_NUM] = NUMBER
+ACCEPT[S_REF] = REFERENCE
+
+# What a transition does besides changing state.
+A_NONE, A_LETTER, A_DIGIT, A_MARK, A_TENSE = range(5)
+
+
+def _build_dfa():
+    trans = [S_DEAD] * (N_STATES * N_CLASSES)
+    action = [A_NONE] * (N_STATES * N_CLASSES)
+
+    def edge(state, classes, target, act):
+        for cls in classes:
+            trans[state * N_CLASSES + cls] = target
+            action[state * N_CLASSES + cls] = act
+
+    consonant = (C_CONS, C_PF)
+    letter = (C_VOWEL, C_CONS, C_PF)
+
+    # Prefixes peel off first and loop back to the start state.
+    edge(S_START, (C_MARK,), S_START, A_MARK)
+    edge(S_PF, (C_DOT,), S_START, A_TENSE)
+
+    edge(S_START, (C_PF,), S_PF, A_LETTER)
+    edge(S_START, (C_VOWEL,), S_L1V, A_LETTER)
+    edge(S_START, (C_CONS,), S_L1C, A_LETTER)
+    edge(S_L1V, letter, S_L2M, A_LETTER)
+    for state in (S_PF, S_L1C):
+        edge(state, (C_VOWEL,), S_L2M, A_LETTER)
+        edge(state, consonant, S_L2C, A_LETTER)
+    edge(S_L2C, consonant, S_L3, A_LETTER)
+    edge(S_L3, consonant, S_L4, A_LETTER)
+    edge(S_L4, consonant, S_L4, A_LETTER)
+
+    # Digits: a number on their own, a reference after a code.
+    edge(S_START, (C_DIGIT,), S_DIGIT, A_DIGIT)
+    edge(S_DIGIT, (C_DIGIT,), S_NUM, A_DIGIT)
+    edge(S_NUM, (C_DIGIT,), S_NUM, A_DIGIT)
+    for state in (S_PF, S_L1V, S_L1C, S_L2M, S_L2C, S_L3, S_L4, S_REF):
+        edge(state, (C_DIGIT,), S_REF, A_DIGIT)
+    return trans, action
+
+
+TRANS, ACTION = _build_dfa()
+
+
+# ─── Classifier ───────────────────────────────────────────────────────────────
+
+class TokenClassifier:
+    """Classify and resolve AGNTCL tokens against one code assignment."""
+
+    def __init__(self, assignments):
+        by_code = {code: english
+                   for english, (code, tier) in assignments.items()}
+        self.letters = [by_code.get(c) for c in string.ascii_lowercase]
+        self.digits = [by_code.get(c) for c in string.digits]
+        # Tier-2 slots for excluded English words stay INVALID.
+        self.tier2_valid = bytearray(26 * 26)
+        self.tier2 = [None] * (26 * 26)
+        for code in gen_tier2_codes():
+            i = 26 * (ord(code[0]) - 97) + ord(code[1]) - 97
+            self.tier2_valid[i] = 1
+            self.tier2[i] = by_code.get(code)
+        self.tier3 = [by_code.get(code) for code in gen_tier3_codes()]
+        self.tier4 = {}
+        for english, (code, tier) in assignments.items():
+            if tier == 4:
+                a20 = 0
+                for ch in code:
+                    a20 = a20 * 20 + CONS_INDEX[ord(ch)]
+                self.tier4[len(code), a20] = english
+        # Bare codes are most of any message: resolve every code in the
+        # pools (and every assigned code) once, so classify() answers them
+        # with one dict probe and only walks the DFA for the rest.
+        pool = set(by_code)
+        pool.update(string.ascii_lowercase, string.digits, gen_tier2_codes(),
+                    gen_tier3_codes())
+        self.bare = {code: self._scan(code) for code in pool}
+
+    def _base(self, n_letters, a26, a20):
+        if n_letters == 1:
+            return self.letters[a26]
+        if n_letters == 2:
+            return self.tier2[a26]
+        if n_letters == 3:
+            return self.tier3[a20]
+        return self.tier4.get((n_letters, a20))
+
+    def classify(self, token):
+        """Return (kind, prefix_flags, english, n).
+
+        english is the resolved word (None if the code is unassigned);
+        n is the value of a number or the index of a reference.
+        """
+        hit = self.bare.get(token)
+        if hit is not None:
+            return hit
+        return self._scan(token)
+
+    def _scan(self, token):
+        trans = TRANS
+        action = ACTION
+        char_class = CHAR_CLASS
+        state = S_START
+        flags = a26 = a20 = n = n_letters = 0
+        for ch in token:
+            o = ord(ch)
+            i = state * N_CLASSES + (char_class[o] if o < 128 else C_OTHER)
+            state = trans[i]
+            act = action[i]
+            if act == A_LETTER:
+                a26 = a26 * 26 + o - 97
+                a20 = a20 * 20 + CONS_INDEX[o]
+                n_letters += 1
+            elif act == A_DIGIT:
+                n = n * 10 + o - 48
+            elif act == A_MARK:
+                flags |= MARK_FLAG[o]
+            elif act == A_TENSE:
+                flags |= PAST if a26 == 15 else FUTURE
+                a26 = a20 = n_letters = 0
+            if state == S_DEAD:
+                return INVALID, flags, None, 0
+
+        kind = ACCEPT[state]
+        if kind == TIER1_CODE:
+            if state == S_DIGIT:
+                return kind, flags, self.digits[n], 0
+            return kind, flags, self.letters[a26], 0
+        if kind == TIER2_CODE:
+            if not self.tier2_valid[a26]:
+                return INVALID, flags, None, 0
+            return kind, flags, self.tier2[a26], 0
+        if kind == TIER3_CODE:
+            return kind, flags, self.tier3[a20], 0
+        if kind == TIER4_CODE:
+            return kind, flags, self.tier4.get((n_letters, a20)), 0
+        if kind == NUMBER:
+            return kind, flags, None, n
+        if kind == REFERENCE:
+            return kind, flags, self._base(n_letters, a26, a20), n
+        return INVALID, flags, None, 0
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    classifier = TokenClassifier(load_assignments())
+    for token in sys.argv[1:]:
+        kind, flags, english, n = classifier.classify(token)
+        print(f"{token}: {KIND_NAMES[kind]} flags={flags} "
+              f"english={english} n={n}")
+
+
+if __name__ == '__main__':
+    main()
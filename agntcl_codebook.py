@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Versioned binary AGNTCL codebook, read zero-copy through mmap.
+
+Layout (all integers little-endian uint32 unless noted):
+
+    header       magic 'AGCB', u16 version, u16 reserved, n entries,
+                 n buckets, then the byte offset of every section below
+    word_off     n+1 offsets into word_blob   (entries sorted by word)
+    code_off     n+1 offsets into code_blob   (same entry order)
+    word_seeds   n_buckets displacements  \\  minimal perfect hash
+    word_slots   n entry indices           /  word -> entry
+    code_seeds   n_buckets displacements  \\  minimal perfect hash
+    code_slots   n entry indices           /  code -> entry
+    tiers        n bytes
+    word_blob    UTF-8 words, concatenated
+    code_blob    ASCII codes, concatenated
+
+A lookup hashes the key once, reads one seed and one slot, and compares
+the key against a slice of the mapped blob. Nothing is copied onto the
+heap until the caller asks for a str.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from zlib import adler32, crc32
+
+MAGIC = b'AGCB'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sHHII9I')
+
+# Keys per perfect-hash bucket, on average.
+_BUCKET_LOAD = 4
+
+
+# ─── Perfect hashing ──────────────────────────────────────────────────────────
+# Hash-and-displace: a key's bucket is chosen by one hash; each bucket
+# stores a displacement d = d0 * n + d1 that sends all of its keys to free
+# slots via (f1 + d0 * f2 + d1) mod n.
+
+def _hash(key):
+    return crc32(key), crc32(key, 0x9e3779b9), adler32(key)
+
+
+def _build_phf(keys):
+    """Return (seeds, slots) so that key i lands in a slot holding i."""
+    n = len(keys)
+    n_buckets = max(1, n // _BUCKET_LOAD)
+    buckets = [[] for _ in range(n_buckets)]
+    for i, key in enumerate(keys):
+        g, f1, f2 = _hash(key)
+        buckets[g % n_buckets].append((i, f1, f2))
+
+    seeds = [0] * n_buckets
+    slots = [None] * n
+    for b in sorted(range(n_buckets), key=lambda b: -len(buckets[b])):
+        items = buckets[b]
+        if not items:
+            break
+        d = 0
+        while True:
+            d0, d1 = divmod(d, n)
+            pos = [(f1 + d0 * f2 + d1) % n for _, f1, f2 in items]
+            if (len(set(pos)) == len(pos)
+                    and all(slots[p] is None for p in pos)):
+                break
+            d += 1
+        seeds[b] = d
+        for (i, _, _), p in zip(items, pos):
+            slots[p] = i
+    return seeds, slots
+
+
+# ─── Writing ──────────────────────────────────────────────────────────────────
+
+def _pack_u32(values):
+    return struct.pack(f'<{len(values)}I', *values)
+
+
+def _u32(view):
+    """A little-endian uint32 section: a zero-copy cast on little-endian
+    hosts, a byteswapped array('I') copy elsewhere."""
+    if sys.byteorder == 'little':
+        return view.cast('I')
+    out = array('I')
+    out.frombytes(view)
+    out.byteswap()
+    return out
+
+
+def _offsets(blobs):
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    return offsets
+
+
+def build_codebook(assignments):
+    """Serialize an assign_codes() dict to codebook bytes."""
+    entries = sorted((english.encode(), code.encode(), tier)
+                     for english, (code, tier) in assignments.items())
+    words = [w for w, _, _ in entries]
+    codes = [c for _, c, _ in entries]
+    word_seeds, word_slots = _build_phf(words)
+    code_seeds, code_slots = _build_phf(codes)
+
+    sections = [
+        _pack_u32(_offsets(words)),
+        _pack_u32(_offsets(codes)),
+        _pack_u32(word_seeds),
+        _pack_u32(word_slots),
+        _pack_u32(code_seeds),
+        _pack_u32(code_slots),
+        bytes(t for _, _, t in entries),
+        b''.join(words),
+        b''.join(codes),
+    ]
+    offsets = []
+    pos = _HEADER.size
+    for data in sections:
+        offsets.append(pos)
+        pos += len(data)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(entries),
+                          len(word_seeds), *offsets)
+    return header + b''.join(sections)
+
+
+def write_codebook(path, assignments):
+    """Write the codebook atomically, so open readers keep the old file."""
+    data = build_codebook(assignments)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+# ─── Reading ──────────────────────────────────────────────────────────────────
+
+class Codebook:
+    """Read-only view of a codebook file. Pages are shared between processes."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = buf = memoryview(self._map)
+        magic, version, _, n, n_buckets, *offsets = _HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not an AGNTCL codebook")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: codebook version {version}, "
+                             f"expected {FORMAT_VERSION}")
+        self.n = n
+        self.n_buckets = n_buckets
+        sizes = (n + 1, n + 1, n_buckets, n, n_buckets, n)
+        (self._word_off, self._code_off, self._word_seeds, self._word_slots,
+         self._code_seeds, self._code_slots) = (
+            _u32(buf[o:o + 4 * size]) for o, size in zip(offsets, sizes))
+        self._tiers = buf[offsets[6]:offsets[6] + n]
+        self._word_blob = buf[offsets[7]:offsets[8]]
+        self._code_blob = buf[offsets[8]:]
+
+    def __len__(self):
+        return self.n
+
+    def close(self):
+        for name in ('_word_off', '_code_off', '_word_seeds', '_word_slots',
+                     '_code_seeds', '_code_slots', '_tiers', '_word_blob',
+                     '_code_blob', '_buf'):
+            view = getattr(self, name)
+            if isinstance(view, memoryview):
+                view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _probe(self, key, seeds, slots, offsets, blob):
+        n = self.n
+        if not n:
+            return -1
+        g, f1, f2 = _hash(key)
+        d0, d1 = divmod(seeds[g % self.n_buckets], n)
+        i = slots[(f1 + d0 * f2 + d1) % n]
+        if blob[offsets[i]:offsets[i + 1]] == key:
+            return i
+        return -1
+
+    def index_of_word(self, english):
+        """Entry index for an English word, or -1."""
+        return self._probe(english.encode(), self._word_seeds,
+                           self._word_slots, self._word_off, self._word_blob)
+
+    def index_of_code(self, code):
+        """Entry index for a code, or -1."""
+        return self._probe(code.encode(), self._code_seeds, self._code_slots,
+                           self._code_off, self._code_blob)
+
+    def word_bytes(self, i):
+        """Zero-copy slice of entry i's English word."""
+        return self._word_blob[self._word_off[i]:self._word_off[i + 1]]
+
+    def code_bytes(self, i):
+        """Zero-copy slice of entry i's code."""
+        return self._code_blob[self._code_off[i]:self._code_off[i + 1]]
+
+    def tier(self, i):
+        return self._tiers[i]
+
+    def code(self, english):
+        """AGNTCL code for an English word, or None."""
+        i = self.index_of_word(english)
+        return None if i < 0 else str(self.code_bytes(i), 'ascii')
+
+    def word(self, code):
+        """English word for an AGNTCL code, or None."""
+        i = self.index_of_code(code)
+        return None if i < 0 else str(self.word_bytes(i), 'utf-8')
+
+    def items(self):
+        """Yield (english, code, tier) in word order."""
+        for i in range(self.n):
+            yield (str(self.word_bytes(i), 'utf-8'),
+                   str(self.code_bytes(i), 'ascii'), self._tiers[i])
+
+
+def open_codebook(path):
+    """Map a codebook file written by write_codebook()."""
+    return Codebook(path)
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    """Look up each argument as a word, then as a code."""
+    path = os.environ.get('AGNTCL_CODEBOOK', 'agntcl.codebook')
+    with open_codebook(path) as book:
+        for arg in sys.argv[1:]:
+            print(arg, book.code(arg) or book.word(arg) or '?')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""§8 composition resolver for out-of-vocabulary words.
+
+An unknown word is looked up in a gloss lexicon that describes it as a
+head-first list of features (`geyser: water force above`). A feature
+index, built once, maps every feature to the vocabulary entries that can
+express it: each entry expresses itself, and the §8.2 primitives also
+express the features they imply (`ice` covers water and cold). The
+resolver then picks the set of entries that covers all features with the
+fewest encoded bytes — an exact set cover over at most a handful of
+features — and renders it as an approximate composition, `~a:b:c`.
+
+Results are memoized in a bounded LRU, so repeated OOV words cost one
+dict probe. Usage: python agntcl_compose.py WORD ...
+"""
+
+import sys
+from functools import lru_cache
+
+from agntcl_encoder import CodeTable, compile_encoder
+from gen_agntcl import PRIMITIVES, load_assignments
+
+# Features a primitive expresses beyond its own meaning.
+IMPLIED = {
+    'ice': ('water', 'cold', 'hard'),
+    'fire': ('hot', 'light'),
+    'stone': ('hard', 'heavy'),
+    'metal': ('hard', 'strong'),
+    'glass': ('hard',),
+    'eye': ('see',),
+    'mouth': ('speak',),
+    'hand': ('hold', 'touch'),
+    'power': ('force', 'strong'),
+    'force': ('power',),
+    'war': ('fight',),
+    'dead': ('end',),
+}
+
+# Out-of-vocabulary words as head-first feature lists (§8.1 style).
+GLOSSES = {
+    'peony': 'flower pink big',
+    'rose': 'flower red love',
+    'daisy': 'flower white small',
+    'tulip': 'flower red round',
+    'petal': 'flower thin',
+    'geyser': 'water force above',
+    'ghost': 'see not body',
+    'specter': 'see not body',
+    'ornate': 'design many small',
+    'candle': 'fire small',
+    'ember': 'fire small',
+    'tsunami': 'water big force',
+    'volcano': 'stone hot earth',
+    'lava': 'stone hot move',
+    'hurricane': 'air force fast big',
+    'blizzard': 'water cold white air force',
+    'glitter': 'light many small',
+    'sparkle': 'light many small',
+    'frost': 'water cold thin',
+    'glacier': 'water cold hard big slow',
+    'lens': 'glass eye',
+    'spectacles': 'glass eye',
+    'beacon': 'fire light above',
+    'lighthouse': 'fire light above',
+    'raft': 'wood water move',
+    'forge': 'metal hot red',
+    'rust': 'metal red old',
+    'blade': 'metal sharp thin',
+    'needle': 'metal sharp thin small',
+    'hammer': 'metal heavy hand',
+    'meadow': 'earth green many',
+    'beauty': 'face good love',
+    'craft': 'hand design small',
+    'artisan': 'hand design good',
+    'masterpiece': 'design good hand',
+    'telescope': 'eye far',
+    'binoculars': 'eye far',
+    'swamp': 'water green grow',
+    'marsh': 'water green grow',
+    'monument': 'stone old big',
+    'ruin': 'stone old break',
+    'pebble': 'stone small round',
+    'boulder': 'stone big round',
+    'diamond': 'stone hard clean',
+    'pearl': 'stone white round',
+    'coal': 'stone black fire',
+    'cliff': 'stone sharp above',
+    'cave': 'stone inside earth',
+    'canyon': 'earth deep wide',
+    'earthquake': 'earth move force',
+    'fog': 'air cold white',
+    'mist': 'air cold white',
+    'smoke': 'air fire black',
+    'constellation': 'light many above',
+    'lightning': 'light fast force above',
+    'thunder': 'hear force above',
+    'puddle': 'water small flat',
+    'ocean': 'water big deep',
+    'tears': 'eye water',
+    'sweat': 'body water hot',
+    'corpse': 'body dead',
+    'skeleton': 'body dead hard',
+    'wound': 'body cut',
+    'scar': 'body cut old',
+    'kiss': 'mouth touch love',
+    'hug': 'arm hold love',
+    'whisper': 'speak soft',
+    'scream': 'speak fear force',
+    'sprint': 'move fast',
+    'crawl': 'move slow below',
+    'tremble': 'move fear small',
+    'ally': 'friend fight',
+    'defeat': 'fight end bad',
+    'ash': 'fire dead',
+    'stained': 'color',
+}
+
+
+def lemmas(word):
+    """The word itself, then singular guesses for a plural."""
+    yield word
+    if word.endswith('ies'):
+        yield word[:-3] + 'y'
+    if word.endswith('es'):
+        yield word[:-2]
+    if word.endswith('s'):
+        yield word[:-1]
+
+
+# ─── Resolver ─────────────────────────────────────────────────────────────────
+
+class Composer:
+    """Cheapest composition for a gloss, over a precomputed feature index."""
+
+    def __init__(self, assignments, glosses=GLOSSES, cache_size=4096):
+        self.codes = {english: code
+                      for english, (code, tier) in assignments.items()}
+        # Glosses for words the vocabulary already has are never consulted.
+        self.glosses = {word: tuple(features.split())
+                        for word, features in glosses.items()
+                        if word not in self.codes}
+        primitives = {w for _, words in PRIMITIVES for w in words}
+        index = {}
+        for english in self.codes:
+            index.setdefault(english, []).append(english)
+        for primitive, features in IMPLIED.items():
+            if primitive in primitives and primitive in self.codes:
+                for feature in features:
+                    index.setdefault(feature, []).append(primitive)
+        self.index = index
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _resolve(self, word):
+        for lemma in lemmas(word):
+            features = self.glosses.get(lemma)
+            if features is not None:
+                return self.cover(features)
+        return None
+
+    def cover(self, features):
+        """Cheapest ':' composition expressing every feature, or None.
+
+        Cost is the encoded length: each part's code plus one ':'
+        between parts. Parts are ordered by the first feature they cover,
+        so the head concept stays first.
+        """
+        masks = {}
+        for bit, feature in enumerate(features):
+            entries = self.index.get(feature)
+            if not entries:
+                return None
+            for entry in entries:
+                masks[entry] = masks.get(entry, 0) | (1 << bit)
+
+        full = (1 << len(features)) - 1
+        best = [None] * (full + 1)
+        best[0] = (0, ())
+        for mask in range(full):
+            if best[mask] is None:
+                continue
+            cost, parts = best[mask]
+            for entry, covers in masks.items():
+                if covers | mask == mask:
+                    continue
+                step = (cost + len(self.codes[entry]) + 1, parts + (entry,))
+                target = best[covers | mask]
+                if target is None or step[0] < target[0]:
+                    best[covers | mask] = step
+        parts = sorted(best[full][1],
+                       key=lambda entry: masks[entry] & -masks[entry])
+        return ':'.join(self.codes[entry] for entry in parts)
+
+
+class ComposingCodeTable(CodeTable):
+    """CodeTable whose misses try a `~` composition before quoting. The
+    composition is used only when it is shorter than the quoted word."""
+
+    __slots__ = ('composer',)
+
+    def __missing__(self, word):
+        if word.isalpha():
+            composition = self.composer.resolve(word)
+            if composition and len(composition) + 1 < len(word) + 2:
+                return '~' + composition
+        return CodeTable.__missing__(self, word)
+
+
+def compile_composing_encoder(assignments, drop_articles=True, **kwargs):
+    """compile_encoder() with §8 compositions for OOV words."""
+    table = ComposingCodeTable(compile_encoder(assignments, drop_articles))
+    table.composer = Composer(assignments, **kwargs)
+    return table
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    assignments = load_assignments()
+    composer = Composer(assignments)
+    inverse = {code: english for english, code in composer.codes.items()}
+    for word in sys.argv[1:]:
+        if word.lower() in composer.codes:
+            print(f"{word}: {composer.codes[word.lower()]} (in vocabulary)")
+            continue
+        composition = composer.resolve(word.lower())
+        if composition is None:
+            print(f'{word}: "{word}" (no gloss)')
+        else:
+            gloss = ':'.join(inverse[c] for c in composition.split(':'))
+            print(f"{word}: ~{composition}  ({gloss})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Corpus-driven, frequency-optimal AGNTCL code assignment.
+
+Counts how often each vocabulary entry occurs in a local corpus, then
+hands out codes in order of frequency: the most frequent words take the
+shortest free codes. With fixed code lengths (1, 2, 3 chars) that ordering
+minimizes the expected encoded bytes — Huffman-style, but inside the
+existing tier shapes. Usage: python agntcl_corpus.py CORPUS
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+from itertools import chain
+
+from agntcl_encoder import compile_encoder, encode_stream, iter_words, read_chunks
+from gen_agntcl import (TIER1, append_ledger, assign_codes, build_word_list,
+                        gen_tier2_codes, gen_tier3_codes, gen_tier4_codes,
+                        load_assignments)
+
+# ─── Counting ─────────────────────────────────────────────────────────────────
+
+def count_corpus(path, assignments):
+    """Stream a corpus file and count uses of each vocabulary entry.
+
+    Tokens are folded exactly like the encoder folds them, so aliases
+    (`I` for `self/I`), lone digits and inflected forms (`wrote`) count
+    toward their entry, and dropped articles and pending prefixes
+    (`don't`) count toward nothing.
+    """
+    entry_of = compile_encoder({english: (english, tier)
+                                for english, (code, tier)
+                                in assignments.items()})
+    raw = Counter()
+    with open(path) as f:
+        for words in iter_words(read_chunks(f)):
+            raw.update(words)
+    counts = Counter()
+    for token, n in raw.items():
+        entry = entry_of.get(token, '')
+        entry = entry.lstrip('!').removeprefix('p.').removeprefix('f.')
+        if entry:
+            counts[entry] += n
+    return counts
+
+
+# ─── Assignment ───────────────────────────────────────────────────────────────
+
+def assign_codes_by_frequency(words, counts, keep_tier1=True):
+    """Reassign codes so frequent entries get the shortest codes.
+
+    Covers the same entries as assign_codes(words); ties keep its order.
+    With keep_tier1 the TIER1 table stays as specified and only tier-2/3
+    codes move. A code that matches the start of its word is skipped and
+    offered to the next word instead of being wasted.
+    """
+    base = assign_codes(words)
+    order = sorted(base, key=lambda english: -counts.get(english, 0))
+
+    assignments = {}
+    pools = []
+    if keep_tier1:
+        for code, english in TIER1.items():
+            assignments[english] = (code, 1)
+        order = [english for english in order if english not in assignments]
+    else:
+        pools.append([(code, 1) for code in TIER1])
+    pools.append((code, 2) for code in gen_tier2_codes())
+    pools.append((code, 3) for code in gen_tier3_codes())
+    pools.append((code, 4) for code in gen_tier4_codes())
+    flat = chain.from_iterable(pools)
+
+    held = []
+    for english in order:
+        for j, (code, tier) in enumerate(held):
+            if code != english[:len(code)]:
+                del held[j]
+                break
+        else:
+            while True:
+                code, tier = next(flat)
+                if code != english[:len(code)]:
+                    break
+                held.append((code, tier))
+        assignments[english] = (code, tier)
+    return assignments
+
+
+# ─── Measurement ──────────────────────────────────────────────────────────────
+
+def measure(path, assignments, counts):
+    """Encode the corpus with an assignment; return size and coverage stats."""
+    table = compile_encoder(assignments)
+    english_bytes = os.path.getsize(path)
+    with open(path) as f:
+        encoded_bytes = sum(len(fragment.encode())
+                            for fragment in encode_stream(read_chunks(f),
+                                                          table))
+    by_tier = Counter()
+    for english, n in counts.items():
+        by_tier[assignments[english][1]] += n
+    total = sum(by_tier.values())
+    return {
+        'english_bytes': english_bytes,
+        'encoded_bytes': encoded_bytes,
+        'ratio': encoded_bytes / english_bytes if english_bytes else 0.0,
+        'coverage': {tier: (by_tier[tier] / total if total else 0.0)
+                     for tier in (1, 2, 3, 4)},
+    }
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('corpus')
+    parser.add_argument('--write-ledger', metavar='PATH',
+                        help='write the tier-1-preserving assignment as a '
+                             'new ledger for gen_agntcl.py to pin')
+    args = parser.parse_args()
+
+    words = build_word_list()
+    current = load_assignments()
+    counts = count_corpus(args.corpus, current)
+    candidates = [
+        ('current', current),
+        ('frequency (tier-1 fixed)',
+         assign_codes_by_frequency(words, counts, keep_tier1=True)),
+        ('frequency (all tiers)',
+         assign_codes_by_frequency(words, counts, keep_tier1=False)),
+    ]
+
+    print(f"corpus: {args.corpus}, {sum(counts.values())} vocabulary tokens")
+    print(f"{'assignment':<26} {'bytes':>10} {'ratio':>6} {'vs cur':>7} "
+          f"{'T1':>6} {'T2':>6} {'T3':>6}")
+    baseline = None
+    for name, assignments in candidates:
+        stats = measure(args.corpus, assignments, counts)
+        if baseline is None:
+            baseline = stats['encoded_bytes']
+        saved = 1 - stats['encoded_bytes'] / baseline if baseline else 0.0
+        cov = stats['coverage']
+        print(f"{name:<26} {stats['encoded_bytes']:>10} "
+              f"{stats['ratio']:>6.1%} {-saved:>+7.1%} "
+              f"{cov[1]:>6.1%} {cov[2]:>6.1%} {cov[3]:>6.1%}")
+
+    if args.write_ledger:
+        if os.path.exists(args.write_ledger):
+            sys.exit(f"{args.write_ledger} exists; ledgers are append-only")
+        rows = append_ledger(args.write_ledger, {}, candidates[1][1])
+        print(f"Written {len(rows)} bindings to {args.write_ledger}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""Compiled dispatch of §8.3 intent frames to registered handlers.
+
+A handler is registered for a frame pattern, written as a frame:
+
+    {gw _ *}            suggest: any subject, then anything
+    {ek {je *}}         ask, with exactly one describe frame inside
+    {wq $tok $tok}      compare two plain tokens
+    {_ "urgent" *}      any intent whose first argument is "urgent"
+
+Within a pattern, `_` matches any one argument (or, as a head, any
+intent), `$tok` `$str` `$num` `$op` `$frame` match one argument of that
+kind, a final `*` matches the remaining arguments, and anything else must
+appear exactly as written.
+
+Dispatcher compiles every pattern into one discrimination tree: a
+pattern is flattened to its preorder symbol sequence and inserted into a
+trie. A frame is flattened the same way and walked down the tree,
+following the exact edge for each symbol before the kind, `_` and `*`
+edges (which skip a whole argument, or the rest of the enclosing frame).
+The walk costs time in proportion to the frame, however many handlers
+there are, and picks the most specific match: exact beats kind beats
+`_` beats `*`, leftmost argument first. Captured arguments (`_` and kind
+matches as nodes, `*` as a tuple of nodes) are passed to the handler.
+"""
+
+from agntcl_parser import parse
+
+KINDS = ('tok', 'str', 'num', 'op', 'frame')
+
+_OPEN = {'op': '(', 'frame': '{'}
+_CLOSE = (')',)
+
+# Tree edge keys besides message symbols (which are all tuples).
+_WILD = '_'
+_REST = '*'
+_LEAF = None
+
+
+class PatternError(ValueError):
+    """A handler pattern that is not a single well-formed frame."""
+
+
+class DispatchError(LookupError):
+    """A frame that no registered pattern matches."""
+
+
+def _flatten(node, syms, nodes, skip, close):
+    """Append the preorder symbols of node; each symbol's node, the index
+    past its subtree and, for direct arguments, where their frame closes."""
+    i = len(syms)
+    if node[0] in _OPEN:
+        syms.append((_OPEN[node[0]], node[1]))
+        nodes.append(node)
+        skip.append(None)
+        close.append(None)
+        starts = []
+        for arg in node[2]:
+            starts.append(len(syms))
+            _flatten(arg, syms, nodes, skip, close)
+        end = len(syms)
+        syms.append(_CLOSE)
+        nodes.append(None)
+        skip.append(None)
+        close.append(end)
+        for j in starts:
+            close[j] = end
+        skip[i] = end + 1
+    else:
+        syms.append(node)
+        nodes.append(node)
+        skip.append(i + 1)
+        close.append(None)
+
+
+def _word(node):
+    if node[0] == 'tok' and not node[1] and len(node[2]) == 1:
+        code, n = node[2][0]
+        if n is None:
+            return code
+    return None
+
+
+def compile_pattern(pattern):
+    """A pattern string (or parsed frame) -> its sequence of tree edges."""
+    if isinstance(pattern, str):
+        statements = parse(pattern)
+        if len(statements) != 1 or statements[0][0] != 'frame':
+            raise PatternError(f"pattern must be one frame: {pattern!r}")
+        pattern = statements[0]
+    edges = []
+
+    def visit(node, last):
+        word = _word(node)
+        if word == _WILD:
+            edges.append(_WILD)
+        elif word == _REST:
+            if not last:
+                raise PatternError("'*' must be the last argument")
+            edges.append(_REST)
+        elif word is not None and word.startswith('$'):
+            if word[1:] not in KINDS:
+                raise PatternError(f"unknown argument kind {word!r}")
+            edges.append(('$', word[1:]))
+        elif node[0] in _OPEN:
+            head = node[1]
+            edges.append((_OPEN[node[0]],
+                          None if _word(head) == _WILD else head))
+            for k, arg in enumerate(node[2]):
+                visit(arg, k == len(node[2]) - 1)
+            edges.append(_CLOSE)
+        else:
+            edges.append(node)
+
+    visit(pattern, False)
+    return tuple(edges)
+
+
+# ─── Reference matcher ────────────────────────────────────────────────────────
+
+def match(edges, node):
+    """Match one compiled pattern against a frame by direct recursion;
+    return the captures or None. What a linear router does per handler."""
+    syms, nodes, skip, close = [], [], [], []
+    _flatten(node, syms, nodes, skip, close)
+    caps = []
+
+    def walk(e, i):
+        if e == len(edges):
+            return i == len(syms)
+        edge = edges[e]
+        if i == len(syms):
+            return False
+        s = syms[i]
+        if edge == _REST:
+            if close[i] is None:
+                return False
+            caps.append(tuple(nodes[j] for j in _args(skip, i, close[i])))
+            return walk(e + 1, close[i])
+        if edge == _CLOSE or s is _CLOSE:
+            return edge == s and walk(e + 1, i + 1)
+        if edge == _WILD or (edge[0] == '$' and edge[1] == nodes[i][0]):
+            caps.append(nodes[i])
+            return walk(e + 1, skip[i])
+        if edge[0] in ('(', '{') and edge[1] is None:
+            if s[0] != edge[0]:
+                return False
+            caps.append(s[1])
+            return walk(e + 1, i + 1)
+        return edge == s and walk(e + 1, i + 1)
+
+    return tuple(caps) if walk(0, 0) else None
+
+
+def _args(skip, i, end):
+    while i < end:
+        yield i
+        i = skip[i]
+
+
+# ─── Dispatcher ───────────────────────────────────────────────────────────────
+
+class Dispatcher:
+    """Registry of frame handlers, compiled into a discrimination tree."""
+
+    def __init__(self, fallback=None):
+        self.tree = {}
+        self.handlers = []
+        self.patterns = []
+        self.fallback = fallback
+
+    def register(self, pattern, handler):
+        """Route frames matching pattern to handler(*captures). Registering
+        the same pattern again replaces its handler."""
+        edges = compile_pattern(pattern)
+        node = self.tree
+        for edge in edges:
+            node = node.setdefault(edge, {})
+        if _LEAF in node:
+            self.handlers[node[_LEAF]] = handler
+        else:
+            node[_LEAF] = len(self.handlers)
+            self.handlers.append(handler)
+            self.patterns.append(pattern)
+        return handler
+
+    def route(self, pattern):
+        """Decorator form of register()."""
+        return lambda handler: self.register(pattern, handler)
+
+    def __len__(self):
+        return len(self.handlers)
+
+    def lookup(self, frame):
+        """(handler index, captures) for the most specific match, or None."""
+        syms, nodes, skip, close = [], [], [], []
+        _flatten(frame, syms, nodes, skip, close)
+        n = len(syms)
+        caps = []
+
+        def walk(t, i):
+            if i == n:
+                return t.get(_LEAF)
+            s = syms[i]
+            child = t.get(s)
+            if child is not None:
+                hit = walk(child, i + 1)
+                if hit is not None:
+                    return hit
+            if s is not _CLOSE:
+                node = nodes[i]
+                if s[0] in ('(', '{'):
+                    child = t.get((s[0], None))
+                    if child is not None:
+                        caps.append(s[1])
+                        hit = walk(child, i + 1)
+                        if hit is not None:
+                            return hit
+                        caps.pop()
+                for key in (('$', node[0]), _WILD):
+                    child = t.get(key)
+                    if child is not None:
+                        caps.append(node)
+                        hit = walk(child, skip[i])
+                        if hit is not None:
+                            return hit
+                        caps.pop()
+            if close[i] is not None:
+                child = t.get(_REST)
+                if child is not None:
+                    caps.append(tuple(nodes[j]
+                                      for j in _args(skip, i, close[i])))
+                    hit = walk(child, close[i])
+                    if hit is not None:
+                        return hit
+                    caps.pop()
+            return None
+
+        hit = walk(self.tree, 0)
+        return None if hit is None else (hit, tuple(caps))
+
+    def dispatch(self, frame):
+        """Call the handler for one frame node; return its result."""
+        found = self.lookup(frame)
+        if found is None:
+            if self.fallback is None:
+                raise DispatchError("no handler matches the frame")
+            return self.fallback(frame)
+        index, caps = found
+        return self.handlers[index](*caps)
+
+    def dispatch_message(self, statements):
+        """Dispatch every top-level frame of a message (text or parsed)."""
+        if isinstance(statements, str):
+            statements = parse(statements)
+        return [self.dispatch(s) for s in statements if s[0] == 'frame']
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Streaming English -> AGNTCL encoder compiled from assign_codes() output."""
+
+import re
+import string
+import sys
+
+from agntcl_morph import inflection_table
+from gen_agntcl import load_assignments
+
+# ─── Compilation ──────────────────────────────────────────────────────────────
+
+# Rule 2: articles have codes but are optional, so the encoder drops them.
+ARTICLES = ('the', 'a', 'an')
+
+# Single digits are tier-1 codes, so a lone English digit is spelled as its
+# number word instead. Two or more digits pass through as a literal number.
+DIGIT_WORDS = ('zero', 'one', 'two', 'three', 'four',
+               'five', 'six', 'seven', 'eight', 'nine')
+
+# Case folding plus punctuation -> space in one str.translate() pass.
+# Apostrophes stay inside words so contractions remain a single token.
+_FOLD = {ord(c): ord(c.lower()) for c in string.ascii_uppercase}
+_FOLD.update({ord(c): ' ' for c in string.punctuation if c != "'"})
+_FOLD.update({ord(c): ' ' for c in '\t\n\r\x0b\x0c'})
+_FOLD[ord('\u2019')] = ord("'")
+
+# Inflected auxiliaries ("don't" -> '!', "didn't" -> '!p.') are prefixes
+# waiting for the verb after them. They attach to a following code; before
+# a literal, or with nothing after them, they take the code for 'do'.
+_PENDING = re.compile(r'(?<!\S)((?:[pf]\.|!)+)(?:( )(?=[a-z~?!]|[0-9](?![0-9]))'
+                      r'|(?!\S))')
+
+
+class CodeTable(dict):
+    """Compiled word -> AGNTCL token map.
+
+    Hits are a single C-level dict probe. Misses fall through to
+    __missing__, which handles numbers and the quoted-string fallback
+    without caching (so the table never grows with unseen input).
+    An empty string means "emit nothing".
+    """
+
+    __slots__ = ()
+
+    def __missing__(self, word):
+        if word.isdigit():
+            return word
+        stripped = word.strip("'")
+        if stripped != word:
+            return self[stripped] if stripped else ''
+        return '"' + word + '"'
+
+
+def compile_encoder(assignments, drop_articles=True, inflect=True):
+    """Compile an assign_codes() dict into a CodeTable.
+
+    With inflect, inflected forms (agntcl_morph) map to their prefixed
+    tokens, so `wrote` encodes like `p.` + `write` without stemming.
+    """
+    table = CodeTable((english, code)
+                      for english, (code, tier) in assignments.items())
+    # Tier-1 entries like 'self/I' list aliases; each one maps to the code.
+    for english, (code, tier) in assignments.items():
+        if '/' in english:
+            for alias in english.lower().split('/'):
+                table.setdefault(alias, code)
+    for digit, english in enumerate(DIGIT_WORDS):
+        if english in assignments:
+            table[str(digit)] = assignments[english][0]
+    if drop_articles:
+        for english in ARTICLES:
+            table[english] = ''
+    if inflect:
+        for form, token in inflection_table(assignments).items():
+            table.setdefault(form, token)
+    return table
+
+
+def default_encoder():
+    """Compile the encoder for the built-in vocabulary."""
+    return compile_encoder(load_assignments())
+
+
+# ─── Encoding ─────────────────────────────────────────────────────────────────
+
+def attach_prefixes(out, table):
+    """Join pending prefixes in encoded output onto the token after them."""
+    if '! ' in out or '. ' in out or out.endswith(('!', '.')):
+        do = table['do']
+        out = _PENDING.sub(lambda m: m.group(1) if m.group(2)
+                           else m.group(1) + do, out)
+    return out
+
+
+def hold_pending(out):
+    """Split trailing pending prefixes off out: (head, pending)."""
+    cut = len(out)
+    while cut and out[cut - 1] in '!.':
+        cut = max(out.rfind(' ', 0, cut), 0)
+    return out[:cut], out[cut:].lstrip()
+
+
+def encode(text, table):
+    """Encode one complete English text to a single AGNTCL line."""
+    return attach_prefixes(' '.join(filter(None, map(
+        table.__getitem__, text.translate(_FOLD).split()))), table)
+
+
+def encode_stream(chunks, table):
+    """Encode an iterable of text chunks, yielding AGNTCL fragments.
+
+    Chunks may split words anywhere; the partial word after the last
+    boundary is carried into the next chunk, and so are pending prefixes
+    at the end of a fragment. ''.join() of the yielded fragments equals
+    encode() of the concatenated input.
+    """
+    lookup = table.__getitem__
+    tail = ''
+    held = ''
+    sep = ''
+    for chunk in chunks:
+        text = tail + chunk.translate(_FOLD)
+        cut = text.rfind(' ') + 1
+        tail = text[cut:]
+        out = ' '.join(filter(None, map(lookup, text[:cut].split())))
+        if held:
+            out = held + ' ' + out if out else held
+        out, held = hold_pending(out)
+        if out:
+            yield sep + attach_prefixes(out, table)
+            sep = ' '
+    out = ' '.join(filter(None, map(lookup, tail.split())))
+    if held:
+        out = held + ' ' + out if out else held
+    if out:
+        yield sep + attach_prefixes(out, table)
+
+
+def iter_words(chunks):
+    """Yield a list of folded words per chunk, carrying split words over."""
+    tail = ''
+    for chunk in chunks:
+        text = tail + chunk.translate(_FOLD)
+        cut = text.rfind(' ') + 1
+        tail = text[cut:]
+        yield text[:cut].split()
+    yield tail.split()
+
+
+def read_chunks(f, size=1 << 16):
+    """Yield fixed-size chunks from a text file object."""
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    table = default_encoder()
+    for fragment in encode_stream(read_chunks(sys.stdin), table):
+        sys.stdout.write(fragment)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""Concurrent dataflow executor for §5 operations and §7 pipelines.
+
+plan() turns a parsed message into a dependency DAG: every `ref -> (op)`
+binding and every top-level operation is a node, and a node depends on
+the bindings its arguments reference. Top-level operations are the
+message's actions and keep message order: each one also waits for every
+node written before it, and a binding waits for the last top-level
+operation before it. execute() starts one asyncio task per node; a task
+waits only for the nodes it depends on, so independent bindings, such
+as the branches of a wide pipeline, run side by side.
+
+References bound by earlier messages (Pattern 5's `oc1`, `pm1`) are
+passed in as an environment, keyed like execute()'s named results.
+
+Operations are looked up by English verb in a handler table. Coroutine
+handlers run on the event loop; plain functions are treated as blocking
+(`run`, `test`, ...) and go to a thread pool. Handlers receive evaluated
+arguments: str for "literals", int for numbers, the English word for a
+token, and the result of the bound operation for a reference.
+
+Special forms, evaluated lazily instead of argument-first:
+
+    (sequence op1 op2 ...)   one after another; result of the last
+    (loop N op)              op N times in a row; list of results
+    (loop each ref op)       op once per item of ref; item passed last
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from agntcl_parser import build_inverse
+
+
+class ExecError(RuntimeError):
+    """A message that cannot be planned or an operation without handler."""
+
+
+def _ref(node):
+    if (node[0] == 'tok' and not node[1] and len(node[2]) == 1
+            and node[2][0][1] is not None):
+        return node[2][0]
+    return None
+
+
+def _refs_in(node, out):
+    """Collect every reference used inside node, in document order."""
+    ref = _ref(node)
+    if ref is not None:
+        out.append(ref)
+    elif node[0] in ('op', 'frame'):
+        _refs_in(node[1], out)
+        for arg in node[2]:
+            _refs_in(arg, out)
+    return out
+
+
+# ─── Planning ─────────────────────────────────────────────────────────────────
+
+def plan(statements, bound=()):
+    """Dependency DAG for a message, as a list of nodes in message order.
+
+    Each node is (ref or None, op node, dependency indices, scope); scope
+    maps every reference the op uses to a literal node, the index of the
+    node that computes it, or None for one of the `bound` references
+    (code, n) the caller already holds. A reference is valid from its
+    binding onwards (§6), so using one earlier is an ExecError and cycles
+    cannot occur.
+    """
+    nodes = []
+    visible = dict.fromkeys(bound)
+    last = None         # index of the last top-level operation
+    for statement in statements:
+        if statement[0] == 'bind':
+            ref, value = statement[1][2][0], statement[2]
+        elif statement[0] == 'op':
+            ref, value = None, statement
+        else:
+            continue
+        if value[0] != 'op':
+            visible[ref] = value
+            continue
+        scope = {}
+        for used in _refs_in(value, []):
+            if used not in visible:
+                raise ExecError(f"reference {used[0]}{used[1]} used before "
+                                f"it is bound")
+            scope[used] = visible[used]
+        deps = [v for v in scope.values() if isinstance(v, int)]
+        if ref is None:
+            deps.extend(range(last or 0, len(nodes)))
+            last = len(nodes)
+        else:
+            if last is not None:
+                deps.append(last)
+            visible[ref] = len(nodes)
+        nodes.append((ref, value, tuple(dict.fromkeys(deps)), scope))
+    return nodes
+
+
+def _env_key(name):
+    """('oc', 1) for 'oc1', the form execute() names its results in."""
+    code = name.rstrip('0123456789')
+    if code == name or not code:
+        raise ExecError(f"not a reference: {name!r}")
+    return code, int(name[len(code):])
+
+
+# ─── Execution ────────────────────────────────────────────────────────────────
+
+class Executor:
+    """Runs planned messages against a table of operation handlers."""
+
+    def __init__(self, handlers, assignments, max_workers=None):
+        self.handlers = handlers
+        self.inverse = build_inverse(assignments)
+        self.pool = ThreadPoolExecutor(max_workers)
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def word(self, node):
+        return ':'.join(self.inverse.get(code, code) for code, _ in node[2])
+
+    async def evaluate(self, node, env):
+        tag = node[0]
+        if tag == 'str':
+            return node[1]
+        if tag == 'num':
+            return int(node[1])
+        if tag == 'tok':
+            ref = _ref(node)
+            if ref is None:
+                return self.word(node)
+            value = env[ref]
+            if isinstance(value, asyncio.Future):
+                return await value
+            return await self.evaluate(value, env)
+        if tag != 'op':
+            raise ExecError(f"cannot execute a {tag}")
+
+        verb = self.word(node[1])
+        args = node[2]
+        if verb == 'sequence':
+            result = None
+            for arg in args:
+                result = await self.evaluate(arg, env)
+            return result
+        if verb == 'loop':
+            return await self._loop(args, env)
+        values = await asyncio.gather(*(self.evaluate(a, env) for a in args))
+        return await self.call(verb, values)
+
+    async def _loop(self, args, env):
+        if len(args) == 2:
+            # A lone digit is a tier-1 code, but here it reads as a count.
+            head = args[0]
+            if head[0] == 'tok' and head[2][0][0].isdigit():
+                count = int(head[2][0][0])
+            else:
+                count = await self.evaluate(head, env)
+            return [await self.evaluate(args[1], env) for _ in range(count)]
+        if (len(args) == 3 and args[0][0] == 'tok'
+                and self.word(args[0]) == 'each'):
+            items = await self.evaluate(args[1], env)
+            body = args[2]
+            verb = self.word(body[1])
+            results = []
+            for item in items:
+                values = await asyncio.gather(
+                    *(self.evaluate(a, env) for a in body[2]))
+                results.append(await self.call(verb, list(values) + [item]))
+            return results
+        raise ExecError("loop takes (loop N op) or (loop each ref op)")
+
+    async def call(self, verb, values):
+        handler = self.handlers.get(verb)
+        if handler is None:
+            raise ExecError(f"no handler for operation {verb!r}")
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(*values)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, handler, *values)
+
+    async def execute(self, statements, sequential=False, env=None):
+        """Run a message; return (results by reference, unnamed results).
+
+        env maps references bound by earlier messages ('oc1', as in the
+        named results) to their values. With sequential=True every node
+        waits for the previous one — the baseline the concurrent schedule
+        is measured against.
+        """
+        loop = asyncio.get_running_loop()
+        outer = {}
+        for name, value in (env or {}).items():
+            done = outer[_env_key(name)] = loop.create_future()
+            done.set_result(value)
+        nodes = plan(statements, outer)
+        tasks = []
+        for ref, op, deps, scope in nodes:
+            waits = [tasks[i] for i in deps]
+            if sequential and tasks:
+                waits.append(tasks[-1])
+            env = {used: (outer[used] if v is None else
+                          tasks[v] if isinstance(v, int) else v)
+                   for used, v in scope.items()}
+            tasks.append(asyncio.ensure_future(self._node(op, waits, env)))
+        results = await asyncio.gather(*tasks)
+        named = {f"{node[0][0]}{node[0][1]}": result
+                 for node, result in zip(nodes, results)
+                 if node[0] is not None}
+        unnamed = [result for node, result in zip(nodes, results)
+                   if node[0] is None]
+        return named, unnamed
+
+    async def _node(self, op, waits, env):
+        if waits:
+            await asyncio.gather(*waits)
+        return await self.evaluate(op, env)
+
+
+def run_message(statements, handlers, assignments, sequential=False,
+                env=None):
+    """Plan and execute one parsed message on a fresh event loop."""
+    with Executor(handlers, assignments) as executor:
+        return asyncio.run(executor.execute(statements, sequential, env))
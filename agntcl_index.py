@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""Inverted index and structural queries over a corpus of AGNTCL messages.
+
+Messages are numbered in corpus order. Indexer records, per message, the
+§10 grammar facts a query can ask about, each as a posting-list key:
+
+    c:CODE            a token uses CODE           (also c:p.CODE etc. for
+                                                   every prefixed use)
+    h:HEAD            an operation (HEAD ...), for every code of a
+                      composed head (HEAD:MOD ...)
+    a:HEAD ARG        an operation (HEAD ... ARG ...) with the token ARG
+    a:HEAD (ARG       an operation (HEAD ... (ARG ...) ...)
+
+A posting list is the sorted IDs of the messages holding the key. The
+index file stores the sorted keys and all lists as little-endian uint32;
+Index maps it and reads a list only when a query touches it.
+
+Query language, loosest binding first:
+
+    A | B             either
+    A B               both (juxtaposition)
+    A then B          A in an earlier statement than B
+    -A                not A
+    CODE  p.CODE      a token, optionally with exact prefixes
+    (HEAD ARG ...)    an operation whose direct arguments include every
+                      ARG; an ARG is a code, a nested pattern, or _ for
+                      "any argument"
+    CODE*             any code starting with CODE, also as HEAD or ARG
+
+    (fa oi*) then p.xz     (run test...) and, later, did fail
+
+Posting lists answer a query per message. They are exact for tokens and
+for operation patterns with at most one ARG, an unprefixed code, under
+an unprefixed HEAD. Given a fetch function (message ID -> parsed
+statements, e.g. an ArchiveReader), search() re-checks every candidate
+against the message itself, which also makes several ARGs of one
+pattern, _, prefixes on HEAD or ARGs, nested patterns and `then` exact;
+without it such queries raise QueryError rather than return a superset.
+Set operations use numpy when available.
+Usage:
+
+    python agntcl_index.py build INDEX [--archive ARCHIVE] < messages
+    python agntcl_index.py query INDEX QUERY [--archive ARCHIVE]
+"""
+
+import argparse
+import mmap
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from agntcl_parser import parse
+
+MAGIC = b'AGIX'
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct('<4sHHIIQ')     # magic, version, reserved,
+                                        # messages, keys, postings offset
+
+
+class QueryError(ValueError):
+    """A malformed query, or one that needs message access to answer."""
+
+
+# ─── Indexing ─────────────────────────────────────────────────────────────────
+
+def _arg_codes(node):
+    """The codes of a token, or of an operation's head."""
+    if node[0] == 'tok':
+        return [code for code, _ in node[2]]
+    if node[0] in ('op', 'frame'):
+        return _arg_codes(node[1])
+    return []
+
+
+def message_keys(statements):
+    """The set of posting keys for one parsed message."""
+    keys = set()
+    add = keys.add
+
+    def visit(node):
+        tag = node[0]
+        if tag == 'tok':
+            prefixes = ''.join(node[1])
+            for code, _ in node[2]:
+                add('c:' + code)
+                if prefixes:
+                    add('c:' + prefixes + code)
+        elif tag in ('op', 'frame'):
+            visit(node[1])
+            if tag == 'op':
+                for head in _arg_codes(node[1]):
+                    add('h:' + head)
+                    for arg in node[2]:
+                        if arg[0] == 'tok':
+                            for code, _ in arg[2]:
+                                add(f'a:{head} {code}')
+                        elif arg[0] == 'op':
+                            for code in _arg_codes(arg[1]):
+                                add(f'a:{head} ({code}')
+            for arg in node[2]:
+                visit(arg)
+        elif tag == 'bind':
+            visit(node[1])
+            visit(node[2])
+        elif tag == 'expr':
+            for item in node[1]:
+                visit(item)
+
+    for statement in statements:
+        visit(statement)
+    return keys
+
+
+class Indexer:
+    """Accumulates posting lists for messages added in ID order."""
+
+    def __init__(self):
+        self.postings = defaultdict(lambda: array('I'))
+        self.count = 0
+
+    def add(self, statements):
+        """Index one parsed message (or AGNTCL text); return its ID."""
+        if isinstance(statements, str):
+            statements = parse(statements)
+        message_id = self.count
+        postings = self.postings
+        for key in message_keys(statements):
+            postings[key].append(message_id)
+        self.count += 1
+        return message_id
+
+    def save(self, path):
+        write_index(path, self.postings, self.count)
+
+
+def write_index(path, postings, n_messages):
+    """Write {key: sorted message IDs} as an index file. The IDs must be
+    uint32 buffers: array('I') or numpy arrays."""
+    keys = sorted(postings)
+    key_blob = '\n'.join(keys).encode()
+    starts = array('Q', [0])
+    for key in keys:
+        starts.append(starts[-1] + len(postings[key]))
+    offset = _HEADER.size + len(key_blob)
+    offset += -offset % 8
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, n_messages, len(keys),
+                             offset))
+        f.write(key_blob)
+        f.write(bytes(offset - f.tell()))
+        f.write(starts.tobytes())
+        for key in keys:
+            f.write(postings[key])
+
+
+# ─── Set operations ───────────────────────────────────────────────────────────
+# Posting lists and results are sorted, duplicate-free ID sequences:
+# memoryviews of the mapped file (numpy arrays over them if available).
+
+if np is not None:
+    def _ids(view):
+        return np.frombuffer(view, dtype='<u4')
+
+    def _and(a, b):
+        if len(a) > len(b):
+            a, b = b, a
+        if not len(a):
+            return a
+        at = np.minimum(np.searchsorted(b, a), len(b) - 1)
+        return a[b[at] == a]
+
+    def _or(lists, n):
+        lists = [ids for ids in lists if len(ids)]
+        if len(lists) == 1:
+            return lists[0]
+        if sum(map(len, lists)) < n >> 6:
+            return np.unique(np.concatenate(lists)) if lists else _ids(b'')
+        # Many IDs (a broad wildcard): mark them in a bitmap, no sort.
+        keep = np.zeros(n, dtype=bool)
+        for ids in lists:
+            keep[ids] = True
+        return np.flatnonzero(keep).astype('<u4')
+
+    def _not(a, n):
+        keep = np.ones(n, dtype=bool)
+        keep[a] = False
+        return np.flatnonzero(keep).astype('<u4')
+else:
+    def _ids(view):
+        return view.cast('I') if len(view) else array('I')
+
+    def _and(a, b):
+        if len(a) > len(b):
+            a, b = b, a
+        out = array('I')
+        lo, hi = 0, len(b)
+        for x in a:
+            lo = bisect_left(b, x, lo, hi)
+            if lo == hi:
+                break
+            if b[lo] == x:
+                out.append(x)
+        return out
+
+    def _or(lists, n):
+        lists = [ids for ids in lists if len(ids)]
+        if len(lists) == 1:
+            return lists[0]
+        return array('I', sorted(set().union(*lists)))
+
+    def _not(a, n):
+        a = set(a)
+        return array('I', (i for i in range(n) if i not in a))
+
+
+# ─── Queries ──────────────────────────────────────────────────────────────────
+# Patterns: ('word', prefixes, code, star), ('op', word, args) with None
+# for `_`, ('not', p), and ('and' | 'or' | 'then', [p, ...]).
+
+_QUERY = re.compile(r'\s*(?:([()|])|(-)(?=\S)|([^\s()|]+))')
+_WORD = re.compile(r'((?:[pf]\.|[!?~])*)([^\s():*]+)(\*?)')
+
+
+def _tokenize_query(text):
+    pos = 0
+    end = len(text.rstrip())
+    while pos < end:
+        m = _QUERY.match(text, pos)
+        yield m.group(m.lastindex), m.lastindex == 3
+        pos = m.end()
+
+
+class _QueryParser:
+    def __init__(self, text):
+        self.tokens = list(_tokenize_query(text))
+        self.i = 0
+
+    def peek(self):
+        return self.tokens[self.i] if self.i < len(self.tokens) else (None,
+                                                                       False)
+
+    def take(self):
+        token = self.peek()
+        if token[0] is None:
+            raise QueryError("unexpected end of query")
+        self.i += 1
+        return token
+
+    def query(self):
+        parts = [self.conjunction()]
+        while self.peek()[0] == '|':
+            self.take()
+            parts.append(self.conjunction())
+        if self.peek()[0] is not None:
+            raise QueryError(f"unexpected {self.peek()[0]!r}")
+        return parts[0] if len(parts) == 1 else ('or', parts)
+
+    def conjunction(self):
+        parts = [self.sequence()]
+        while self.peek()[0] not in (None, '|', ')'):
+            parts.append(self.sequence())
+        return parts[0] if len(parts) == 1 else ('and', parts)
+
+    def sequence(self):
+        parts = [self.unary()]
+        while self.peek() == ('then', True):
+            self.take()
+            parts.append(self.unary())
+        return parts[0] if len(parts) == 1 else ('then', parts)
+
+    def unary(self):
+        if self.peek()[0] == '-':
+            self.take()
+            return ('not', self.unary())
+        text, is_word = self.take()
+        if text == '(':
+            return self.operation()
+        if not is_word or text == '_':
+            raise QueryError(f"unexpected {text!r}")
+        return self.word(text)
+
+    def word(self, text):
+        m = _WORD.fullmatch(text)
+        if m is None:
+            raise QueryError(f"not a single code: {text!r}")
+        return ('word', m.group(1), m.group(2), bool(m.group(3)))
+
+    def operation(self):
+        text, is_word = self.take()
+        if not is_word or text == '_':
+            raise QueryError("operation pattern needs a head code")
+        head = self.word(text)
+        args = []
+        while True:
+            text, is_word = self.take()
+            if text == ')':
+                return ('op', head, args)
+            if text == '(':
+                args.append(self.operation())
+            elif text == '_':
+                args.append(None)
+            elif is_word:
+                args.append(self.word(text))
+            else:
+                raise QueryError(f"unexpected {text!r} in operation pattern")
+
+
+def parse_query(text):
+    """Parse a query string into a pattern tuple."""
+    return _QueryParser(text).query()
+
+
+def _needs_fetch(pattern):
+    """Whether the posting lists alone could return non-matches."""
+    if pattern[0] == 'then':
+        return True
+    if pattern[0] == 'op':
+        args = pattern[2]
+        return bool(pattern[1][1] or len(args) > 1 or
+                    (args and (args[0] is None or args[0][0] == 'op'
+                               or args[0][1])))
+    if pattern[0] == 'not':
+        return _needs_fetch(pattern[1])
+    if pattern[0] in ('and', 'or'):
+        return any(_needs_fetch(p) for p in pattern[1])
+    return False
+
+
+# ─── Matching ─────────────────────────────────────────────────────────────────
+
+def _word_matches(word, node):
+    if node[0] != 'tok':
+        return False
+    _, prefixes, code, star = word
+    if prefixes and ''.join(node[1]) != prefixes:
+        return False
+    if star:
+        return any(c.startswith(code) for c, _ in node[2])
+    return any(c == code for c, _ in node[2])
+
+
+def _op_matches(pattern, node):
+    if node[0] != 'op' or not _word_matches(pattern[1], node[1]):
+        return False
+    args = node[2]
+    if len(args) < len(pattern[2]):
+        return False
+    for want in pattern[2]:
+        if want is None:
+            continue
+        test = _word_matches if want[0] == 'word' else _op_matches
+        if not any(test(want, arg) for arg in args):
+            return False
+    return True
+
+
+def _contains(pattern, node):
+    test = _word_matches if pattern[0] == 'word' else _op_matches
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if test(pattern, node):
+            return True
+        tag = node[0]
+        if tag in ('op', 'frame'):
+            stack.append(node[1])
+            stack.extend(node[2])
+        elif tag == 'bind':
+            stack.extend(node[1:])
+        elif tag == 'expr':
+            stack.extend(node[1])
+    return False
+
+
+def matches(pattern, statements):
+    """Whether a parsed message satisfies a query pattern exactly."""
+    kind = pattern[0]
+    if kind in ('word', 'op'):
+        return any(_contains(pattern, s) for s in statements)
+    if kind == 'not':
+        return not matches(pattern[1], statements)
+    if kind == 'and':
+        return all(matches(p, statements) for p in pattern[1])
+    if kind == 'or':
+        return any(matches(p, statements) for p in pattern[1])
+    # then: each part matches a statement after the previous part's.
+    i = 0
+    for part in pattern[1]:
+        while i < len(statements) and not matches(part, statements[i:i + 1]):
+            i += 1
+        if i == len(statements):
+            return False
+        i += 1
+    return True
+
+
+# ─── Index ────────────────────────────────────────────────────────────────────
+
+class Index:
+    """A memory-mapped index file."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.count, n_keys, offset = _HEADER.unpack_from(
+            self.map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path}: not an AGNTCL index v{FORMAT_VERSION}")
+        blob = self.map[_HEADER.size:offset].rstrip(b'\0')
+        self.keys = blob.decode().split('\n') if n_keys else []
+        self.slot = {key: i for i, key in enumerate(self.keys)}
+        view = memoryview(self.map)
+        self.starts = view[offset:offset + 8 * (n_keys + 1)].cast('Q')
+        self.base = offset + 8 * (n_keys + 1)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.starts.release()
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def postings(self, key):
+        """Sorted IDs of the messages holding key (empty if none)."""
+        i = self.slot.get(key)
+        if i is None:
+            return _ids(memoryview(b''))
+        lo, hi = self.starts[i], self.starts[i + 1]
+        return _ids(memoryview(self.map)[self.base + 4 * lo:self.base + 4 * hi])
+
+    def expand(self, prefix):
+        """Keys starting with prefix, from the sorted key list."""
+        keys = self.keys
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield keys[i]
+            i += 1
+
+    def _lookup(self, kind, code, star):
+        if not star:
+            return self.postings(kind + code)
+        # c:p.CODE starts with c:p, but its code is CODE: skip prefixed keys.
+        return _or([self.postings(key) for key in self.expand(kind + code)
+                    if key[len(kind):].isalnum()], self.count)
+
+    def _arg(self, head, arg):
+        """Postings for an argument of a (head ...) pattern."""
+        _, _, code, star = arg if arg[0] == 'word' else arg[1]
+        mark = '' if arg[0] == 'word' else '('
+        if head[3]:
+            # Wildcard head: scan the a: keys of every matching head.
+            want = mark + code
+            keys = [key for key in self.expand('a:' + head[2])
+                    if (key.split(' ', 1)[1].startswith(want) if star
+                        else key.split(' ', 1)[1] == want)]
+            return _or([self.postings(key) for key in keys], self.count)
+        return self._lookup(f'a:{head[2]} {mark}', code, star)
+
+    def candidates(self, pattern):
+        """Message IDs the posting lists allow for a pattern."""
+        kind = pattern[0]
+        if kind == 'word':
+            _, prefixes, code, star = pattern
+            return self._lookup('c:' + prefixes, code, star)
+        if kind == 'op':
+            head = pattern[1]
+            ids = self._lookup('h:', head[2], head[3])
+            for arg in pattern[2]:
+                if arg is None:
+                    continue
+                ids = _and(ids, self._arg(head, arg))
+                if arg[0] == 'op':
+                    ids = _and(ids, self.candidates(arg))
+            return ids
+        if kind == 'not':
+            return _not(self.candidates(pattern[1]), self.count)
+        if kind == 'or':
+            return _or([self.candidates(p) for p in pattern[1]], self.count)
+        ids = self.candidates(pattern[1][0])
+        for part in pattern[1][1:]:
+            ids = _and(ids, self.candidates(part))
+        return ids
+
+    def search(self, query, fetch=None):
+        """IDs of the messages matching query, in corpus order, as a list
+        of ints (copied out, so the index can be closed while it is held).
+
+        With fetch (ID -> parsed statements), candidates are verified
+        against the messages; a negated part is then evaluated exactly
+        too, by verifying the whole query rather than its postings.
+        """
+        pattern = parse_query(query) if isinstance(query, str) else query
+        if fetch is None:
+            if _needs_fetch(pattern):
+                raise QueryError("query needs message access (fetch) to be "
+                                 "answered exactly")
+            return self.candidates(pattern).tolist()
+        relaxed = _relax(pattern)
+        ids = range(self.count) if relaxed is None else self.candidates(relaxed)
+        return [int(i) for i in ids if matches(pattern, fetch(int(i)))]
+
+
+def _relax(pattern):
+    """A pattern whose postings hold every exact match of the original:
+    `then` becomes `and`, and negations are dropped (their postings are
+    message-level, so `-A` could exclude a message that only matches A
+    loosely)."""
+    kind = pattern[0]
+    if kind in ('word', 'op'):
+        return pattern
+    if kind == 'not':
+        return None
+    parts = [p for p in map(_relax, pattern[1]) if p is not None]
+    if kind == 'or' and len(parts) < len(pattern[1]):
+        return None
+    if not parts:
+        return None
+    return ('or' if kind == 'or' else 'and', parts)
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('build', help='index AGNTCL messages from stdin')
+    p.add_argument('index')
+    p.add_argument('--archive', help='also archive the messages here')
+    p = sub.add_parser('query', help='print the IDs of matching messages; '
+                                     'then, _, several ARGs and prefixed or '
+                                     'nested ARGs need --archive')
+    p.add_argument('index')
+    p.add_argument('query')
+    p.add_argument('--archive', help='verify candidates against this '
+                                     'archive and print the messages')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        indexer = Indexer()
+        writer = None
+        if args.archive:
+            from agntcl_archive import ArchiveWriter
+            from gen_agntcl import load_assignments
+            writer = ArchiveWriter(args.archive, load_assignments())
+        for line in sys.stdin:
+            if line.strip():
+                statements = parse(line)
+                indexer.add(statements)
+                if writer is not None:
+                    writer.append(statements)
+        if writer is not None:
+            writer.close()
+        indexer.save(args.index)
+        print(f"{indexer.count} messages, {len(indexer.postings)} keys",
+              file=sys.stderr)
+        return
+
+    with Index(args.index) as index:
+        if not args.archive:
+            for message_id in index.search(args.query):
+                print(message_id)
+            return
+        from agntcl_archive import ArchiveReader
+        with ArchiveReader(args.archive) as reader:
+            for message_id in index.search(args.query, reader.__getitem__):
+                print(f"{message_id}\t{reader.text(message_id)}")
+
+
+if __name__ == '__main__':
+    main()
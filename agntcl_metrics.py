@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""Opt-in counters and latency histograms for the encode/decode path.
+
+Metrics.encode() and Metrics.decode() return exactly what encode() and
+decode() do, timing each stage and counting what the codebook resolved:
+
+    encode   tokenize   fold and split into words
+             lookup     codebook probes (dict.get, no fallback)
+             fallback   misses: numbers, §8 compositions with a
+                        ComposingCodeTable, quoted OOV strings
+             classify   tally the tokens by class
+             render     join, attach pending prefixes
+    decode   parse      tokenize and parse
+             classify   tally codes by tier
+             render     AGNTCL -> English
+
+Token classes are tier1-tier4, prefix (a pending `!` from "don't"),
+number, composition, oov and dropped (articles); agntcl_token_ratio
+gives each as a share of encoded words, i.e. the tier hit and OOV rates.
+
+Instrumentation is a separate code path: callers that don't construct a
+Metrics run the plain functions and pay nothing. Registry.render() gives
+Prometheus text format; write() replaces a file atomically, and
+agntcl_server serves it on /metrics. Usage:
+
+    python agntcl_metrics.py [--out FILE] < english
+"""
+
+import argparse
+import os
+import re
+import sys
+from bisect import bisect_left
+from collections import Counter as _Tally
+from time import perf_counter
+
+from agntcl_encoder import _FOLD, attach_prefixes, compile_encoder
+from agntcl_parser import build_inverse, decode_node, parse
+from gen_agntcl import load_assignments
+
+# Seconds; log-spaced from 1 us to 1 s.
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4,
+                   5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25,
+                   0.5, 1.0)
+
+_PREFIXES = re.compile(r'^(?:[pf]\.|[!?~])+')
+
+
+# ─── Metric types ─────────────────────────────────────────────────────────────
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = (f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return '{' + ','.join(pairs) + '}'
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic totals, one per tuple of label values."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values = {}
+
+    def inc(self, labels=(), n=1):
+        values = self.values
+        values[labels] = values.get(labels, 0) + n
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Gauge:
+    """A value computed when rendered: fn() -> {label values: value}."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, labelnames, fn):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.fn = fn
+
+    def samples(self):
+        for labels, value in sorted(self.fn().items()):
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Bucketed observations. Each series keeps per-bucket counts (the
+    last one is +Inf) and the sum; render() makes them cumulative."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.bounds = tuple(buckets)
+        self.series = {}
+
+    def observe(self, value, labels=()):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0.0] + [0] * (len(self.bounds) + 1)
+        series[0] += value
+        series[1 + bisect_left(self.bounds, value)] += 1
+
+    def samples(self):
+        names = self.labelnames + ('le',)
+        for labels, series in sorted(self.series.items()):
+            total = 0
+            for bound, n in zip(self.bounds + (float('inf'),), series[1:]):
+                total += n
+                yield (self.name + '_bucket',
+                       _labels(names, labels + (_number(bound),)), total)
+            yield self.name + '_sum', _labels(self.labelnames, labels), \
+                series[0]
+            yield self.name + '_count', _labels(self.labelnames, labels), total
+
+
+class Registry:
+    """Named metrics, rendered in Prometheus text exposition format."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames, fn):
+        return self.add(Gauge(name, help, labelnames, fn))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.add(Histogram(name, help, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write render() to path, replacing it atomically."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+# ─── Instrumented path ────────────────────────────────────────────────────────
+
+class Metrics:
+    """Instrumented encode()/decode() for one assign_codes() dict."""
+
+    def __init__(self, assignments, registry=None):
+        self.registry = registry = registry or Registry()
+        self.tiers = {code: tier for code, tier in assignments.values()}
+        self.classes = {code: f'tier{tier}' for code, tier in self.tiers.items()}
+        self.classes[''] = 'dropped'
+        self.requests = registry.counter(
+            'agntcl_requests_total', "Texts encoded or decoded.", ('op',))
+        self.seconds = registry.histogram(
+            'agntcl_stage_seconds', "Time spent per stage of one request.",
+            ('op', 'stage'))
+        self.words = registry.counter(
+            'agntcl_words_total', "English words looked up by the encoder.")
+        self.tokens = registry.counter(
+            'agntcl_tokens_total', "Tokens produced (encode) or read "
+            "(decode), by class.", ('op', 'class'))
+        registry.gauge('agntcl_token_ratio', "Share of encoded words per "
+                       "token class: tier hit rates and the OOV rate.",
+                       ('class',), self._ratios)
+
+    def _ratios(self):
+        words = self.words.values.get((), 0)
+        return {(cls,): n / words for (op, cls), n in self.tokens.values.items()
+                if op == 'encode' and words}
+
+    def classify(self, token):
+        """Token class of one encoder output token."""
+        cls = self.classes.get(token)
+        if cls is not None:
+            return cls
+        if token[0] == '"':
+            return 'oov'
+        if token[0] == '~':
+            return 'composition'
+        if token.isdigit() and len(token) > 1:
+            return 'number'
+        code = _PREFIXES.sub('', token)
+        tier = self.tiers.get(code)
+        if tier is None and code:
+            return 'oov'
+        # Codebook tokens are bounded by the table, so caching is safe.
+        cls = self.classes[token] = f'tier{tier}' if code else 'prefix'
+        return cls
+
+    def encode(self, text, table):
+        """encode(text, table), recorded."""
+        observe = self.seconds.observe
+        t0 = perf_counter()
+        words = text.translate(_FOLD).split()
+        t1 = perf_counter()
+        tokens = list(map(table.get, words))
+        t2 = perf_counter()
+        if None in tokens:
+            for i, token in enumerate(tokens):
+                if token is None:
+                    tokens[i] = table[words[i]]
+        t3 = perf_counter()
+        classes = self.classes
+        tally = _Tally(map(classes.get, tokens))
+        if tally.pop(None, 0):
+            missed = [token for token in tokens if token not in classes]
+            tally.update(map(self.classify, missed))
+        inc = self.tokens.inc
+        for cls, n in tally.items():
+            inc(('encode', cls), n)
+        t4 = perf_counter()
+        out = attach_prefixes(' '.join(filter(None, tokens)), table)
+        t5 = perf_counter()
+        self.requests.inc(('encode',))
+        self.words.inc((), len(words))
+        observe(t1 - t0, ('encode', 'tokenize'))
+        observe(t2 - t1, ('encode', 'lookup'))
+        observe(t3 - t2, ('encode', 'fallback'))
+        observe(t4 - t3, ('encode', 'classify'))
+        observe(t5 - t4, ('encode', 'render'))
+        return out
+
+    def decode(self, text, inverse):
+        """decode(text, inverse), recorded."""
+        observe = self.seconds.observe
+        t0 = perf_counter()
+        statements = parse(text)
+        t1 = perf_counter()
+        tally = _Tally()
+        stack = list(statements)
+        while stack:
+            node = stack.pop()
+            tag = node[0]
+            if tag == 'tok':
+                tally.update(self.tiers.get(code) for code, _ in node[2])
+            elif tag == 'num':
+                tally['number'] += 1
+            elif tag == 'str':
+                tally['oov'] += 1
+            elif tag in ('op', 'frame'):
+                stack.append(node[1])
+                stack.extend(node[2])
+            elif tag == 'bind':
+                stack.extend(node[1:])
+            else:
+                stack.extend(node[1])
+        inc = self.tokens.inc
+        for tier, n in tally.items():
+            inc(('decode', tier if isinstance(tier, str) else
+                 'oov' if tier is None else f'tier{tier}'), n)
+        t2 = perf_counter()
+        out = ' '.join(decode_node(s, inverse) for s in statements)
+        t3 = perf_counter()
+        self.requests.inc(('decode',))
+        observe(t1 - t0, ('decode', 'parse'))
+        observe(t2 - t1, ('decode', 'classify'))
+        observe(t3 - t2, ('decode', 'render'))
+        return out
+
+    def render(self):
+        return self.registry.render()
+
+    def write(self, path):
+        self.registry.write(path)
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--out', help='write the metrics here, not stdout')
+    args = parser.parse_args()
+    assignments = load_assignments()
+    metrics = Metrics(assignments)
+    table = compile_encoder(assignments)
+    inverse = build_inverse(assignments)
+    for line in sys.stdin:
+        if line.strip():
+            metrics.decode(metrics.encode(line, table), inverse)
+    if args.out:
+        metrics.write(args.out)
+    else:
+        sys.stdout.write(metrics.render())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Inflection table: English word forms -> prefixed AGNTCL tokens.
+
+The vocabulary holds base forms only. Rule 3 drops plurals and Rule 4
+marks tense with a prefix, so every inflected form already has an exact
+encoding:
+
+    files -> nz      wrote -> p.fg      running -> fa      don't -> !
+
+inflection_table() spells out those forms once, from the vocabulary and
+its word categories, with spelling rules for regular forms and tables
+for irregular ones. The encoder merges the result into its CodeTable, so
+an inflected word costs the same single dict probe as a base word and no
+stemmer runs on the hot path. Usage: python agntcl_morph.py WORD ...
+"""
+
+import re
+import sys
+
+from gen_agntcl import build_word_list, load_assignments
+
+# Categories whose words take plural / verb endings. Tech words are
+# mostly both (`commit`, `deploy`, `parse`).
+NOUN_CATEGORIES = ('noun', 'tech')
+VERB_CATEGORIES = ('verb', 'tech')
+
+# Tier-1 words carry no category; these are its verbs.
+TIER1_VERBS = ('do', 'say', 'make', 'know', 'be', 'have', 'go', 'give',
+               'get', 'like')
+
+# Past and participle forms, all encoded as `p.` + the base code.
+IRREGULAR_PAST = {
+    'be': 'was were been', 'bear': 'bore borne', 'beat': 'beaten',
+    'become': 'became', 'begin': 'began begun', 'break': 'broke broken',
+    'bring': 'brought', 'build': 'built', 'buy': 'bought',
+    'catch': 'caught', 'choose': 'chose chosen', 'come': 'came',
+    'cost': 'cost', 'cut': 'cut', 'deal': 'dealt', 'do': 'did done',
+    'draw': 'drew drawn', 'drink': 'drank drunk', 'drive': 'drove driven',
+    'eat': 'ate eaten', 'fall': 'fell fallen', 'feed': 'fed',
+    'feel': 'felt', 'fight': 'fought', 'find': 'found',
+    'fly': 'flew flown', 'forget': 'forgot forgotten', 'get': 'got gotten',
+    'give': 'gave given', 'go': 'went gone', 'grow': 'grew grown',
+    'hang': 'hung', 'have': 'had', 'hear': 'heard', 'hide': 'hid hidden',
+    'hit': 'hit', 'hold': 'held', 'hurt': 'hurt', 'keep': 'kept',
+    'know': 'knew known', 'lay': 'laid', 'lead': 'led', 'leave': 'left',
+    'lend': 'lent', 'let': 'let', 'lie': 'lay lain', 'lose': 'lost',
+    'make': 'made', 'mean': 'meant', 'meet': 'met', 'pay': 'paid',
+    'put': 'put', 'read': 'read', 'ring': 'rang rung', 'rise': 'rose risen',
+    'run': 'ran', 'say': 'said', 'see': 'saw seen', 'seek': 'sought',
+    'sell': 'sold', 'send': 'sent', 'set': 'set', 'shake': 'shook shaken',
+    'shoot': 'shot', 'shut': 'shut', 'sing': 'sang sung', 'sit': 'sat',
+    'sleep': 'slept', 'speak': 'spoke spoken', 'spend': 'spent',
+    'spread': 'spread', 'stand': 'stood', 'steal': 'stole stolen',
+    'stick': 'stuck', 'strike': 'struck', 'take': 'took taken',
+    'teach': 'taught', 'tell': 'told', 'think': 'thought',
+    'throw': 'threw thrown', 'understand': 'understood',
+    'wake': 'woke woken', 'wear': 'wore worn', 'win': 'won',
+    'write': 'wrote written',
+}
+
+# Present forms the -s rule gets wrong.
+IRREGULAR_PRESENT = {'be': 'am is are', 'have': 'has', 'do': 'does',
+                     'go': 'goes'}
+
+IRREGULAR_PLURAL = {
+    'analysis': 'analyses', 'basis': 'bases', 'child': 'children',
+    'crisis': 'crises', 'criterion': 'criteria', 'foot': 'feet',
+    'half': 'halves', 'index': 'indices', 'knife': 'knives',
+    'leaf': 'leaves', 'life': 'lives', 'man': 'men', 'matrix': 'matrices',
+    'medium': 'media', 'mouse': 'mice', 'person': 'people',
+    'phenomenon': 'phenomena', 'self': 'selves', 'shelf': 'shelves',
+    'thesis': 'theses', 'tooth': 'teeth', 'vertex': 'vertices',
+    'wife': 'wives', 'wolf': 'wolves', 'woman': 'women',
+}
+
+# Two-syllable verbs stressed on the last syllable double its consonant.
+DOUBLE_FINAL = {'admit', 'commit', 'control', 'equip', 'forget', 'occur',
+                'omit', 'permit', 'prefer', 'refer', 'regret', 'submit',
+                'transfer'}
+
+# Negated auxiliaries: prefix, then the base word whose code follows it.
+# A missing base leaves the prefix pending: it attaches to the next token
+# (`don't know` -> `!j`, `didn't know` -> `!p.j`), see agntcl_encoder.
+NEGATIONS = {
+    "don't": ('!', None), "doesn't": ('!', None), "didn't": ('!p.', None),
+    "won't": ('!f.', None), "shan't": ('!f.', None),
+    "can't": ('!', 'can'), "cannot": ('!', 'can'),
+    "couldn't": ('!', 'could'), "shouldn't": ('!', 'should'),
+    "wouldn't": ('!', 'would'), "mustn't": ('!', 'must'),
+    "needn't": ('!', 'need'), "isn't": ('!', 'be'), "aren't": ('!', 'be'),
+    "ain't": ('!', 'be'), "wasn't": ('!p.', 'be'), "weren't": ('!p.', 'be'),
+    "haven't": ('!', 'have'), "hasn't": ('!', 'have'),
+    "hadn't": ('!p.', 'have'),
+}
+
+_SHORT_CVC = re.compile(r'[^aeiou]*[aeiou][b-df-hj-np-tvz]')
+
+
+# ─── Spelling rules ───────────────────────────────────────────────────────────
+
+def plural(word):
+    """Regular plural / third person singular: box -> boxes, city -> cities."""
+    if word.endswith(('s', 'x', 'z', 'ch', 'sh')):
+        return word + 'es'
+    if word.endswith('y') and word[-2:-1] not in 'aeiou':
+        return word[:-1] + 'ies'
+    return word + 's'
+
+
+def _doubles(word):
+    return word in DOUBLE_FINAL or _SHORT_CVC.fullmatch(word) is not None
+
+
+def past(word):
+    """Regular past: stop -> stopped, try -> tried, save -> saved."""
+    if word.endswith('e'):
+        return word + 'd'
+    if word.endswith('y') and word[-2:-1] not in 'aeiou':
+        return word[:-1] + 'ied'
+    if _doubles(word):
+        return word + word[-1] + 'ed'
+    return word + 'ed'
+
+
+def gerund(word):
+    """-ing form: run -> running, make -> making, die -> dying."""
+    if word.endswith('ie'):
+        return word[:-2] + 'ying'
+    if word.endswith('e') and not word.endswith(('ee', 'ye', 'oe')):
+        return word[:-1] + 'ing'
+    if _doubles(word):
+        return word + word[-1] + 'ing'
+    return word + 'ing'
+
+
+# ─── Table ────────────────────────────────────────────────────────────────────
+
+def inflection_table(assignments, words=None):
+    """Map inflected forms of vocabulary words to AGNTCL tokens.
+
+    `words` supplies (english, category) pairs (default: the built-in
+    list). Forms that are vocabulary words themselves are left out, so a
+    word like `left` keeps its own code; among inflections, irregular
+    forms win over regular ones.
+    """
+    codes = {english: code for english, (code, tier) in assignments.items()}
+    if words is None:
+        words = build_word_list()
+    nouns = set()
+    verbs = {w for w in TIER1_VERBS if w in codes}
+    for english, category in words:
+        if english in codes:
+            if category in NOUN_CATEGORIES:
+                nouns.add(english)
+            if category in VERB_CATEGORIES:
+                verbs.add(english)
+    verbs.update(w for w in IRREGULAR_PAST if w in codes)
+
+    table = {}
+
+    def add(form, token):
+        if form not in codes and form not in table:
+            table[form] = token
+
+    for form, (prefix, base) in NEGATIONS.items():
+        if base is None:
+            add(form, prefix)
+        elif base in codes:
+            add(form, prefix + codes[base])
+    for base, forms in IRREGULAR_PAST.items():
+        if base in codes:
+            for form in forms.split():
+                add(form, 'p.' + codes[base])
+    for base, forms in IRREGULAR_PRESENT.items():
+        if base in codes:
+            for form in forms.split():
+                add(form, codes[base])
+    for base, form in IRREGULAR_PLURAL.items():
+        if base in codes:
+            add(form, codes[base])
+    for base in sorted(verbs):
+        code = codes[base]
+        add(plural(base), code)
+        add(gerund(base), code)
+        if base not in IRREGULAR_PAST:
+            add(past(base), 'p.' + code)
+    for base in sorted(nouns):
+        add(plural(base), codes[base])
+    return table
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    assignments = load_assignments()
+    table = inflection_table(assignments)
+    print(f"{len(table)} inflected forms", file=sys.stderr)
+    for word in sys.argv[1:]:
+        word = word.lower()
+        if word in assignments:
+            print(f"{word}: {assignments[word][0]} (base form)")
+        elif word in table:
+            print(f"{word}: {table[word]}")
+        else:
+            print(f"{word}: not in the table")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Multi-process English -> AGNTCL encoding of large line-oriented files.
+
+The input is cut into byte ranges that end on line boundaries; each range
+is encoded by a worker process, one AGNTCL line per English line, and the
+results are written back in input order. The compiled CodeTable is built
+once in the parent: forked workers inherit it, spawned workers receive it
+once through the pool initializer.
+
+Usage: python agntcl_parallel.py INPUT OUTPUT [--workers N] [--chunk-mb M]
+"""
+
+import argparse
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from agntcl_encoder import default_encoder, encode
+
+# Bytes of input per task; large enough to amortize the IPC round trip.
+CHUNK_SIZE = 16 << 20
+
+# Set in the parent before the pool starts (fork) or by _init (spawn).
+_table = None
+
+
+def _init(table):
+    global _table
+    _table = table
+
+
+# ─── Sharding ─────────────────────────────────────────────────────────────────
+
+def line_ranges(path, chunk_size=CHUNK_SIZE):
+    """Yield (start, end) byte ranges of `path` that end on a newline."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            if f.tell() < size:
+                f.readline()
+            end = f.tell()
+            yield start, end
+            start = end
+
+
+def encode_lines(data, table):
+    """Encode UTF-8 English bytes line by line; return AGNTCL bytes.
+
+    Lines end at LF only. str.splitlines() would also split on form feeds,
+    U+0085, U+2028 and other separators, and the output would then have
+    more lines than the input.
+    """
+    lines = data.decode().split('\n')
+    if not lines[-1]:
+        lines.pop()                 # the text after the final newline
+    return ''.join([encode(line, table) + '\n' for line in lines]).encode()
+
+
+def _encode_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return encode_lines(f.read(end - start), _table)
+
+
+# ─── Driver ───────────────────────────────────────────────────────────────────
+
+def encode_file(src, dst, workers=None, chunk_size=CHUNK_SIZE, table=None):
+    """Encode file `src` into `dst` with a process pool; return bytes out.
+
+    At most 2 * workers ranges are in flight, so memory stays bounded no
+    matter how large the input is.
+    """
+    global _table
+    workers = workers or os.cpu_count() or 1
+    table = table if table is not None else default_encoder()
+    if multiprocessing.get_start_method() == 'fork':
+        _table = table
+        pool = ProcessPoolExecutor(workers)
+    else:
+        pool = ProcessPoolExecutor(workers, initializer=_init,
+                                   initargs=(table,))
+    written = 0
+    with pool, open(dst, 'wb') as out:
+        pending = deque()
+        for start, end in line_ranges(src, chunk_size):
+            if len(pending) >= 2 * workers:
+                written += out.write(pending.popleft().result())
+            pending.append(pool.submit(_encode_range, src, start, end))
+        while pending:
+            written += out.write(pending.popleft().result())
+    return written
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: all cores)')
+    parser.add_argument('--chunk-mb', type=float, default=CHUNK_SIZE / 2**20,
+                        help='input MiB per task')
+    args = parser.parse_args()
+    encode_file(args.input, args.output, args.workers,
+                int(args.chunk_mb * 2**20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Single-pass tokenizer, recursive-descent parser and decoder for AGNTCL (§10)."""
+
+import re
+import sys
+
+from gen_agntcl import load_assignments
+
+# ─── AST ──────────────────────────────────────────────────────────────────────
+# Nodes are plain tuples tagged by their first element:
+#
+#   ('op', head, args)        (head arg ...)
+#   ('frame', head, args)     {head arg ...}
+#   ('bind', ref, value)      ref -> value
+#   ('expr', items)           token/literal run at statement level
+#   ('tok', prefixes, words)  prefixes: tuple of 'p.' 'f.' '!' '?' '~'
+#                             words: tuple of (code, n) — n is the reference
+#                             number, or None; 2+ words = ':' composition
+#   ('str', text)             "text"
+#   ('num', digits)           2+ digit literal number
+#
+# A message parses to a list of statements.
+
+
+class ParseError(ValueError):
+    """Malformed AGNTCL input, with the character offset where it failed."""
+
+    def __init__(self, message, pos):
+        super().__init__(f"{message} at offset {pos}")
+        self.pos = pos
+
+
+# ─── Tokenizer ────────────────────────────────────────────────────────────────
+# Every alternative is selected by its first character, so the scanner never
+# revisits input: whitespace, one of ( ) { }, the -> operator, a quoted
+# string, or a word with its prefixes peeled off.
+
+LPAREN, RPAREN, LBRACE, RBRACE, ARROW, STRING, WORD = range(1, 8)
+
+_SCAN = re.compile(r'''
+    \s*
+    (?:
+        (\() | (\)) | (\{) | (\}) | (->)
+      | "([^"]*)"
+      | ((?:[pf]\.|[!?~])*) ([^\s(){}"]+)
+    )
+''', re.X)
+
+_PREFIX = re.compile(r'[pf]\.|[!?~]')
+_SPACE = re.compile(r'\s*')
+
+
+def tokenize(text):
+    """Yield (kind, value, pos) tuples. WORD values are (prefixes, body)."""
+    pos = 0
+    end = len(text.rstrip())
+    match = _SCAN.match
+    while pos < end:
+        m = match(text, pos)
+        if m is None:
+            raise ParseError("unexpected character",
+                             _SPACE.match(text, pos).end())
+        kind = m.lastindex
+        if kind == WORD + 1:
+            yield WORD, (m.group(WORD), m.group(WORD + 1)), m.start(WORD)
+        elif kind == STRING:
+            yield STRING, m.group(STRING), m.start(STRING) - 1
+        else:
+            yield kind, None, m.start(kind)
+        pos = m.end()
+
+
+def parse_word(prefixes, body, pos=0):
+    """Turn a scanned word into a 'tok' or 'num' node."""
+    if not prefixes and ':' not in body and not body[-1].isdigit():
+        return ('tok', (), ((body, None),))
+    if body.isdigit() and len(body) > 1:
+        if prefixes or ':' in body:
+            raise ParseError("number cannot take a prefix", pos)
+        return ('num', body)
+    words = []
+    for part in body.split(':'):
+        if not part:
+            raise ParseError("empty composition part", pos)
+        stem = part.rstrip('0123456789')
+        if stem and stem != part:
+            words.append((stem, int(part[len(stem):])))
+        else:
+            words.append((part, None))
+    return ('tok', tuple(_PREFIX.findall(prefixes)) if prefixes else (),
+            tuple(words))
+
+
+# ─── Parser ───────────────────────────────────────────────────────────────────
+
+class _Parser:
+    """Recursive descent over tokenize() with one token of lookahead."""
+
+    __slots__ = ('tokens', 'kind', 'value', 'pos', 'end')
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.end = len(text)
+        self.advance()
+
+    def advance(self):
+        self.kind, self.value, self.pos = next(self.tokens,
+                                               (None, None, self.end))
+
+    def atom(self):
+        """Current WORD or STRING as a node; advances."""
+        kind, value, pos = self.kind, self.value, self.pos
+        self.advance()
+        if kind == WORD:
+            return parse_word(value[0], value[1], pos)
+        return ('str', value)
+
+    def group(self, tag, close):
+        """Parse after an opening delimiter up to the matching close."""
+        self.advance()
+        if self.kind != WORD:
+            raise ParseError(f"{tag} must start with a token", self.pos)
+        head = self.atom()
+        if head[0] != 'tok':
+            raise ParseError(f"{tag} head must be a token", self.pos)
+        args = []
+        while self.kind != close:
+            if self.kind in (WORD, STRING):
+                args.append(self.atom())
+            elif self.kind == LPAREN:
+                args.append(self.group('op', RPAREN))
+            elif self.kind == LBRACE:
+                args.append(self.group('frame', RBRACE))
+            elif self.kind is None:
+                raise ParseError(f"unterminated {tag}", self.pos)
+            else:
+                raise ParseError("unexpected token", self.pos)
+        self.advance()
+        return (tag, head, tuple(args))
+
+    def message(self):
+        statements = []
+        items = []
+        while self.kind is not None:
+            kind = self.kind
+            if kind in (WORD, STRING):
+                items.append(self.atom())
+                continue
+            if kind == ARROW:
+                # The last expression item is the reference being bound.
+                pos = self.pos
+                if not items or not _is_reference(items[-1]):
+                    raise ParseError("'->' must follow a reference", pos)
+                ref = items.pop()
+                self.advance()
+                if self.kind == LPAREN:
+                    value = self.group('op', RPAREN)
+                elif self.kind in (WORD, STRING):
+                    value = self.atom()
+                    if value[0] == 'tok':
+                        raise ParseError("binding needs a literal or "
+                                         "operation", pos)
+                else:
+                    raise ParseError("binding needs a literal or operation",
+                                     pos)
+                if items:
+                    statements.append(('expr', tuple(items)))
+                    items = []
+                statements.append(('bind', ref, value))
+                continue
+            if items:
+                statements.append(('expr', tuple(items)))
+                items = []
+            if kind == LPAREN:
+                statements.append(self.group('op', RPAREN))
+            elif kind == LBRACE:
+                statements.append(self.group('frame', RBRACE))
+            else:
+                raise ParseError("unbalanced closing delimiter", self.pos)
+        if items:
+            statements.append(('expr', tuple(items)))
+        return statements
+
+
+def _is_reference(node):
+    return (node[0] == 'tok' and not node[1] and len(node[2]) == 1
+            and node[2][0][1] is not None)
+
+
+def parse(text):
+    """Parse an AGNTCL message into a list of statement nodes."""
+    return _Parser(text).message()
+
+
+class _NodeParser(_Parser):
+    """The same grammar over a token stream whose WORD and STRING values
+    are finished nodes."""
+
+    __slots__ = ()
+
+    def __init__(self, tokens, end):
+        self.tokens = tokens
+        self.end = end
+        self.advance()
+
+    def atom(self):
+        node = self.value
+        self.advance()
+        return node
+
+
+def parse_tokens(tokens, end):
+    """Parse (kind, node, pos) tokens from another scanner, such as the
+    binary one in agntcl_wire; `end` is the position reported at EOF."""
+    return _NodeParser(tokens, end).message()
+
+
+# ─── Unparsing ────────────────────────────────────────────────────────────────
+
+def unparse_node(node):
+    """Render one node back to canonical AGNTCL text."""
+    tag = node[0]
+    if tag == 'tok':
+        return ''.join(node[1]) + ':'.join(
+            code if n is None else f"{code}{n}" for code, n in node[2])
+    if tag == 'str':
+        return '"' + node[1] + '"'
+    if tag == 'num':
+        return node[1]
+    if tag == 'op':
+        return '(' + ' '.join([unparse_node(node[1])] +
+                              [unparse_node(a) for a in node[2]]) + ')'
+    if tag == 'frame':
+        return '{' + ' '.join([unparse_node(node[1])] +
+                              [unparse_node(a) for a in node[2]]) + '}'
+    if tag == 'bind':
+        return unparse_node(node[1]) + ' -> ' + unparse_node(node[2])
+    return ' '.join(unparse_node(item) for item in node[1])
+
+
+def unparse(statements):
+    """Render a parsed message back to canonical AGNTCL text."""
+    return ' '.join(unparse_node(s) for s in statements)
+
+
+# ─── Decoding ─────────────────────────────────────────────────────────────────
+
+# How each prefix reads in English, applied outermost first.
+PREFIX_GLOSS = {'p.': 'did ', 'f.': 'will ', '!': 'not ', '?': 'do ',
+                '~': 'like '}
+
+
+def build_inverse(assignments):
+    """Invert assign_codes(): code -> english."""
+    return {code: english for english, (code, tier) in assignments.items()}
+
+
+def decode_node(node, inverse):
+    """Render one node as English, keeping the AGNTCL structure."""
+    tag = node[0]
+    if tag == 'tok':
+        words = ':'.join(inverse.get(code, code) if n is None
+                         else f"{inverse.get(code, code)}{n}"
+                         for code, n in node[2])
+        return ''.join(PREFIX_GLOSS[p] for p in node[1]) + words
+    if tag == 'str':
+        return '"' + node[1] + '"'
+    if tag == 'num':
+        return node[1]
+    if tag == 'op':
+        return '(' + ' '.join([decode_node(node[1], inverse)] +
+                              [decode_node(a, inverse) for a in node[2]]) + ')'
+    if tag == 'frame':
+        return '{' + ' '.join([decode_node(node[1], inverse)] +
+                              [decode_node(a, inverse) for a in node[2]]) + '}'
+    if tag == 'bind':
+        return (decode_node(node[1], inverse) + ' -> ' +
+                decode_node(node[2], inverse))
+    return ' '.join(decode_node(item, inverse) for item in node[1])
+
+
+def decode(text, inverse):
+    """Parse an AGNTCL message and render it as English."""
+    return ' '.join(decode_node(s, inverse) for s in parse(text))
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    inverse = build_inverse(load_assignments())
+    for line in sys.stdin:
+        if line.strip():
+            print(decode(line, inverse))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Longest-match phrase encoding with a compiled token automaton.
+
+Frequent English phrases have a shorter AGNTCL rendering than their words
+encoded one by one:
+
+    does not    -> !          (not `<does> s`)
+    in order to -> n          (not `v <order> n`)
+
+Only phrases that mean the same wherever they occur belong here. The
+matcher sees folded words, not punctuation or sentence position, so it
+cannot tell "is it" in a question from "this is it", "going to" a verb
+from "going to the store", or "due to" as "because of" from "due to the
+bank"; such phrases are left word by word.
+
+PHRASES maps each phrase to a template of vocabulary words with prefixes.
+PhraseEncoder compiles the templates against a CodeTable, builds a trie
+over the phrase words, and turns it into a deterministic transducer:
+for every trie node and every word that occurs in some phrase, the table
+holds the state to move to and the (constant) output that the move
+settles. Matching is leftmost-longest, as if the longest phrase starting
+at each position were taken, but each input word is looked up exactly
+once and never revisited. Words outside every phrase fall through to the
+ordinary CodeTable. Usage: python agntcl_phrases.py < english
+"""
+
+import re
+import sys
+from itertools import chain
+
+from agntcl_encoder import (attach_prefixes, default_encoder, hold_pending,
+                            iter_words, read_chunks)
+
+# English phrase (folded, space-separated) -> template. A template item is
+# prefixes plus a vocabulary word; a bare prefix (`f.`, `!p.`) is pending
+# and attaches to the next token, like the negations in agntcl_morph.
+PHRASES = {
+    # Negation (Rule 5) and tense (Rule 4) spelled out in full.
+    'do not': '!',
+    'does not': '!',
+    'did not': '!p.',
+    'will not': '!f.',
+    'is not': '!be',
+    'are not': '!be',
+    'have not': '!have',
+    'has not': '!have',
+    'will be': 'f.be',
+    'has been': 'p.be',
+    'have been': 'p.be',
+    'had been': 'p.be',
+    # Multi-word function words with a one-word equivalent.
+    'in order to': 'to',
+    'so as to': 'to',
+    'a lot of': 'many',
+    'lots of': 'many',
+    'because of': 'because',
+    'at the moment': 'now',
+}
+
+_ITEM = re.compile(r'((?:[pf]\.|[!?~])*)(.*)')
+
+
+def compile_template(template, table):
+    """Resolve a template to AGNTCL text, or None if a word is missing."""
+    tokens = []
+    for item in template.split():
+        prefixes, word = _ITEM.fullmatch(item).groups()
+        if not word:
+            tokens.append(prefixes)
+            continue
+        code = table[word]
+        if not code or code.startswith('"'):
+            return None
+        tokens.append(prefixes + code)
+    return ' '.join(tokens)
+
+
+# ─── Automaton ────────────────────────────────────────────────────────────────
+
+class PhraseEncoder:
+    """CodeTable encoding with leftmost-longest phrase substitution."""
+
+    def __init__(self, table, phrases=PHRASES):
+        self.table = table
+        children = [{}]
+        paths = [()]
+        output = [None]
+        for phrase, template in phrases.items():
+            text = compile_template(template, table)
+            if text is None:
+                continue
+            node = 0
+            for word in phrase.split():
+                nxt = children[node].get(word)
+                if nxt is None:
+                    nxt = len(children)
+                    children[node][word] = nxt
+                    children.append({})
+                    paths.append(paths[node] + (word,))
+                    output.append(None)
+                node = nxt
+            output[node] = text
+
+        # Longest phrase ending on the path to each node: (depth, text).
+        best = [None] * len(children)
+        for node in sorted(range(len(children)), key=lambda n: len(paths[n])):
+            for word, child in children[node].items():
+                best[child] = ((len(paths[child]), output[child])
+                               if output[child] is not None else best[node])
+
+        self._children = children
+        self._paths = paths
+        self._best = best
+        self._memo = {}
+        alphabet = {w for path in paths for w in path}
+        # trans[node][word] -> (settled output, next node)
+        self.trans = [{word: self._step(node, word) for word in alphabet}
+                      for node in range(len(children))]
+        self.flush = [self._finish(node) for node in range(len(children))]
+
+    def _settle(self, node):
+        """Output settled when the path to node can't be extended, and the
+        words left over to rescan from the root (at build time only)."""
+        path = self._paths[node]
+        best = self._best[node]
+        if best is not None:
+            return [best[1]], path[best[0]:]
+        return [self.table[path[0]]], path[1:]
+
+    def _step(self, node, word):
+        key = (node, word)
+        if key not in self._memo:
+            child = self._children[node].get(word)
+            if child is not None:
+                self._memo[key] = ('', child)
+            elif not node:
+                self._memo[key] = (self.table[word], 0)
+            else:
+                out, rest = self._settle(node)
+                state = 0
+                for w in rest + (word,):
+                    text, state = self._step(state, w)
+                    out.append(text)
+                self._memo[key] = (' '.join(filter(None, out)), state)
+        return self._memo[key]
+
+    def _finish(self, node):
+        """Output for the end of input while in node."""
+        out = []
+        while node:
+            settled, rest = self._settle(node)
+            out.extend(settled)
+            node = 0
+            for w in rest:
+                text, node = self._step(node, w)
+                out.append(text)
+        return ' '.join(filter(None, out))
+
+    def encode_words(self, words, state=0):
+        """Encode folded words; return (AGNTCL text, unsettled state)."""
+        trans = self.trans
+        lookup = self.table.__getitem__
+        out = []
+        append = out.append
+        for word in words:
+            hit = trans[state].get(word)
+            if hit is None:
+                if state:
+                    append(self.flush[state])
+                    state = 0
+                append(lookup(word))
+            else:
+                text, state = hit
+                append(text)
+        return ' '.join(filter(None, out)), state
+
+    def encode(self, text):
+        """Encode one complete English text to a single AGNTCL line."""
+        words = chain.from_iterable(iter_words((text,)))
+        out, state = self.encode_words(words)
+        if state:
+            out = ' '.join(filter(None, (out, self.flush[state])))
+        return attach_prefixes(out, self.table)
+
+    def encode_stream(self, chunks):
+        """Encode text chunks, yielding fragments; see encode_stream()."""
+        state = 0
+        held = ''
+        sep = ''
+        for words in iter_words(chunks):
+            out, state = self.encode_words(words, state)
+            if held:
+                out = held + ' ' + out if out else held
+            out, held = hold_pending(out)
+            if out:
+                yield sep + attach_prefixes(out, self.table)
+                sep = ' '
+        out = ' '.join(filter(None, (held, self.flush[state])))
+        if out:
+            yield sep + attach_prefixes(out, self.table)
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    encoder = PhraseEncoder(default_encoder())
+    for fragment in encoder.encode_stream(read_chunks(sys.stdin)):
+        sys.stdout.write(fragment)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
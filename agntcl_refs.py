@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Automatic §6 reference binding for repeated literals.
+
+An LZ-style dictionary pass over one parsed message. Every subtree is
+hash-consed to an integer ID in a single post-order walk, which also
+yields its occurrence count and printed size. Repeated quoted strings and
+numbers then become bindings:
+
+    (copy "/src/app.py" "/tmp/a") (test "/src/app.py")
+ -> x1 -> "/src/app.py" (copy x1 "/tmp/a") (test x1)
+
+Only literals are bound. A binding runs its value once (§7 Pattern 6),
+so binding a repeated operation would run it once instead of at every
+use, before statements that came ahead of it. Each binding is placed
+just before the statement that first uses its literal, and is kept
+only if it saves bytes once the reference name is known. The cost is
+linear in the message size. Usage: python agntcl_refs.py < messages
+"""
+
+import sys
+
+from agntcl_parser import parse, unparse
+from gen_agntcl import load_assignments
+
+# Bindable node kinds: literals, which evaluate the same wherever they
+# are written.
+BINDABLE = ('str', 'num')
+
+# "ref -> value" plus the space separating it from the next statement.
+BIND_OVERHEAD = len(' -> ') + 1
+
+
+def default_base(assignments=None):
+    """Reference base code: 'it', a one-character tier-1 code."""
+    assignments = assignments or load_assignments()
+    return assignments['it'][0]
+
+
+# ─── Hash-consing ─────────────────────────────────────────────────────────────
+
+class _Interner:
+    """Post-order hash-consing of an AST into a DAG of integer IDs."""
+
+    def __init__(self):
+        self.ids = {}
+        self.nodes = []      # id -> original node
+        self.children = []   # id -> tuple of child ids (with repeats)
+        self.size = []       # id -> printed length
+        self.count = []      # id -> occurrences in the message
+        self.pinned = []     # id -> must stay in place (statements)
+        self.first = []      # id -> index of the statement it first occurs in
+        self.statement = 0   # index of the statement being interned
+        self.refs = set()    # (code, n) pairs the message already uses
+
+    def _add(self, key, node, children, size, pinned=False):
+        nid = self.ids.get(key) if not pinned else None
+        if nid is None:
+            nid = len(self.nodes)
+            if not pinned:
+                self.ids[key] = nid
+            self.nodes.append(node)
+            self.children.append(children)
+            self.size.append(size)
+            self.count.append(0)
+            self.pinned.append(pinned)
+            self.first.append(self.statement)
+        self.count[nid] += 1
+        return nid
+
+    def node(self, node, pinned=False):
+        tag = node[0]
+        if tag == 'tok':
+            for code, n in node[2]:
+                if n is not None:
+                    self.refs.add((code, n))
+            size = (sum(map(len, node[1])) + len(node[2]) - 1 +
+                    sum(len(code) + (0 if n is None else len(str(n)))
+                        for code, n in node[2]))
+            return self._add(node, node, (), size)
+        if tag == 'str':
+            return self._add(node, node, (), len(node[1]) + 2, pinned)
+        if tag == 'num':
+            return self._add(node, node, (), len(node[1]), pinned)
+        if tag in ('op', 'frame'):
+            kids = (self.node(node[1]),) + tuple(self.node(a) for a in node[2])
+            size = 1 + sum(self.size[k] for k in kids) + len(kids)
+            return self._add((tag, kids), node, kids, size, pinned)
+        if tag == 'bind':
+            kids = (self.node(node[1]), self.node(node[2], pinned=True))
+            size = self.size[kids[0]] + 4 + self.size[kids[1]]
+            return self._add(None, node, kids, size, pinned=True)
+        kids = tuple(self.node(item) for item in node[1])
+        size = sum(self.size[k] for k in kids) + len(kids) - 1
+        return self._add(None, node, kids, size, pinned=True)
+
+
+# ─── Binding ──────────────────────────────────────────────────────────────────
+
+def bind_repeats(statements, base):
+    """Rewrite repeated literals as bindings; return (statements, saved).
+
+    `saved` is the number of bytes the canonical text shrinks by. If
+    nothing pays off, the statements come back unchanged with saved == 0.
+    """
+    dag = _Interner()
+    roots = []
+    for i, statement in enumerate(statements):
+        dag.statement = i
+        roots.append(dag.node(statement, pinned=True))
+
+    # Post-order interning numbers subtrees in order of first occurrence,
+    # so reference numbers follow the order the bindings are written in.
+    next_n = _ref_numbers(base, dag.refs)
+    n = next(next_n)
+    names = {}
+    for nid, node in enumerate(dag.nodes):
+        if (dag.count[nid] > 1 and not dag.pinned[nid]
+                and node[0] in BINDABLE
+                and _saves(dag.count[nid], dag.size[nid],
+                           len(base) + len(str(n)))):
+            names[nid] = ('tok', (), ((base, n),))
+            n = next(next_n)
+    if not names:
+        return statements, 0
+
+    bindings = [[] for _ in roots]
+    for nid, name in names.items():
+        bindings[dag.first[nid]].append(('bind', name, dag.nodes[nid]))
+    rewritten = []
+    for i, root in enumerate(roots):
+        rewritten += bindings[i]
+        rewritten.append(_rebuild(dag, root, names, top=True))
+    saved = len(unparse(statements)) - len(unparse(rewritten))
+    if saved <= 0:
+        return statements, 0
+    return rewritten, saved
+
+
+def _saves(k, size, ref_len):
+    """Whether binding k copies of a `size`-byte value saves bytes."""
+    return (k - 1) * size - (k + 1) * ref_len - BIND_OVERHEAD > 0
+
+
+def _ref_numbers(base, used):
+    n = 1
+    while True:
+        if (base, n) not in used:
+            yield n
+        n += 1
+
+
+def _rebuild(dag, nid, names, top=False):
+    if not top and nid in names:
+        return names[nid]
+    node = dag.nodes[nid]
+    kids = dag.children[nid]
+    if not kids:
+        return node
+    tag = node[0]
+    if tag in ('op', 'frame'):
+        return (tag, _rebuild(dag, kids[0], names),
+                tuple(_rebuild(dag, k, names) for k in kids[1:]))
+    if tag == 'bind':
+        return ('bind', node[1], _rebuild(dag, kids[1], names, top=True))
+    return ('expr', tuple(_rebuild(dag, k, names) for k in kids))
+
+
+def bind_message(text, base):
+    """Parse, bind repeats, and unparse one message; return (text, saved)."""
+    statements, saved = bind_repeats(parse(text), base)
+    return (unparse(statements) if saved else text), saved
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    base = default_base()
+    total = 0
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        text, saved = bind_message(line.strip(), base)
+        total += saved
+        print(text)
+        print(f"saved {saved} bytes", file=sys.stderr)
+    print(f"total saved {total} bytes", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
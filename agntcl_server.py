@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Asyncio HTTP/1.1 translation service for AGNTCL.
+
+    POST /encode            English body   -> AGNTCL (text/plain)
+    POST /decode            AGNTCL body    -> English (text/plain)
+    GET  /lookup?word=W     -> {"word", "code", "tier"} (application/json)
+    GET  /lookup?code=C
+    GET  /metrics           Prometheus text, with --metrics (agntcl_metrics)
+
+The codebook is compiled once at startup and stays resident. Connections
+are keep-alive by default. Encode/decode requests go through a Batcher:
+whatever arrived while the previous batch was running is translated in
+one worker-thread call, so the event loop keeps serving sockets while a
+large body is decoded, and a burst of small requests costs one thread
+hand-off instead of one each. An unexpected error gets a 500 response
+rather than a dropped connection.
+
+Usage: python agntcl_server.py [--host H] [--port P] [--metrics]
+                               [--metrics-file FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from agntcl_encoder import compile_encoder, encode
+from agntcl_metrics import Metrics
+from agntcl_parser import ParseError, build_inverse, decode
+from gen_agntcl import load_assignments
+
+MAX_HEADER = 16 << 10
+MAX_BODY = 64 << 10      # decoding runs at ~1 MB/s: keep one batch short
+
+_PREFIXES = re.compile(r'^(?:[pf]\.|!)+')
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+    """Request that gets an error response instead of a result."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ─── Micro-batching ───────────────────────────────────────────────────────────
+
+class Batcher:
+    """Coalesce concurrent calls to fn(item) into batches.
+
+    submit() queues an item and awaits its result. A single drain task
+    takes everything queued (up to `max_batch` items) and runs the whole
+    batch in one call on a worker thread; items that arrive meanwhile
+    form the next batch. Exceptions are delivered to their own caller.
+    """
+
+    def __init__(self, fn, max_batch=256):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.queue = None
+        self.pool = ThreadPoolExecutor(1)
+        self.batches = 0
+        self.items = 0
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        asyncio.ensure_future(self._drain())
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((item, future))
+        return await future
+
+    def _run(self, items):
+        fn = self.fn
+        results = []
+        for item in items:
+            try:
+                results.append((True, fn(item)))
+            except Exception as exc:
+                results.append((False, exc))
+        return results
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        queue = self.queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            results = await loop.run_in_executor(
+                self.pool, self._run, [item for item, _ in batch])
+            for (_, future), (ok, value) in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+            self.batches += 1
+            self.items += len(batch)
+
+
+# ─── Application ──────────────────────────────────────────────────────────────
+
+class Translator:
+    """Resident codebook plus the request handlers. With metrics=True,
+    encode/decode run instrumented and /metrics serves the results."""
+
+    def __init__(self, assignments, metrics=False):
+        self.table = compile_encoder(assignments)
+        self.metrics = Metrics(assignments) if metrics else None
+        self.inverse = build_inverse(assignments)
+        self.by_word = {english: (code, tier)
+                        for english, (code, tier) in assignments.items()}
+        for english, entry in assignments.items():
+            if '/' in english:
+                for alias in english.lower().split('/'):
+                    self.by_word.setdefault(alias, entry)
+        # Everything else /encode knows (inflected forms, digits): the code
+        # is the encoder's token (wrote -> p.<write>), the tier its stem's.
+        tiers = {code: tier for code, tier in assignments.values()}
+        for word, token in self.table.items():
+            if token and word not in self.by_word:
+                self.by_word[word] = (token,
+                                      tiers.get(_PREFIXES.sub('', token)))
+        self.by_code = {code: (english, tier)
+                        for english, (code, tier) in assignments.items()}
+        self.encoder = Batcher(self._encode)
+        self.decoder = Batcher(self._decode)
+        if self.metrics is not None:
+            self.metrics.registry.gauge(
+                'agntcl_batch_size_mean', "Requests per Batcher pass.",
+                ('op',), self._batch_sizes)
+
+    def _batch_sizes(self):
+        return {(op,): b.items / b.batches
+                for op, b in (('encode', self.encoder),
+                              ('decode', self.decoder)) if b.batches}
+
+    def start(self):
+        self.encoder.start()
+        self.decoder.start()
+
+    def _encode(self, body):
+        text = body.decode('utf-8', 'replace')
+        if self.metrics is None:
+            return encode(text, self.table)
+        return self.metrics.encode(text, self.table)
+
+    def _decode(self, body):
+        text = body.decode('utf-8', 'replace')
+        try:
+            if self.metrics is None:
+                return decode(text, self.inverse)
+            return self.metrics.decode(text, self.inverse)
+        except ParseError as exc:
+            raise HTTPError(400, str(exc))
+
+    def lookup(self, query):
+        params = parse_qs(query)
+        if 'word' in params:
+            word = params['word'][0].lower()
+            if word not in self.by_word:
+                raise HTTPError(404, f"unknown word: {word}")
+            code, tier = self.by_word[word]
+        elif 'code' in params:
+            code = params['code'][0]
+            if code not in self.by_code:
+                raise HTTPError(404, f"unknown code: {code}")
+            word, tier = self.by_code[code]
+        else:
+            raise HTTPError(400, "lookup needs ?word= or ?code=")
+        return json.dumps({'word': word, 'code': code, 'tier': tier})
+
+    async def handle(self, method, target, body):
+        """Return (content_type, text) for one request."""
+        url = urlsplit(target)
+        if url.path == '/lookup':
+            if method != 'GET':
+                raise HTTPError(405, "use GET")
+            return 'application/json', self.lookup(url.query)
+        if url.path == '/metrics' and self.metrics is not None:
+            if method != 'GET':
+                raise HTTPError(405, "use GET")
+            return ('text/plain; version=0.0.4; charset=utf-8',
+                    self.metrics.render().rstrip('\n'))
+        if url.path in ('/encode', '/decode'):
+            if method != 'POST':
+                raise HTTPError(405, "use POST")
+            batcher = self.encoder if url.path == '/encode' else self.decoder
+            return 'text/plain; charset=utf-8', await batcher.submit(body)
+        raise HTTPError(404, f"no such endpoint: {url.path}")
+
+
+# ─── HTTP/1.1 ─────────────────────────────────────────────────────────────────
+
+async def read_request(reader):
+    """(method, target, version, headers, body), or None at clean EOF."""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial:
+            raise HTTPError(400, "truncated request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "request header too large")
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HTTPError(400, "bad Content-Length")
+    if length < 0:
+        raise HTTPError(400, "bad Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b''
+    return method, target, version, headers, body
+
+
+def response(status, content_type, text, keep_alive):
+    body = text.encode() + b'\n'
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n")
+    return head.encode() + body
+
+
+def connection_handler(app):
+    async def serve(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as exc:
+                    writer.write(response(exc.status, 'text/plain', str(exc),
+                                          False))
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                connection = headers.get('connection', '').lower()
+                keep_alive = (connection != 'close' if version == 'HTTP/1.1'
+                              else connection == 'keep-alive')
+                try:
+                    content_type, text = await app.handle(method, target, body)
+                    status = 200
+                except HTTPError as exc:
+                    status, content_type, text = (exc.status, 'text/plain',
+                                                  str(exc))
+                except Exception as exc:
+                    status, content_type, text = (
+                        500, 'text/plain', f"{type(exc).__name__}: {exc}")
+                writer.write(response(status, content_type, text, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    return serve
+
+
+async def dump_metrics(metrics, path, interval):
+    """Rewrite the metrics file every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        metrics.write(path)
+
+
+async def serve(host, port, app=None, metrics_file=None, interval=15.0):
+    """Run the service until cancelled."""
+    app = app or Translator(load_assignments(), metrics=bool(metrics_file))
+    app.start()
+    if metrics_file and app.metrics is not None:
+        asyncio.ensure_future(dump_metrics(app.metrics, metrics_file,
+                                           interval))
+    server = await asyncio.start_server(connection_handler(app), host, port,
+                                        limit=MAX_HEADER)
+    addresses = ', '.join(str(s.getsockname()) for s in server.sockets)
+    print(f"AGNTCL translation service on {addresses}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--metrics', action='store_true',
+                        help='instrument encode/decode and serve /metrics')
+    parser.add_argument('--metrics-file',
+                        help='also write the metrics to this file '
+                             '(implies --metrics)')
+    parser.add_argument('--metrics-interval', type=float, default=15.0,
+                        help='seconds between metrics file writes')
+    args = parser.parse_args()
+    app = Translator(load_assignments(),
+                     metrics=args.metrics or bool(args.metrics_file))
+    try:
+        asyncio.run(serve(args.host, args.port, app, args.metrics_file,
+                          args.metrics_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
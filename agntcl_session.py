@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Opt-in session references that stay valid across messages.
+
+Both ends of a conversation keep a Session: a table of at most `capacity`
+literal values, each bound to a reference `<base><n>` in the usual
+`word + digits` syntax. The base is a code reserved for the session
+(default: 'this'), so per-message references (§6) never collide with it.
+
+The table only ever changes by observing transmitted messages, in a fixed
+order, so the two sides cannot drift apart:
+
+  1. every use of a session reference, left to right, marks its entry as
+     most recently used — except uses of a slot this message rebinds,
+     which refer to the new value;
+  2. every `<base><n> -> "literal"` statement, left to right, adds an
+     entry — in the next free slot while the table has room, otherwise in
+     the slot of the least recently used entry, which is evicted.
+
+A binding naming any other slot is a desync and raises SessionError.
+
+The sender replaces literals the table already holds with their
+reference, and binds new literals long enough to pay for themselves on
+one reuse. In a delegation loop (Pattern 5) the steady-state messages
+carry no literals at all.
+"""
+
+from collections import OrderedDict
+
+from agntcl_parser import parse, unparse, unparse_node
+from gen_agntcl import load_assignments
+
+# "ref -> value" plus the space separating it from the next statement.
+BIND_OVERHEAD = len(' -> ') + 1
+
+
+class SessionError(ValueError):
+    """The two ends of a session disagree, or a message misuses its base."""
+
+
+def default_base(assignments=None):
+    """Session reference base: 'this', a one-character tier-1 code."""
+    assignments = assignments or load_assignments()
+    return assignments['this'][0]
+
+
+def _is_ref(node, base=None):
+    return (node[0] == 'tok' and not node[1] and len(node[2]) == 1
+            and node[2][0][1] is not None
+            and (base is None or node[2][0][0] == base))
+
+
+def _map(node, fn):
+    """Copy of node with each child replaced by fn(child)."""
+    tag = node[0]
+    if tag in ('op', 'frame'):
+        return (tag, fn(node[1]), tuple(fn(a) for a in node[2]))
+    if tag == 'expr':
+        return ('expr', tuple(fn(a) for a in node[1]))
+    if tag == 'bind':
+        return ('bind', node[1], _map(node[2], fn) if node[2][0] == 'op'
+                else node[2])
+    return node
+
+
+def _walk(node):
+    """Yield node and its descendants in document order."""
+    yield node
+    tag = node[0]
+    if tag in ('op', 'frame'):
+        yield from _walk(node[1])
+        for arg in node[2]:
+            yield from _walk(arg)
+    elif tag == 'expr':
+        for item in node[1]:
+            yield from _walk(item)
+    elif tag == 'bind':
+        yield from _walk(node[1])
+        yield from _walk(node[2])
+
+
+def inline_literal_bindings(statements):
+    """Replace per-message `ref -> "literal"` bindings with their literal.
+
+    References are only names, so the message means the same; it just
+    exposes the literals to the session table.
+    """
+    env = {}
+
+    def sub(node):
+        if _is_ref(node) and node[2][0] in env:
+            return env[node[2][0]]
+        return _map(node, sub)
+
+    out = []
+    for statement in statements:
+        if statement[0] == 'bind' and statement[2][0] in ('str', 'num'):
+            env[statement[1][2][0]] = statement[2]
+            continue
+        out.append(sub(statement))
+    return out
+
+
+# ─── Session table ────────────────────────────────────────────────────────────
+
+class Session:
+    """One end of a synchronized, LRU-evicted reference table."""
+
+    def __init__(self, base=None, capacity=64):
+        self.base = base or default_base()
+        self.capacity = capacity
+        self.slots = OrderedDict()   # n -> literal node, LRU first
+        self.by_key = {}             # unparsed literal -> n
+
+    def ref(self, n):
+        return ('tok', (), ((self.base, n),))
+
+    def _next_slots(self, keep, count):
+        """Slots the next `count` insertions will take, given that the
+        entries in `keep` are touched first."""
+        free = range(len(self.slots) + 1, self.capacity + 1)
+        victims = (n for n in self.slots if n not in keep)
+        out = []
+        for n in free:
+            if len(out) == count:
+                return out
+            out.append(n)
+        for n in victims:
+            if len(out) == count:
+                break
+            out.append(n)
+        return out
+
+    def observe(self, statements):
+        """Apply one transmitted message to the table (both ends call this)."""
+        base = self.base
+        bound = {s[1][2][0][1] for s in statements
+                 if s[0] == 'bind' and _is_ref(s[1], base)}
+        for statement in statements:
+            if statement[0] == 'bind' and _is_ref(statement[1], base):
+                statement = statement[2]
+            for node in _walk(statement):
+                if _is_ref(node, base):
+                    n = node[2][0][1]
+                    if n in bound:
+                        continue
+                    if n not in self.slots:
+                        raise SessionError(f"unknown session reference "
+                                           f"{base}{n}")
+                    self.slots.move_to_end(n)
+        for statement in statements:
+            if statement[0] != 'bind' or not _is_ref(statement[1], base):
+                continue
+            n = statement[1][2][0][1]
+            value = statement[2]
+            if value[0] not in ('str', 'num'):
+                raise SessionError("session bindings hold literals only")
+            expected = self._next_slots((), 1)[0]
+            if n != expected:
+                raise SessionError(f"session desync: bound {base}{n}, "
+                                   f"expected {base}{expected}")
+            if n in self.slots:
+                del self.by_key[unparse_node(self.slots.pop(n))]
+            self.slots[n] = value
+            self.by_key[unparse_node(value)] = n
+
+    # ─── Sending ──────────────────────────────────────────────────────────────
+
+    def compress(self, statements):
+        """Rewrite a message against the table and observe the result."""
+        base = self.base
+        statements = inline_literal_bindings(statements)
+        for statement in statements:
+            for node in _walk(statement):
+                if _is_ref(node, base):
+                    raise SessionError(f"reference base {base!r} is "
+                                       f"reserved for the session")
+
+        literals = []
+        seen = set()
+        for statement in statements:
+            for node in _walk(statement):
+                if node[0] in ('str', 'num'):
+                    key = unparse_node(node)
+                    if key not in seen:
+                        seen.add(key)
+                        literals.append((key, node))
+        refs = {key: self.ref(self.by_key[key])
+                for key, _ in literals if key in self.by_key}
+        # Bind a new literal only if a single reuse already pays for the
+        # binding, and never evict an entry this message uses.
+        ref_len = len(base) + len(str(self.capacity))
+        new = [(key, node) for key, node in literals
+               if key not in refs and len(key) > ref_len + BIND_OVERHEAD]
+        new = new[:self.capacity - len(refs)]
+        hits = {ref[2][0][1] for ref in refs.values()}
+        bindings = []
+        for (key, node), n in zip(new, self._next_slots(hits, len(new))):
+            refs[key] = self.ref(n)
+            bindings.append(('bind', self.ref(n), node))
+
+        def sub(node):
+            if node[0] in ('str', 'num'):
+                return refs.get(unparse_node(node), node)
+            return _map(node, sub)
+
+        out = bindings + [sub(s) for s in statements]
+        self.observe(out)
+        return out
+
+    # ─── Receiving ────────────────────────────────────────────────────────────
+
+    def expand(self, statements):
+        """Observe a received message, then resolve its session references."""
+        self.observe(statements)
+        base = self.base
+        slots = self.slots
+
+        def sub(node):
+            if _is_ref(node, base):
+                return slots[node[2][0][1]]
+            return _map(node, sub)
+
+        return [sub(s) for s in statements
+                if not (s[0] == 'bind' and _is_ref(s[1], base))]
+
+    def compress_text(self, text):
+        return unparse(self.compress(parse(text)))
+
+    def expand_text(self, text):
+        return unparse(self.expand(parse(text)))
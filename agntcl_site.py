@@ -0,0 +1,205 @@
+"""Precompressed, size-budgeted static build of the specification.
+
+build_site() packs the rendered spec sections into pages whose gzip size
+stays within a byte budget, splitting oversized sections (the §4
+vocabulary) with a caller-supplied splitter. Every file is written next
+to a deterministic .gz (and .br when the brotli module is installed)
+variant, and etags.json lists a strong ETag and size for each of them,
+so a server or CDN can answer conditional requests without hashing.
+
+Paging and compression are most of the cost of a build. Given a cache
+dict (kept by the caller between runs), build_site() looks up the gzip
+size of every candidate page and the compressed variants of every file
+by a hash of their content, so only text that changed is compressed
+again. Entries the build did not use are dropped from the cache.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# README: "Keep the entire site under 5KB" — per page, as transferred.
+DEFAULT_BUDGET = 5 * 1024
+
+CODEBOOK_JSON_VERSION = 1
+
+
+def gzip_bytes(data):
+    """gzip -9 with a zero mtime, so identical input gives identical bytes."""
+    return gzip.compress(data, 9, mtime=0)
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def strong_etag(data):
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+# ─── Paging ───────────────────────────────────────────────────────────────────
+
+def paginate(sections, budget, splitters=None, cache=None, used=None):
+    """Pack (name, text) sections into (slug, text) pages within budget.
+
+    Consecutive sections share a page while its gzip size stays within
+    `budget` bytes. A section too large on its own is handed to
+    splitters[name](fits), which returns (key, text) pieces; without a
+    splitter it is a ValueError. With a cache, gzip sizes are looked up
+    by content hash; keys read or written are recorded in `used`.
+    """
+    splitters = splitters or {}
+    cache = {} if cache is None else cache
+    used = {} if used is None else used
+
+    def fits(text):
+        data = text.encode()
+        ckey = f"gz:{_digest(data)}"
+        size = cache.get(ckey)
+        if size is None:
+            size = len(gzip_bytes(data))
+        used[ckey] = size
+        return size <= budget
+
+    pages = []
+    names = []
+    texts = []
+    for name, text in sections:
+        if texts and fits("\n".join(texts + [text])):
+            names.append(name)
+            texts.append(text)
+            continue
+        if texts:
+            pages.append((names[0], "\n".join(texts)))
+            names, texts = [], []
+        if fits(text):
+            names, texts = [name], [text]
+        elif name in splitters:
+            for key, piece in splitters[name](fits):
+                pages.append((f"{name}-{key}", piece))
+        else:
+            size = len(gzip_bytes(text.encode()))
+            raise ValueError(f"section {name!r} is {size} bytes gzipped, "
+                             f"over the {budget}-byte page budget")
+    if texts:
+        pages.append((names[0], "\n".join(texts)))
+    return pages
+
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def _title(text):
+    for line in text.splitlines():
+        if line.startswith('#'):
+            return line.lstrip('#').strip()
+    return ''
+
+
+# ─── Build ────────────────────────────────────────────────────────────────────
+
+def codebook_json(assignments):
+    """Compact JSON codebook: {"version", "tiers": {tier: {english: code}}}."""
+    tiers = {}
+    for english, (code, tier) in sorted(assignments.items()):
+        tiers.setdefault(str(tier), {})[english] = code
+    return json.dumps({'version': CODEBOOK_JSON_VERSION, 'tiers': tiers},
+                      separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def _variants(name, data, cache, used):
+    """(path, bytes) for a file and its compressed forms."""
+    ckey = f"z:{_digest(data)}"
+    packed = cache.get(ckey)
+    if packed is None or (packed[1] is None) != (brotli is None):
+        packed = (gzip_bytes(data),
+                  None if brotli is None else brotli.compress(data))
+    used[ckey] = packed
+    variants = [(name, data), (name + '.gz', packed[0])]
+    if packed[1] is not None:
+        variants.append((name + '.br', packed[1]))
+    return variants
+
+
+def build_site(site_dir, sections, assignments, budget=DEFAULT_BUDGET,
+               splitters=None, cache=None):
+    """Write the paged site and point site_dir at it; return the ETag
+    manifest.
+
+    Each build goes into its own directory next to site_dir, named by a
+    hash of its manifest, and site_dir is a symlink swapped atomically
+    onto it. A server keeps serving the old tree until the swap, never
+    sees site_dir missing or half-written, and stale pages from an
+    earlier layout disappear with the old tree. Any page over `budget`
+    bytes gzipped fails the build before anything is written.
+    `cache` is a dict of gzip sizes and compressed files carried over
+    from the previous build; it is updated in place.
+    """
+    cache = {} if cache is None else cache
+    used = {}
+    pages = paginate(sections, budget, splitters, cache, used)
+    files = {}
+    index = [f"# {_title(pages[0][1]) if pages else ''}", "",
+             "| Page | Covers |", "|------|--------|"]
+    for slug, text in pages:
+        name = _slug(slug) + '.md'
+        files[name] = text.encode()
+        index.append(f"| [{name}]({name}) | {_title(text)} |")
+    index.extend(["", "Codebook: [codebook.json](codebook.json)", ""])
+    files['index.md'] = "\n".join(index).encode()
+    files['codebook.json'] = codebook_json(assignments)
+
+    blobs = {}
+    for name, data in sorted(files.items()):
+        blobs.update(_variants(name, data, cache, used))
+    over = sorted(path[:-3] for path, blob in blobs.items()
+                  if path.endswith('.md.gz') and len(blob) > budget)
+    if over:
+        raise ValueError(f"{', '.join(over)} over the {budget}-byte "
+                         f"page budget gzipped")
+    manifest = {path: {'etag': strong_etag(blob), 'bytes': len(blob)}
+                for path, blob in blobs.items()}
+    listing = json.dumps(manifest, indent=1, sort_keys=True) + '\n'
+
+    target = f"{site_dir}.{_digest(listing.encode())[:12]}"
+    if not os.path.isdir(target):
+        tmp = f"{site_dir}.tmp{os.getpid()}"
+        os.makedirs(tmp)
+        for path, blob in blobs.items():
+            with open(os.path.join(tmp, path), 'wb') as f:
+                f.write(blob)
+        with open(os.path.join(tmp, 'etags.json'), 'w') as f:
+            f.write(listing)
+        os.replace(tmp, target)
+    _swap_link(site_dir, os.path.basename(target))
+    cache.clear()
+    cache.update(used)
+    return manifest
+
+
+def _swap_link(site_dir, target):
+    """Atomically point the symlink site_dir at the sibling `target`, then
+    remove the tree it pointed at before."""
+    parent = os.path.dirname(os.path.abspath(site_dir))
+    old = None
+    if os.path.islink(site_dir):
+        old = os.readlink(site_dir)
+    elif os.path.isdir(site_dir):
+        # A plain directory from an older build: it can only be moved
+        # aside, once, before the first link is made.
+        old = f"{os.path.basename(site_dir)}.old{os.getpid()}"
+        os.replace(site_dir, os.path.join(parent, old))
+    link = f"{site_dir}.link{os.getpid()}"
+    os.symlink(target, link)
+    os.replace(link, site_dir)
+    if old is not None and old != target:
+        shutil.rmtree(os.path.join(parent, old), ignore_errors=True)
@@ -0,0 +1,126 @@
+"""Frozen vocabulary snapshot for fast startup.
+
+gen_agntcl.py main() writes agntcl.snapshot: a marshal blob holding the
+final assignment as one text, a line `english<TAB>code<TAB>tier` per
+entry. Importing this module reads nothing. The first code_for() or
+word_for() call loads the blob (one read, one marshal.loads of a str)
+and finds the answer with a substring search, so a short-lived hook that
+needs a few codes never builds the word list, the PRIORITY ranking or
+the code pools, and never materializes a dict. The full maps are module
+attributes built on first access (PEP 562):
+
+    WORDS         english -> code
+    CODES         code -> english
+    ASSIGNMENTS   english -> (code, tier), as load_assignments()
+
+The blob records the size and mtime of gen_agntcl.py and agntcl.ledger.
+If either changed, or the blob is missing, the assignment is rebuilt
+through gen_agntcl and the snapshot rewritten (if the directory is
+writable; otherwise the rebuilt text is just used for this process).
+"""
+
+import marshal
+import os
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT = os.path.join(HERE, 'agntcl.snapshot')
+SOURCES = ('gen_agntcl.py', 'agntcl.ledger')
+
+FORMAT_VERSION = 1
+
+_text = None
+
+
+def _stamp():
+    stamp = []
+    for name in SOURCES:
+        try:
+            st = os.stat(os.path.join(HERE, name))
+        except OSError:
+            stamp.append(None)
+        else:
+            stamp.append((st.st_size, st.st_mtime_ns))
+    return tuple(stamp)
+
+
+def _freeze(assignments):
+    return ''.join(f"\n{english}\t{code}\t{tier}"
+                   for english, (code, tier) in assignments.items()) + '\n'
+
+
+def write_snapshot(assignments, path=SNAPSHOT):
+    """Freeze an assign_codes() dict into the snapshot file."""
+    text = _freeze(assignments)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        marshal.dump((FORMAT_VERSION, _stamp(), text), f)
+    os.replace(tmp, path)
+    return len(text)
+
+
+def _load():
+    global _text
+    try:
+        with open(SNAPSHOT, 'rb') as f:
+            version, stamp, text = marshal.loads(f.read())
+        if version == FORMAT_VERSION and stamp == _stamp():
+            _text = text
+            return text
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    from gen_agntcl import load_assignments
+    assignments = load_assignments()
+    try:
+        write_snapshot(assignments)
+    except OSError:
+        pass                    # read-only install: rebuild again next time
+    _text = _freeze(assignments)
+    return _text
+
+
+# ─── Lookups ──────────────────────────────────────────────────────────────────
+
+def code_for(english, default=None):
+    """The code for an English vocabulary word."""
+    text = _text or _load()
+    start = text.find(f'\n{english}\t')
+    if start < 0:
+        return default
+    start += len(english) + 2
+    return text[start:text.index('\t', start)]
+
+
+def word_for(code, default=None):
+    """The English word for a code."""
+    text = _text or _load()
+    end = text.find(f'\t{code}\t')
+    if end < 0:
+        return default
+    return text[text.rindex('\n', 0, end) + 1:end]
+
+
+def _columns():
+    """(english words, codes, tiers) as three parallel lists."""
+    text = _text or _load()
+    fields = text[1:-1].replace('\n', '\t').split('\t')
+    return fields[0::3], fields[1::3], fields[2::3]
+
+
+def __getattr__(name):
+    if name == 'WORDS':
+        english, codes, _ = _columns()
+        value = dict(zip(english, codes))
+    elif name == 'CODES':
+        english, codes, _ = _columns()
+        value = dict(zip(codes, english))
+    elif name == 'ASSIGNMENTS':
+        english, codes, tiers = _columns()
+        value = dict(zip(english, zip(codes, map(int, tiers))))
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + ['WORDS', 'CODES', 'ASSIGNMENTS'])
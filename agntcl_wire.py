@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Compact binary wire format for AGNTCL messages.
+
+The same token stream as the text form, with no separators: every token
+is self-delimiting.
+
+    0x00-0xBF        code ID 0-191, one byte
+    0xC0-0xEF  b     code ID 192 + ((hi - 0xC0) << 8 | b), two bytes
+    0xF0-0xF5        ( ) { } : ->
+    0xF6-0xFA        prefixes p. f. ! ? ~
+    0xFB  len utf8   string literal
+    0xFC  varint     number literal
+    0xFD  varint     reference number of the code before it
+    0xFE  varint     code ID 12480 + varint (tier-4 vocabularies)
+    0xFF  len utf8   code outside the codebook, verbatim
+
+Varints are LEB128. Code IDs index the codebook's codes ordered by tier,
+then by their place in the tier's code pool (length, then spelling), so
+the tier-1 codes and the first tier-2 codes take one byte, and the IDs
+don't depend on the order the words were listed in.
+
+Both ends must still share the codebook. A stream opens with
+stream_header(), the magic plus a digest of the ID table; iter_stream()
+checks it before yielding any frame, so a receiver with a different
+codebook fails instead of decoding the wrong words.
+
+A frame is a varint byte length followed by one message; iter_frames()
+splits a buffer into memoryview slices without copying. decode() scans
+a memoryview directly into parser nodes, so no intermediate AGNTCL text is
+built. Usage: python agntcl_wire.py < messages
+"""
+
+import hashlib
+import sys
+
+from agntcl_parser import (ARROW, LBRACE, LPAREN, RBRACE, RPAREN, STRING,
+                           WORD, ParseError, parse, parse_tokens, parse_word,
+                           unparse)
+from gen_agntcl import load_assignments
+
+(OP_LPAREN, OP_RPAREN, OP_LBRACE, OP_RBRACE, OP_COLON, OP_ARROW,
+ OP_PAST, OP_FUTURE, OP_NEGATE, OP_QUESTION, OP_APPROX,
+ OP_STRING, OP_NUMBER, OP_REF, OP_LONG_ID, OP_RAW) = range(0xF0, 0x100)
+
+PREFIXES = ('p.', 'f.', '!', '?', '~')
+PREFIX_OPS = {prefix: OP_PAST + i for i, prefix in enumerate(PREFIXES)}
+
+MAGIC = b'AGW1'
+DIGEST_BYTES = 8
+
+SHORT_IDS = 0xC0
+LONG_IDS = SHORT_IDS + (OP_LPAREN - SHORT_IDS) * 256
+
+_DELIMITERS = {OP_LPAREN: LPAREN, OP_RPAREN: RPAREN, OP_LBRACE: LBRACE,
+               OP_RBRACE: RBRACE, OP_ARROW: ARROW}
+
+
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_varint(view, i):
+    """Decode a LEB128 varint at view[i]; return (value, next offset)."""
+    n = shift = 0
+    while True:
+        b = view[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+
+def _utf8(view, i, n):
+    """view[i:i + n] as text; malformed UTF-8 is a ParseError at its byte."""
+    try:
+        return str(view[i:i + n], 'utf-8')
+    except UnicodeDecodeError as exc:
+        raise ParseError(f"invalid UTF-8: {exc.reason}",
+                         i + exc.start) from None
+
+
+# ─── Framing ──────────────────────────────────────────────────────────────────
+
+def frame(payload):
+    """Length-prefix one encoded message."""
+    out = bytearray()
+    write_varint(out, len(payload))
+    out += payload
+    return bytes(out)
+
+
+def iter_frames(buf):
+    """Yield each framed message in buf as a memoryview slice."""
+    view = memoryview(buf)
+    i = 0
+    while i < len(view):
+        n, i = read_varint(view, i)
+        if i + n > len(view):
+            raise ParseError("truncated frame", i)
+        yield view[i:i + n]
+        i += n
+
+
+# ─── Codec ────────────────────────────────────────────────────────────────────
+
+class WireCodec:
+    """Binary encoder/decoder for one code assignment."""
+
+    def __init__(self, assignments):
+        entries = sorted((tier, len(code), code, english)
+                         for english, (code, tier) in assignments.items())
+        self.codes = [code for _, _, code, _ in entries]
+        self.ids = {code: i for i, code in enumerate(self.codes)}
+        h = hashlib.sha256()
+        for _, _, code, english in entries:
+            h.update(f"{code}\t{english}\n".encode())
+        self.digest = h.digest()[:DIGEST_BYTES]
+
+    # ─── Streams ──────────────────────────────────────────────────────────────
+
+    def stream_header(self):
+        """The bytes a stream starts with: magic and codebook digest."""
+        return MAGIC + self.digest
+
+    def iter_stream(self, buf):
+        """iter_frames() over a stream that starts with a stream_header();
+        raise ParseError if the sender's codebook is not this one."""
+        view = memoryview(buf)
+        head = len(MAGIC) + DIGEST_BYTES
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ParseError("not an AGNTCL wire stream", 0)
+        if bytes(view[len(MAGIC):head]) != self.digest:
+            raise ParseError("stream was encoded with a different codebook",
+                             len(MAGIC))
+        return iter_frames(view[head:])
+
+    # ─── Encoding ─────────────────────────────────────────────────────────────
+
+    def _code(self, out, code):
+        i = self.ids.get(code)
+        if i is None:
+            raw = code.encode()
+            out.append(OP_RAW)
+            write_varint(out, len(raw))
+            out += raw
+        elif i < SHORT_IDS:
+            out.append(i)
+        elif i < LONG_IDS:
+            i -= SHORT_IDS
+            out.append(SHORT_IDS + (i >> 8))
+            out.append(i & 0xFF)
+        else:
+            out.append(OP_LONG_ID)
+            write_varint(out, i - LONG_IDS)
+
+    def _node(self, out, node):
+        tag = node[0]
+        if tag == 'tok':
+            for prefix in node[1]:
+                out.append(PREFIX_OPS[prefix])
+            for k, (code, n) in enumerate(node[2]):
+                if k:
+                    out.append(OP_COLON)
+                self._code(out, code)
+                if n is not None:
+                    out.append(OP_REF)
+                    write_varint(out, n)
+        elif tag == 'str':
+            raw = node[1].encode()
+            out.append(OP_STRING)
+            write_varint(out, len(raw))
+            out += raw
+        elif tag == 'num':
+            if node[1][0] == '0':
+                # Leading zeros don't survive a varint; send the digits.
+                self._code(out, node[1])
+            else:
+                out.append(OP_NUMBER)
+                write_varint(out, int(node[1]))
+        elif tag in ('op', 'frame'):
+            out.append(OP_LPAREN if tag == 'op' else OP_LBRACE)
+            self._node(out, node[1])
+            for arg in node[2]:
+                self._node(out, arg)
+            out.append(OP_RPAREN if tag == 'op' else OP_RBRACE)
+        elif tag == 'bind':
+            self._node(out, node[1])
+            out.append(OP_ARROW)
+            self._node(out, node[2])
+        else:
+            for item in node[1]:
+                self._node(out, item)
+
+    def encode(self, statements, out=None):
+        """Append the binary form of parsed statements to out (a bytearray);
+        return out."""
+        if out is None:
+            out = bytearray()
+        for statement in statements:
+            self._node(out, statement)
+        return out
+
+    def encode_text(self, text):
+        return bytes(self.encode(parse(text)))
+
+    # ─── Decoding ─────────────────────────────────────────────────────────────
+
+    def _scan(self, view):
+        """Yield parser tokens (kind, node, offset) straight from bytes."""
+        codes = self.codes
+        end = len(view)
+        i = 0
+        while i < end:
+            pos = i
+            b = view[i]
+            i += 1
+            kind = _DELIMITERS.get(b)
+            if kind is not None:
+                yield kind, None, pos
+                continue
+            if b == OP_STRING:
+                n, i = read_varint(view, i)
+                if i + n > end:
+                    raise ParseError("truncated string", pos)
+                yield STRING, ('str', _utf8(view, i, n)), pos
+                i += n
+                continue
+            if b == OP_NUMBER:
+                n, i = read_varint(view, i)
+                yield WORD, ('num', str(n)), pos
+                continue
+
+            prefixes = ()
+            while OP_PAST <= b <= OP_APPROX:
+                prefixes += (PREFIXES[b - OP_PAST],)
+                b = view[i]
+                i += 1
+            words = []
+            raw = False
+            while True:
+                if b < SHORT_IDS:
+                    code = codes[b]
+                elif b < OP_LPAREN:
+                    code = codes[SHORT_IDS + ((b - SHORT_IDS) << 8 | view[i])]
+                    i += 1
+                elif b == OP_LONG_ID:
+                    n, i = read_varint(view, i)
+                    code = codes[LONG_IDS + n]
+                elif b == OP_RAW:
+                    n, i = read_varint(view, i)
+                    if i + n > end:
+                        raise ParseError("truncated code", pos)
+                    code = _utf8(view, i, n)
+                    i += n
+                    raw = True
+                else:
+                    raise ParseError("expected a code", i - 1)
+                n = None
+                if i < end and view[i] == OP_REF:
+                    n, i = read_varint(view, i + 1)
+                words.append((code, n))
+                if i < end and view[i] == OP_COLON:
+                    b = view[i + 1]
+                    i += 2
+                    continue
+                break
+            if raw:
+                # Verbatim text reads exactly as it would in a text message.
+                body = ':'.join(code if n is None else f"{code}{n}"
+                                for code, n in words)
+                yield WORD, parse_word(''.join(prefixes), body, pos), pos
+            else:
+                yield WORD, ('tok', prefixes, tuple(words)), pos
+
+    def decode(self, buf):
+        """Parse one binary message (any buffer) into statement nodes."""
+        view = memoryview(buf)
+        try:
+            return parse_tokens(self._scan(view), len(view))
+        except IndexError:
+            raise ParseError("truncated message or unknown code ID",
+                             len(view)) from None
+
+    def decode_text(self, buf):
+        return unparse(self.decode(buf))
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    codec = WireCodec(load_assignments())
+    text_bytes = wire_bytes = 0
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        payload = codec.encode_text(line)
+        text_bytes += len(line.strip().encode())
+        wire_bytes += len(payload)
+        sys.stdout.write(payload.hex() + '\n')
+    print(f"text {text_bytes} bytes, wire {wire_bytes} bytes", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1291 @@
+#!/usr/bin/env python3
+"""Benchmarks for the AGNTCL tooling. Usage: python bench_agntcl.py <bench>."""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import time
+import tracemalloc
+
+from gen_agntcl import assign_codes, build_word_list, load_assignments
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+OOV_WORDS = ['kubernetes', 'florist', 'peony', 'geyser', 'refactoring',
+             'tsunami', 'volcano', 'ornate', 'masterpiece', 'petals']
+
+
+def best_of(fn, repeat=5):
+    """Run fn() `repeat` times and return the fastest wall time in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def synthetic_english(n_bytes, seed=0, oov_rate=0.02):
+    """Zipf-weighted English-like prose drawn from the vocabulary."""
+    rng = random.Random(seed)
+    vocab = list(dict.fromkeys(e for e, _ in build_word_list()))
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    words = rng.choices(vocab, weights, k=4096)
+    for i in range(0, len(words), int(1 / oov_rate)):
+        words[i] = rng.choice(OOV_WORDS)
+    out = []
+    size = 0
+    i = 0
+    while size < n_bytes:
+        n = rng.randint(6, 18)
+        sentence = words[i % 4096:i % 4096 + n] or words[:n]
+        i += n
+        line = ' '.join(sentence).capitalize() + rng.choice('...?!,') + ' '
+        out.append(line)
+        size += len(line)
+    return ''.join(out)
+
+
+def synthetic_agntcl(n_messages, seed=0):
+    """Random well-formed AGNTCL messages exercising the whole §10 grammar."""
+    rng = random.Random(seed)
+    codes = [code for code, _ in load_assignments().values()]
+    refs = [code for code in codes if not code.isdigit()]
+    prefixes = ['', '', '', '', 'p.', 'f.', '!', '?', '~', '!p.']
+
+    def token():
+        word = rng.choice(codes)
+        if rng.random() < 0.15:
+            word += ':' + rng.choice(codes)
+        return rng.choice(prefixes) + word
+
+    def arg(depth):
+        r = rng.random()
+        if r < 0.12 and depth < 3:
+            return operation(depth + 1)
+        if r < 0.2:
+            return f'"{rng.choice(OOV_WORDS)}"'
+        if r < 0.26:
+            return str(rng.randint(10, 9999))
+        if r < 0.4:
+            return f"{rng.choice(refs)}{rng.randint(1, 9)}"
+        return token()
+
+    def operation(depth=0):
+        args = ' '.join(arg(depth) for _ in range(rng.randint(1, 4)))
+        return f"({rng.choice(codes)} {args})"
+
+    messages = []
+    for _ in range(n_messages):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            r = rng.random()
+            if r < 0.25:
+                parts.append(f"{rng.choice(refs)}{rng.randint(1, 9)} -> "
+                             + (operation() if r < 0.1
+                                else f'"/src/{rng.choice(OOV_WORDS)}.py"'))
+            elif r < 0.55:
+                parts.append(operation())
+            elif r < 0.7:
+                parts.append('{' + token() + ' ' +
+                             ' '.join(arg(1) for _ in range(3)) + '}')
+            else:
+                parts.append(' '.join(token()
+                                      for _ in range(rng.randint(2, 8))))
+        messages.append(' '.join(parts))
+    return messages
+
+
+def report(label, seconds, n_bytes=None, n_items=None, unit='tokens'):
+    """Print one aligned benchmark line."""
+    parts = [f"{label:<28} {seconds * 1000:9.2f} ms"]
+    if n_bytes is not None:
+        parts.append(f"{n_bytes / seconds / 1e6:8.2f} MB/s")
+    if n_items is not None:
+        parts.append(f"{n_items / seconds / 1e6:8.2f} M{unit}/s")
+    print("  ".join(parts))
+
+
+# ─── Encoder (agntcl_encoder) ─────────────────────────────────────────────────
+
+def parse_vocabulary_md(path):
+    """The naive consumer: re-parse the §4 vocabulary table of agntcl.md."""
+    vocab = {}
+    in_table = False
+    with open(path) as f:
+        for line in f:
+            if line.startswith('## 4.'):
+                in_table = True
+            elif line.startswith('## ') and in_table:
+                break
+            elif in_table and line.startswith('| ') and '`' in line:
+                cells = [c.strip() for c in line.strip().strip('|').split('|')]
+                for i in range(0, len(cells) - 2, 3):
+                    if cells[i]:
+                        vocab[cells[i]] = cells[i + 1].strip('`')
+    return vocab
+
+
+def naive_encode(text, vocab):
+    """Per-word regex tokenize, lower(), dict lookup, list append."""
+    out = []
+    for word in re.findall(r"[A-Za-z0-9']+", text):
+        w = word.lower()
+        if w in ('the', 'a', 'an'):
+            continue
+        if w in vocab:
+            out.append(vocab[w])
+        elif w.isdigit():
+            out.append(w)
+        else:
+            out.append('"' + w + '"')
+    return ' '.join(out)
+
+
+def bench_encode(args):
+    from agntcl_encoder import compile_encoder, encode, encode_stream
+
+    text = synthetic_english(int(args.mb * 1e6))
+    n_bytes = len(text.encode())
+    n_words = len(text.split())
+    print(f"corpus: {n_bytes / 1e6:.1f} MB, {n_words} words")
+
+    vocab = parse_vocabulary_md(os.path.join(HERE, 'agntcl.md'))
+    table = compile_encoder(load_assignments())
+    chunks = [text[i:i + 65536] for i in range(0, len(text), 65536)]
+
+    t_naive = best_of(lambda: naive_encode(text, vocab), args.repeat)
+    t_comp = best_of(lambda: encode(text, table), args.repeat)
+    t_stream = best_of(lambda: ''.join(encode_stream(chunks, table)),
+                       args.repeat)
+    report("naive per-word", t_naive, n_bytes, n_words, 'words')
+    report("compiled encode()", t_comp, n_bytes, n_words, 'words')
+    report("compiled encode_stream()", t_stream, n_bytes, n_words, 'words')
+    print(f"speedup: {t_naive / t_stream:.1f}x (stream vs naive)")
+
+
+# ─── Parser (agntcl_parser) ───────────────────────────────────────────────────
+
+def bench_parse(args):
+    from agntcl_parser import build_inverse, decode, parse, tokenize
+
+    messages = synthetic_agntcl(args.messages)
+    n_bytes = sum(len(m) for m in messages)
+    n_tokens = sum(1 for m in messages for _ in tokenize(m))
+    print(f"corpus: {len(messages)} messages, {n_tokens} tokens, "
+          f"{n_bytes / 1e6:.1f} MB")
+    inverse = build_inverse(load_assignments())
+
+    def run_tokenize():
+        for m in messages:
+            for _ in tokenize(m):
+                pass
+
+    t_tok = best_of(run_tokenize, args.repeat)
+    t_parse = best_of(lambda: [parse(m) for m in messages], args.repeat)
+    t_decode = best_of(lambda: [decode(m, inverse) for m in messages],
+                       args.repeat)
+    report("tokenize", t_tok, n_bytes, n_tokens)
+    report("tokenize + parse", t_parse, n_bytes, n_tokens)
+    report("tokenize + parse + decode", t_decode, n_bytes, n_tokens)
+
+
+# ─── Codebook (agntcl_codebook) ───────────────────────────────────────────────
+
+def heap_cost(fn):
+    """(result, bytes of Python heap still held by the result)."""
+    tracemalloc.start()
+    result = fn()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, held
+
+
+def bench_codebook(args):
+    from agntcl_codebook import open_codebook, write_codebook
+
+    path = os.path.join(HERE, 'agntcl.codebook')
+    assignments = load_assignments()
+    write_codebook(path, assignments)
+
+    t_build = best_of(lambda: load_assignments(), args.repeat)
+    _, heap_build = heap_cost(lambda: load_assignments())
+    n_open = 1000
+    t_open = best_of(lambda: [open_codebook(path).close()
+                              for _ in range(n_open)], args.repeat) / n_open
+    book, heap_open = heap_cost(lambda: open_codebook(path))
+
+    words = list(assignments) * 20
+    codes = [code for code, _ in assignments.values()] * 20
+    table = {e: c for e, (c, _) in assignments.items()}
+    t_dict = best_of(lambda: [table[w] for w in words], args.repeat)
+    t_word = best_of(lambda: [book.code(w) for w in words], args.repeat)
+    t_code = best_of(lambda: [book.word(c) for c in codes], args.repeat)
+
+    print(f"rebuild (load_assignments):               "
+          f"{t_build * 1e3:8.2f} ms   heap {heap_build / 1024:8.1f} KiB")
+    print(f"open_codebook (mmap):                     "
+          f"{t_open * 1e6:8.2f} us   heap {heap_open / 1024:8.1f} KiB")
+    print(f"file size: {os.path.getsize(path)} bytes (page cache, shared)")
+    print(f"lookup dict[word]        {t_dict / len(words) * 1e9:7.0f} ns")
+    print(f"lookup book.code(word)   {t_word / len(words) * 1e9:7.0f} ns")
+    print(f"lookup book.word(code)   {t_code / len(codes) * 1e9:7.0f} ns")
+    book.close()
+
+
+# ─── Classifier (agntcl_classify) ─────────────────────────────────────────────
+
+_TOKEN_RE = re.compile(r'((?:[pf]\.|[!?~])*)(?:([0-9]{2,})|([a-z0-9])'
+                       r'|([a-z]{2})|([bcdfghjklmnpqrstvwxz]{3})'
+                       r'|([a-z]{1,3})([0-9]+))')
+
+
+def regex_classify(token, by_code, tier2_codes):
+    """Baseline: one fullmatch, then slice groups and probe dicts."""
+    m = _TOKEN_RE.fullmatch(token)
+    if m is None:
+        return 0, None
+    if m.group(2):
+        return 4, int(m.group(2))
+    if m.group(3):
+        return 1, by_code.get(m.group(3))
+    if m.group(4):
+        if m.group(4) not in tier2_codes:
+            return 0, None
+        return 2, by_code.get(m.group(4))
+    if m.group(5):
+        return 3, by_code.get(m.group(5))
+    return 5, by_code.get(m.group(6))
+
+
+def bench_classify(args):
+    from agntcl_classify import TokenClassifier
+    from gen_agntcl import gen_tier2_codes
+
+    assignments = load_assignments()
+    classifier = TokenClassifier(assignments)
+    by_code = {code: english for english, (code, _) in assignments.items()}
+    tier2_codes = set(gen_tier2_codes())
+
+    rng = random.Random(0)
+    codes = list(by_code)
+    tokens = []
+    for _ in range(args.tokens):
+        r = rng.random()
+        token = rng.choice(codes)
+        if r < 0.1:
+            token = rng.choice(['p.', 'f.', '!', '?', '~']) + token
+        elif r < 0.15 and not token.isdigit():
+            token += str(rng.randint(1, 20))
+        elif r < 0.2:
+            token = str(rng.randint(10, 99999))
+        tokens.append(token)
+
+    for token in tokens[:2000]:
+        kind, _, english, n = classifier.classify(token)
+        base_kind, value = regex_classify(token, by_code, tier2_codes)
+        assert kind == base_kind, token
+        assert (n if kind == 4 else english) == value, token
+
+    classify = classifier.classify
+    t_dfa = best_of(lambda: [classify(t) for t in tokens], args.repeat)
+    t_re = best_of(lambda: [regex_classify(t, by_code, tier2_codes)
+                            for t in tokens], args.repeat)
+    n_bytes = sum(len(t) for t in tokens)
+    report("regex classifier", t_re, n_bytes, len(tokens))
+    report("DFA classifier", t_dfa, n_bytes, len(tokens))
+    print(f"per token: regex {t_re / len(tokens) * 1e9:.0f} ns, "
+          f"DFA {t_dfa / len(tokens) * 1e9:.0f} ns")
+
+
+# ─── Batch encoding (agntcl_batch) ────────────────────────────────────────────
+
+def bench_batch(args):
+    import numpy as np
+    from agntcl_batch import BatchEncoder
+
+    assignments = load_assignments()
+    batch = BatchEncoder(assignments)
+    table = {e: c for e, (c, _) in assignments.items()}
+    vocab = batch.vocab
+    rng = np.random.default_rng(0)
+
+    for exp in args.exp:
+        n = 10 ** exp
+        ids = rng.integers(0, len(batch.vocab), n, dtype=np.int32)
+        out = np.empty(batch.rendered_size(batch.gather(ids)), dtype=np.uint8)
+        t_np = best_of(lambda: batch.render(batch.gather(ids), out),
+                       args.repeat)
+        report(f"numpy gather+render 10^{exp}", t_np, len(out), n)
+        if n <= args.loop_max:
+            id_list = ids.tolist()
+            t_py = best_of(lambda: ' '.join([table[vocab[i]]
+                                             for i in id_list]).encode(),
+                           args.repeat)
+            report(f"python loop 10^{exp}", t_py, len(out), n)
+            print(f"speedup at 10^{exp}: {t_py / t_np:.1f}x")
+        else:
+            print(f"python loop 10^{exp}: skipped (--loop-max {args.loop_max})")
+        del ids, out
+
+
+# ─── Incremental regeneration (gen_agntcl build cache) ─────────────────────────
+
+def bench_regen(args):
+    import tempfile
+    from agntcl_codebook import write_codebook
+    from agntcl_site import build_site
+    from gen_agntcl import (_file_stamp, assignments_digest, codebook_current,
+                            generate_sections, vocabulary_entries,
+                            vocabulary_pages)
+
+    words = build_word_list()
+    assignments = load_assignments()
+    entries = vocabulary_entries(assignments, words)
+    splitters = {'vocabulary': lambda fits: vocabulary_pages(entries, fits)}
+    sections = generate_sections(assignments, words)
+    # A small edit: one more line in the §9 examples.
+    edited = [(name, text + "\n" if name == 'examples' else text)
+              for name, text in sections]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        codebook = os.path.join(tmp, 'agntcl.codebook')
+        site = os.path.join(tmp, 'site')
+
+        def rebuild(sections, cache):
+            generate_sections(assignments, words)
+            if not codebook_current(codebook, assignments, cache):
+                write_codebook(codebook, assignments)
+                cache['codebook'] = (assignments_digest(assignments),
+                                     _file_stamp(codebook))
+            return build_site(site, sections, assignments,
+                              splitters=splitters,
+                              cache=cache.setdefault('site', {}))
+
+        full = rebuild(sections, {})
+        t_full = best_of(lambda: rebuild(sections, {}), args.repeat)
+        cache = {}
+        rebuild(sections, cache)
+        t_hit = best_of(lambda: rebuild(sections, cache), args.repeat)
+
+        def one_edit():
+            rebuild(edited, cache)
+            rebuild(sections, cache)
+
+        t_edit = best_of(one_edit, args.repeat) / 2
+        assert rebuild(sections, cache) == full
+    report("full rebuild", t_full)
+    report("cached, no changes", t_hit)
+    report("cached, one section edited", t_edit)
+    print(f"speedup: {t_full / t_hit:.1f}x unchanged, "
+          f"{t_full / t_edit:.1f}x after a small edit")
+
+
+# ─── Compression (the §1 "40-70% fewer characters" claim) ─────────────────────
+
+CORPUS = os.path.join(HERE, 'bench_corpus.txt')
+
+
+def codebook_digest(assignments):
+    """Short stable hash identifying one code assignment."""
+    rows = '\n'.join(f"{english}\t{code}"
+                     for english, (code, _) in sorted(assignments.items()))
+    return hashlib.sha256(rows.encode()).hexdigest()[:16]
+
+
+def bench_compression(args):
+    from agntcl_encoder import compile_encoder, encode
+    from agntcl_parser import build_inverse, decode, tokenize
+
+    with open(args.corpus) as f:
+        lines = [line for line in f if line.strip()]
+    english = ''.join(lines)
+    assignments = load_assignments()
+    table = compile_encoder(assignments)
+    inverse = build_inverse(assignments)
+
+    encoded = [encode(line, table) for line in lines]
+    n_words = sum(len(line.split()) for line in lines)
+    n_tokens = sum(1 for m in encoded for _ in tokenize(m))
+    chars_in = len(english) - len(lines)
+    chars_out = sum(len(m) for m in encoded)
+    bytes_in = len(english.encode()) - len(lines)
+    bytes_out = sum(len(m.encode()) for m in encoded)
+
+    t_encode = best_of(lambda: [encode(line, table) for line in lines],
+                       args.repeat)
+    t_decode = best_of(lambda: [decode(m, inverse) for m in encoded],
+                       args.repeat)
+
+    def round_trip():
+        return [decode(encode(line, table), inverse) for line in lines]
+
+    tracemalloc.start()
+    round_trip()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        'corpus': os.path.relpath(args.corpus, HERE),
+        'codebook': codebook_digest(assignments),
+        'entries': len(assignments),
+        'messages': len(lines),
+        'chars': {'english': chars_in, 'agntcl': chars_out,
+                  'saved': 1 - chars_out / chars_in},
+        'bytes': {'english': bytes_in, 'agntcl': bytes_out,
+                  'saved': 1 - bytes_out / bytes_in},
+        'encode_words_per_s': n_words / t_encode,
+        'decode_tokens_per_s': n_tokens / t_decode,
+        'peak_memory_bytes': peak,
+    }
+    if args.json:
+        print(json.dumps(result, indent=2, sort_keys=True))
+        return
+    print(f"corpus: {result['corpus']}, {len(lines)} messages, "
+          f"codebook {result['codebook']}")
+    print(f"chars  {chars_in:>9} -> {chars_out:>9}   "
+          f"saved {result['chars']['saved']:6.1%}   (claim: 40-70%)")
+    print(f"bytes  {bytes_in:>9} -> {bytes_out:>9}   "
+          f"saved {result['bytes']['saved']:6.1%}")
+    report("encode", t_encode, bytes_in, n_words, 'words')
+    report("decode", t_decode, bytes_out, n_tokens)
+    print(f"peak memory (encode + decode): {peak / 1024:.1f} KiB")
+
+
+# ─── Parallel encoding (agntcl_parallel) ──────────────────────────────────────
+
+def bench_parallel(args):
+    import tempfile
+    from agntcl_encoder import default_encoder
+    from agntcl_parallel import encode_file, encode_lines
+
+    text = synthetic_english(int(args.mb * 1e6)).replace('. ', '.\n')
+    data = text.encode()
+    table = default_encoder()
+    counts = args.workers or sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'in.txt')
+        dst = os.path.join(tmp, 'out.txt')
+        with open(src, 'wb') as f:
+            f.write(data)
+        expected = encode_lines(data, table)
+        t_serial = best_of(lambda: encode_lines(data, table), args.repeat)
+        print(f"corpus: {len(data) / 1e6:.1f} MB, "
+              f"{os.cpu_count()} cores, chunk {args.chunk_mb} MiB")
+        report("serial encode_lines()", t_serial, len(data))
+        chunk = int(args.chunk_mb * 2**20)
+        for n in counts:
+            t = best_of(lambda: encode_file(src, dst, n, chunk, table),
+                        args.repeat)
+            with open(dst, 'rb') as f:
+                assert f.read() == expected
+            report(f"encode_file workers={n}", t, len(data))
+            print(f"  speedup {t_serial / t:5.2f}x   "
+                  f"efficiency {t_serial / t / n:6.1%}")
+
+
+# ─── Translation service (agntcl_server) ──────────────────────────────────────
+
+async def _load_client(host, port, requests, latencies):
+    """One keep-alive connection sending `requests` back to back."""
+    import asyncio
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for request in requests:
+            t0 = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+            if not head.startswith(b'HTTP/1.1 200'):
+                raise RuntimeError(head.split(b'\r\n')[0].decode())
+    finally:
+        writer.close()
+
+
+def bench_server(args):
+    import asyncio
+    import subprocess
+    import sys
+    from urllib.parse import quote
+    from agntcl_encoder import default_encoder, encode
+
+    with open(CORPUS) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    table = default_encoder()
+    words = [w.strip('.,?!').lower() for line in lines for w in line.split()]
+    words = [w for w in words if w in table][:len(lines)]
+
+    def post(path, text):
+        body = text.encode()
+        return (f"POST {path} HTTP/1.1\r\nHost: bench\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+    pool = ([post('/encode', line) for line in lines] +
+            [post('/decode', encode(line, table)) for line in lines] +
+            [f"GET /lookup?word={quote(w)} HTTP/1.1\r\nHost: bench\r\n\r\n"
+             .encode() for w in words])
+    rng = random.Random(0)
+
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, 'agntcl_server.py'),
+         '--port', str(args.port)], stdout=subprocess.PIPE, text=True)
+    try:
+        print(server.stdout.readline().strip())
+
+        async def run(connections):
+            latencies = []
+            per_conn = args.requests // connections
+            t0 = time.perf_counter()
+            await asyncio.gather(*(
+                _load_client('127.0.0.1', args.port,
+                             rng.choices(pool, k=per_conn), latencies)
+                for _ in range(connections)))
+            return time.perf_counter() - t0, sorted(latencies)
+
+        for connections in args.connections:
+            elapsed, latencies = asyncio.run(run(connections))
+            n = len(latencies)
+            p50 = latencies[n // 2]
+            p99 = latencies[min(n - 1, int(n * 0.99))]
+            print(f"connections={connections:<4} {n / elapsed:9.0f} req/s   "
+                  f"p50 {p50 * 1e3:7.3f} ms   p99 {p99 * 1e3:7.3f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# ─── Compositions (agntcl_compose) ────────────────────────────────────────────
+
+def bench_compose(args):
+    from agntcl_compose import GLOSSES, Composer, compile_composing_encoder
+
+    assignments = load_assignments()
+    composer = Composer(assignments)
+    rng = random.Random(0)
+    words = rng.choices(sorted(composer.glosses), k=args.words)
+    unique = sorted(set(words))
+
+    table = compile_composing_encoder(assignments)
+    quoted = sum(len(w) + 2 for w in words)
+    composed = sum(len(table[w]) for w in words)
+    shorter = sum(table[w][0] == '~' for w in unique)
+    print(f"{len(words)} OOV words ({len(unique)} distinct glosses of "
+          f"{len(GLOSSES)}, {shorter} composed shorter than quoted): "
+          f"quoted {quoted} bytes, encoded {composed} bytes "
+          f"({composed / quoted:.2f}x)")
+
+    t_cold = best_of(lambda: [composer._resolve(w) for w in words],
+                     args.repeat)
+    t_warm = best_of(lambda: [composer.resolve(w) for w in words],
+                     args.repeat)
+    print(f"uncached set cover   {t_cold / len(words) * 1e9:8.0f} ns/word")
+    print(f"LRU-cached resolve   {t_warm / len(words) * 1e9:8.0f} ns/word")
+    print(f"cache: {composer.resolve.cache_info()}")
+
+
+# ─── Reference binding (agntcl_refs) ──────────────────────────────────────────
+
+def bench_refs(args):
+    from agntcl_parser import parse, unparse
+    from agntcl_refs import bind_repeats, default_base
+
+    assignments = load_assignments()
+    base = default_base(assignments)
+    rd, wr, cp = (assignments[w][0] for w in ('read', 'write', 'copy'))
+    rng = random.Random(0)
+    paths = [f'"/src/{w}/{v}.py"' for w in OOV_WORDS for v in OOV_WORDS[:3]]
+    pool = synthetic_agntcl(2000)
+    for n in args.statements:
+        # Agent-style messages: operations over a handful of recurring paths.
+        parts = []
+        for _ in range(n):
+            path = rng.choice(paths[:max(3, n // 20)])
+            parts.append(rng.choice([f'({rd} {path})', f'({wr} {path} 3 "ok")',
+                                     f'({cp} {path} {rng.choice(paths)})',
+                                     rng.choice(pool)]))
+        text = ' '.join(parts)
+        statements = parse(text)
+        new, saved = bind_repeats(statements, base)
+        t = best_of(lambda: bind_repeats(statements, base), args.repeat)
+        size = len(unparse(statements))
+        report(f"{n} statements", t, size)
+        print(f"  {size} -> {size - saved} bytes, saved {saved} "
+              f"({saved / size:.1%}), {t / size * 1e9:.0f} ns/byte")
+
+
+# ─── Session references (agntcl_session) ──────────────────────────────────────
+
+def bench_session(args):
+    from agntcl_parser import parse, unparse
+    from agntcl_session import Session, inline_literal_bindings
+
+    assignments = load_assignments()
+    lk = {w: assignments[w][0] for w in
+          ('task', 'agent', 'send', 'wait', 'result', 'file', 'read', 'test')}
+    rng = random.Random(0)
+    files = [f'"/repo/src/{w}/{v}.py"' for w in OOV_WORDS[:5]
+             for v in OOV_WORDS[5:]]
+    agents = [f'"{w}-agent"' for w in ('reviewer', 'tester', 'builder')]
+
+    # Pattern 5 delegation loop: bind a file and an agent, send, wait.
+    messages = []
+    for _ in range(args.messages):
+        f = rng.choice(files[:args.working_set])
+        a = rng.choice(agents)
+        messages.append(
+            f"{lk['file']}1 -> {f} {lk['agent']}1 -> {a} "
+            f"{lk['task']}1 -> ({lk['test']} {lk['file']}1) "
+            f"({lk['send']} {lk['task']}1 n {lk['agent']}1) "
+            f"({lk['wait']} {lk['result']} 2 {lk['agent']}1)")
+
+    sender = Session(capacity=args.capacity)
+    receiver = Session(capacity=args.capacity)
+    sizes = []
+    t0 = time.perf_counter()
+    for m in messages:
+        wire = unparse(sender.compress(parse(m)))
+        assert (unparse(receiver.expand(parse(wire)))
+                == unparse(inline_literal_bindings(parse(m))))
+        sizes.append((len(m), len(wire)))
+    elapsed = time.perf_counter() - t0
+
+    warm = sizes[len(sizes) // 2:]
+    plain = sum(a for a, _ in sizes)
+    session = sum(b for _, b in sizes)
+    print(f"{len(messages)} messages, working set {args.working_set} files, "
+          f"capacity {args.capacity}")
+    print(f"total bytes   plain {plain:8}   session {session:8}   "
+          f"({1 - session / plain:.1%} smaller)")
+    print(f"steady state  plain {sum(a for a, _ in warm) / len(warm):8.1f}   "
+          f"session {sum(b for _, b in warm) / len(warm):8.1f} bytes/message")
+    print(f"compress + expand + check: {len(messages) / elapsed:.0f} "
+          f"messages/s")
+
+
+# ─── Dataflow executor (agntcl_exec) ──────────────────────────────────────────
+
+def bench_exec(args):
+    import asyncio
+    from agntcl_exec import Executor
+    from agntcl_parser import parse
+
+    assignments = load_assignments()
+    run, test, result = (assignments[w][0] for w in ('run', 'test', 'result'))
+    delay = args.delay_ms / 1000
+
+    def blocking_run(target):
+        time.sleep(delay)
+        return f"built {target}"
+
+    async def async_test(target):
+        await asyncio.sleep(delay)
+        return f"ok {target}"
+
+    handlers = {'run': blocking_run, 'test': async_test}
+    for width in args.width:
+        # Pattern 6 pipelines side by side: run, then test what it built.
+        parts = []
+        n = 0
+        for branch in range(width):
+            prev = None
+            for step in range(args.depth):
+                n += 1
+                op = (f'({run} "job{branch}")' if prev is None
+                      else f'({test} {result}{prev})')
+                parts.append(f"{result}{n} -> {op}")
+                prev = n
+        statements = parse(' '.join(parts))
+        with Executor(handlers, assignments, max_workers=width) as executor:
+            timings = {}
+            for sequential in (True, False):
+                t0 = time.perf_counter()
+                asyncio.run(executor.execute(statements, sequential))
+                timings[sequential] = time.perf_counter() - t0
+        print(f"width {width:4} x depth {args.depth}: sequential "
+              f"{timings[True] * 1e3:9.1f} ms   dataflow "
+              f"{timings[False] * 1e3:8.1f} ms   "
+              f"speedup {timings[True] / timings[False]:6.1f}x")
+
+
+# ─── Code assignment at scale (gen_agntcl) ────────────────────────────────────
+
+class DomainWords:
+    """The built-in list (deduplicated) followed by n synthetic domain
+    terms, generated afresh on every iteration."""
+
+    def __init__(self, n):
+        self.n = n
+
+    def __iter__(self):
+        seen = set()
+        for english, category in build_word_list():
+            if english not in seen:
+                seen.add(english)
+                yield english, category
+        for i in range(self.n):
+            yield f"term{i:07d}", 'domain'
+
+
+def peak_heap(fn):
+    """Peak bytes of Python heap allocated while fn() runs."""
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def bench_assign(args):
+    from collections import Counter
+    from gen_agntcl import assign_codes_stream
+
+    def drain(n):
+        tiers = Counter()
+        for _, _, tier in assign_codes_stream(DomainWords(n)):
+            tiers[tier] += 1
+        return tiers
+
+    for n in args.words:
+        t_stream = best_of(lambda: drain(n), args.repeat)
+        t_dict = best_of(lambda: assign_codes(DomainWords(n)), args.repeat)
+        tiers = drain(n)
+        print(f"{n:>9} domain words: tiers "
+              + ' '.join(f"T{t}={tiers[t]}" for t in sorted(tiers)))
+        report("  assign_codes_stream()", t_stream, n_items=n, unit='words')
+        report("  assign_codes() -> dict", t_dict, n_items=n, unit='words')
+        stream_peak = peak_heap(lambda: drain(n))
+        dict_peak = peak_heap(lambda: assign_codes(DomainWords(n)))
+        print(f"  peak heap: stream {stream_peak / 1024:9.0f} KiB   "
+              f"dict {dict_peak / 1024:9.0f} KiB")
+
+
+# ─── Phrase automaton (agntcl_phrases) ────────────────────────────────────────
+
+# Candidate phrases and a sentence where their words meet in another
+# sense. Each must encode exactly as word by word; a phrase that fails
+# here does not belong in PHRASES.
+PHRASE_OTHER_SENSES = {
+    'due to': "the payment is due to the bank",
+    'in addition': "it is good in addition to speed",
+    'right now': "turn right now and then",
+    'can not': "you can not only read but write",
+    'is it': "this is it",
+    'going to': "we are going to the store",
+    'as well as': "it works as well as it can",
+    'did you know': "how did you know",
+}
+
+
+def bench_phrases(args):
+    from agntcl_encoder import compile_encoder, encode
+    from agntcl_phrases import PhraseEncoder
+
+    with open(args.corpus) as f:
+        lines = [line for line in f if line.strip()]
+    table = compile_encoder(load_assignments())
+    phrases = PhraseEncoder(table)
+    for phrase, sentence in PHRASE_OTHER_SENSES.items():
+        assert phrases.encode(sentence) == encode(sentence, table), phrase
+    n_bytes = sum(len(line.encode()) for line in lines)
+    n_words = sum(len(line.split()) for line in lines)
+
+    words_out = sum(len(encode(line, table)) for line in lines)
+    phrase_out = sum(len(phrases.encode(line)) for line in lines)
+    print(f"corpus: {os.path.relpath(args.corpus, HERE)}, {len(lines)} "
+          f"messages, {n_bytes} bytes, automaton {len(phrases.trans)} states")
+    print(f"output    word-by-word {words_out:7} bytes   phrases "
+          f"{phrase_out:7} bytes   ({phrase_out / words_out - 1:+.1%})")
+
+    t_words = best_of(lambda: [encode(line, table) for line in lines],
+                      args.repeat)
+    t_phrase = best_of(lambda: [phrases.encode(line) for line in lines],
+                       args.repeat)
+    report("word-by-word encode()", t_words, n_bytes, n_words, 'words')
+    report("PhraseEncoder.encode()", t_phrase, n_bytes, n_words, 'words')
+
+
+# ─── Binary wire format (agntcl_wire) ─────────────────────────────────────────
+
+def bench_wire(args):
+    from agntcl_parser import parse, unparse
+    from agntcl_wire import WireCodec, frame
+
+    codec = WireCodec(load_assignments())
+    messages = synthetic_agntcl(args.messages)
+    parsed = [parse(m) for m in messages]
+    texts = [unparse(p) for p in parsed]
+    payloads = [bytes(codec.encode(p)) for p in parsed]
+    assert [codec.decode(b) for b in payloads] == parsed
+
+    text_bytes = sum(len(t.encode()) + 1 for t in texts)     # + newline
+    stream = codec.stream_header() + b''.join(frame(b) for b in payloads)
+    print(f"{len(messages)} messages: text {text_bytes} bytes, wire "
+          f"{len(stream)} bytes framed ({len(stream) / text_bytes:.1%})")
+
+    t_unparse = best_of(lambda: [unparse(p) for p in parsed], args.repeat)
+    t_encode = best_of(lambda: [codec.encode(p) for p in parsed], args.repeat)
+    t_parse = best_of(lambda: [parse(t) for t in texts], args.repeat)
+    assert [codec.decode(v) for v in codec.iter_stream(stream)] == parsed
+    t_decode = best_of(lambda: [codec.decode(v)
+                                for v in codec.iter_stream(stream)],
+                       args.repeat)
+    for label, seconds in (("text unparse()", t_unparse),
+                           ("wire encode()", t_encode),
+                           ("text parse()", t_parse),
+                           ("wire decode() (frames)", t_decode)):
+        print(f"{label:<28} {seconds * 1000:9.2f} ms  "
+              f"{seconds / len(messages) * 1e6:8.2f} us/message")
+
+
+def bench_archive(args):
+    import os
+    import tempfile
+    import zlib
+
+    from agntcl_archive import ArchiveReader, ArchiveWriter
+    from agntcl_parser import parse, unparse
+    from agntcl_wire import WireCodec, frame
+
+    assignments = load_assignments()
+    codec = WireCodec(assignments)
+    messages = synthetic_agntcl(args.messages)
+    parsed = [parse(m) for m in messages]
+    text = ''.join(unparse(p) + '\n' for p in parsed).encode()
+    wire = b''.join(frame(bytes(codec.encode(p))) for p in parsed)
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.agar')
+
+    def write():
+        with ArchiveWriter(path, assignments, args.chunk) as writer:
+            for p in parsed:
+                writer.append(p)
+
+    t_write = best_of(write, args.repeat)
+    size = os.path.getsize(path)
+    print(f"{len(messages)} messages, {args.chunk} per chunk:")
+    for label, n in (("text", len(text)),
+                     ("text + zlib", len(zlib.compress(text, 6))),
+                     ("wire", len(wire)),
+                     ("wire + zlib", len(zlib.compress(wire, 6))),
+                     ("archive", size)):
+        print(f"  {label:<14} {n:10d} bytes  {n / len(text):6.1%}")
+    report("archive write", t_write, n_items=len(messages), unit="msg")
+
+    rng = random.Random(1)
+    ids = [rng.randrange(len(messages)) for _ in range(args.lookups)]
+    with ArchiveReader(path) as reader:
+        assert [reader[i] for i in ids[:200]] == [parsed[i] for i in ids[:200]]
+
+        def cold():
+            reader.column.cache_clear()
+            for i in ids:
+                reader[i]
+
+        t_cold = best_of(cold, args.repeat)
+        t_scan = best_of(lambda: sum(1 for _ in reader.scan_codes(3)),
+                         args.repeat)
+        t_all = best_of(lambda: [reader[i] for i in range(len(reader))], 1)
+    t_parse = best_of(lambda: [parse(line) for line in
+                               text.decode().splitlines()], 1)
+    print(f"{'random get (cache of 8)':<28} "
+          f"{t_cold / len(ids) * 1e6:8.2f} us/message")
+    for label, seconds in (("scan tier-3 column", t_scan),
+                           ("decode every message", t_all),
+                           ("parse the text file", t_parse)):
+        print(f"{label:<28} {seconds * 1000:9.2f} ms")
+    os.remove(path)
+
+
+def bench_index(args):
+    import os
+    import tempfile
+
+    from agntcl_index import Index, Indexer, write_index
+    from agntcl_parser import parse
+
+    messages = synthetic_agntcl(args.messages)
+    parsed = [parse(m) for m in messages]
+
+    def build():
+        indexer = Indexer()
+        for p in parsed:
+            indexer.add(p)
+        return indexer
+
+    t_build = best_of(build, args.repeat)
+    indexer = build()
+    entries = sum(len(ids) for ids in indexer.postings.values())
+    print(f"{len(messages)} messages: {len(indexer.postings)} keys, "
+          f"{entries / len(messages):.1f} postings/message")
+    report("index (parsed messages)", t_build, n_items=len(messages),
+           unit="msg")
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.agix')
+    n = len(messages) * args.scale
+    if args.scale > 1:
+        import numpy as np
+        # The corpus repeated `scale` times: each list, shifted per copy.
+        shifts = np.arange(args.scale, dtype='<u4') * len(messages)
+        postings = {key: (np.frombuffer(ids, dtype='<u4')[None, :]
+                          + shifts[:, None]).ravel()
+                    for key, ids in indexer.postings.items()}
+    else:
+        postings = indexer.postings
+    t0 = time.perf_counter()
+    write_index(path, postings, n)
+    t_write = time.perf_counter() - t0
+    del postings
+    print(f"{n} messages (x{args.scale}): index "
+          f"{os.path.getsize(path) / 2 ** 20:.0f} MiB, written in "
+          f"{t_write:.1f} s")
+
+    heads = sorted(indexer.postings, key=lambda k: -len(indexer.postings[k]))
+    head = next(k[2:] for k in heads if k.startswith('h:'))
+    arg = next(k.split()[1] for k in heads if k.startswith(f'a:{head} '))
+    rare = next(k[2:] for k in reversed(heads) if k.startswith('c:'))
+    queries = [f"{rare}", f"({head} {arg})", f"({head} {arg[:1]}*)",
+               f"p.{arg} | !{arg}", f"({head} {arg}) -{rare}", f"-{rare}",
+               f"{arg[:1]}* ({head})"]
+    with Index(path) as index:
+        for query in queries:
+            t = best_of(lambda: index.search(query), args.repeat)
+            print(f"  {query:<24} {len(index.search(query)):10d} hits "
+                  f"{t * 1000:9.2f} ms")
+        query = f"({head} {arg}) then {arg}"
+        t = best_of(lambda: index.search(
+            query, lambda i: parsed[i % len(parsed)])[:1000], 1)
+        print(f"  {query:<24} verified      {t * 1000:9.2f} ms")
+    os.remove(path)
+
+
+def synthetic_frames(n_patterns, n_messages, seed=0):
+    """Frame handler patterns and frames that mostly hit one of them."""
+    rng = random.Random(seed)
+    codes = [code for code, _ in load_assignments().values()]
+    heads = rng.sample(codes, 64)
+    pool = rng.sample(codes, 400)
+
+    def value(kind):
+        if kind == 'str':
+            return f'"{rng.choice(OOV_WORDS)}"'
+        if kind == 'num':
+            return str(rng.randint(10, 999))
+        if kind == 'op':
+            return f"({rng.choice(pool)} {rng.choice(pool)})"
+        if kind == 'frame':
+            return f"{{{rng.choice(heads)} {rng.choice(pool)}}}"
+        return rng.choice(pool)
+
+    def pattern():
+        args = []
+        for _ in range(rng.randint(0, 4)):
+            r = rng.random()
+            if r < 0.5:
+                args.append(rng.choice(pool))
+            elif r < 0.65:
+                args.append('_')
+            elif r < 0.8:
+                args.append('$' + rng.choice(('tok', 'str', 'num', 'op')))
+            else:
+                args.append(f"{{{rng.choice(heads)} *}}")
+        if rng.random() < 0.3:
+            args.append('*')
+        return '{' + ' '.join([rng.choice(heads)] + args) + '}'
+
+    patterns = list(dict.fromkeys(pattern() for _ in range(n_patterns)))
+
+    def instance(p):
+        out = []
+        for part in re.findall(r'\{\S+ \*\}|\S+', p[1:-1]):
+            if part == '_':
+                out.append(value(rng.choice(('tok', 'str', 'num', 'op'))))
+            elif part.startswith('$'):
+                out.append(value(part[1:]))
+            elif part == '*':
+                out += [value('tok') for _ in range(rng.randint(0, 3))]
+            elif part.startswith('{'):
+                out.append(part[:-2] + value('tok') + '}')
+            else:
+                out.append(part)
+        return '{' + ' '.join(out) + '}'
+
+    messages = []
+    for _ in range(n_messages):
+        if rng.random() < 0.8:
+            messages.append(instance(rng.choice(patterns)))
+        else:
+            messages.append('{' + ' '.join([rng.choice(heads)] + [
+                value('tok') for _ in range(rng.randint(0, 4))]) + '}')
+    return patterns, messages
+
+
+def bench_dispatch(args):
+    from agntcl_dispatch import Dispatcher, compile_pattern, match
+    from agntcl_parser import parse
+
+    for n in args.handlers:
+        patterns, messages = synthetic_frames(n, args.messages)
+        frames = [parse(m)[0] for m in messages]
+        dispatcher = Dispatcher()
+        t0 = time.perf_counter()
+        for i, pattern in enumerate(patterns):
+            dispatcher.register(pattern, i)
+        t_compile = time.perf_counter() - t0
+        compiled = [compile_pattern(p) for p in patterns]
+
+        found = [dispatcher.lookup(f) for f in frames]
+        for frame, hit in zip(frames, found):
+            if hit is None:
+                assert all(match(e, frame) is None for e in compiled)
+            else:
+                assert match(compiled[hit[0]], frame) == hit[1]
+
+        def linear():
+            for frame in frames:
+                for edges in compiled:
+                    if match(edges, frame) is not None:
+                        break
+
+        t_tree = best_of(lambda: [dispatcher.lookup(f) for f in frames],
+                         args.repeat)
+        t_linear = best_of(linear, 1) if n <= args.linear_max else None
+        hits = sum(hit is not None for hit in found)
+        line = (f"{len(patterns):6d} handlers  compile {t_compile * 1000:7.1f}"
+                f" ms  tree {t_tree / len(frames) * 1e6:7.2f} us/frame")
+        if t_linear is not None:
+            line += (f"  linear {t_linear / len(frames) * 1e6:9.2f} us/frame"
+                     f"  ({t_linear / t_tree:.0f}x)")
+        print(line + f"  {hits / len(frames):.0%} matched")
+
+
+def bench_metrics(args):
+    from agntcl_encoder import encode
+    from agntcl_metrics import Metrics
+    from agntcl_parser import build_inverse, decode
+    from agntcl_server import Translator
+
+    assignments = load_assignments()
+    with open(CORPUS) as f:
+        lines = [line for line in f if line.strip()]
+    lines *= max(1, args.lines // len(lines))
+    bodies = [line.encode() for line in lines]
+    off = Translator(assignments)
+    on = Translator(assignments, metrics=True)
+    metrics = Metrics(assignments)
+    inverse = build_inverse(assignments)
+    encoded = [encode(line, off.table) for line in lines]
+
+    cases = (
+        ("encode()", lambda: [encode(b.decode('utf-8', 'replace'),
+                                     off.table) for b in bodies]),
+        ("server encode, metrics off", lambda: [off._encode(b)
+                                                for b in bodies]),
+        ("server encode, metrics on", lambda: [on._encode(b)
+                                               for b in bodies]),
+        ("decode()", lambda: [decode(t, inverse) for t in encoded]),
+        ("Metrics.decode()", lambda: [metrics.decode(t, inverse)
+                                      for t in encoded]),
+    )
+    times = {label: best_of(fn, args.repeat) for label, fn in cases}
+    for label, seconds in times.items():
+        print(f"{label:<28} {seconds / len(lines) * 1e6:8.2f} us/line")
+    for plain, other in (("encode()", "server encode, metrics off"),
+                         ("encode()", "server encode, metrics on"),
+                         ("decode()", "Metrics.decode()")):
+        print(f"{other:<28} {times[other] / times[plain] - 1:+8.1%} "
+              f"vs {plain}")
+    t_render = best_of(on.metrics.render, args.repeat)
+    print(f"{'render /metrics':<28} {t_render * 1000:8.2f} ms "
+          f"({len(on.metrics.render())} bytes)")
+
+
+def bench_snapshot(args):
+    import statistics
+    import subprocess
+    import sys
+
+    import agntcl_snapshot
+
+    agntcl_snapshot.code_for('file')         # write the snapshot if stale
+    probe = """
+import time
+t0 = time.perf_counter()
+{imports}
+t1 = time.perf_counter()
+result = {lookup}
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+    cases = (
+        ("snapshot code_for()", "import agntcl_snapshot",
+         "agntcl_snapshot.code_for('file')", 'agntcl_snapshot'),
+        ("snapshot WORDS[...]", "import agntcl_snapshot",
+         "agntcl_snapshot.WORDS['file']", 'agntcl_snapshot'),
+        ("load_assignments()", "from gen_agntcl import load_assignments",
+         "load_assignments()['file'][0]", 'gen_agntcl'),
+    )
+    print(f"{'':<22} {'importtime':>11} {'import':>10} {'lookup':>10} "
+          f"{'total':>10}   (median of {args.runs} fresh interpreters)")
+    for label, imports, lookup, module in cases:
+        rows = []
+        code = probe.format(imports=imports, lookup=lookup)
+        for _ in range(args.runs):
+            run = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                                  code], cwd=HERE, capture_output=True,
+                                 text=True, check=True)
+            cumulative = next(int(line.split('|')[1])
+                              for line in run.stderr.splitlines()
+                              if line.rstrip().endswith(f'| {module}'))
+            t_import, t_lookup = map(float, run.stdout.split())
+            rows.append((cumulative, t_import * 1e6, t_lookup * 1e6))
+        importtime, t_import, t_lookup = (statistics.median(col)
+                                          for col in zip(*rows))
+        print(f"{label:<22} {importtime:8.0f} us {t_import:7.0f} us "
+              f"{t_lookup:7.0f} us {t_import + t_lookup:7.0f} us")
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    sub = parser.add_subparsers(dest='bench', required=True)
+
+    p = sub.add_parser('encode', help='compiled encoder vs naive lookups')
+    p.add_argument('--mb', type=float, default=8.0)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_encode)
+
+    p = sub.add_parser('parse', help='tokenizer/parser/decoder throughput')
+    p.add_argument('--messages', type=int, default=20000)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_parse)
+
+    p = sub.add_parser('codebook', help='mmap codebook load and lookup')
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_codebook)
+
+    p = sub.add_parser('classify', help='DFA vs regex token classifier')
+    p.add_argument('--tokens', type=int, default=200000)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_classify)
+
+    p = sub.add_parser('batch', help='numpy batch encoding vs Python loop')
+    p.add_argument('--exp', type=int, nargs='+', default=[6, 8],
+                   help='token counts as powers of ten')
+    p.add_argument('--loop-max', type=int, default=10 ** 7,
+                   help='largest size to run the Python baseline on')
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_batch)
+
+    p = sub.add_parser('regen', help='cached rebuild of the spec outputs')
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(fn=bench_regen)
+
+    p = sub.add_parser('compression', help='characters/bytes saved on a '
+                                           'corpus, codec throughput')
+    p.add_argument('--corpus', default=CORPUS)
+    p.add_argument('--json', action='store_true',
+                   help='print machine-readable results')
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(fn=bench_compression)
+
+    p = sub.add_parser('parallel', help='process-pool encoder scaling')
+    p.add_argument('--mb', type=float, default=64.0)
+    p.add_argument('--chunk-mb', type=float, default=4.0)
+    p.add_argument('--workers', type=int, nargs='+',
+                   help='worker counts to run (default: 1 2 4 8 and all cores)')
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_parallel)
+
+    p = sub.add_parser('server', help='load test of the translation service')
+    p.add_argument('--port', type=int, default=8099)
+    p.add_argument('--requests', type=int, default=20000)
+    p.add_argument('--connections', type=int, nargs='+', default=[1, 16, 64])
+    p.set_defaults(fn=bench_server)
+
+    p = sub.add_parser('compose', help='OOV composition search and its cache')
+    p.add_argument('--words', type=int, default=100000)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_compose)
+
+    p = sub.add_parser('refs', help='automatic reference binding')
+    p.add_argument('--statements', type=int, nargs='+',
+                   default=[10, 100, 1000, 10000])
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_refs)
+
+    p = sub.add_parser('session', help='cross-message session references')
+    p.add_argument('--messages', type=int, default=5000)
+    p.add_argument('--working-set', type=int, default=10)
+    p.add_argument('--capacity', type=int, default=64)
+    p.set_defaults(fn=bench_session)
+
+    p = sub.add_parser('exec', help='dataflow vs sequential pipeline runs')
+    p.add_argument('--width', type=int, nargs='+', default=[1, 8, 64])
+    p.add_argument('--depth', type=int, default=4)
+    p.add_argument('--delay-ms', type=float, default=5.0,
+                   help='simulated latency of each operation')
+    p.set_defaults(fn=bench_exec)
+
+    p = sub.add_parser('assign', help='streamed code assignment at scale')
+    p.add_argument('--words', type=int, nargs='+',
+                   default=[10_000, 100_000, 1_000_000])
+    p.add_argument('--repeat', type=int, default=1)
+    p.set_defaults(fn=bench_assign)
+
+    p = sub.add_parser('phrases', help='phrase automaton vs word-by-word')
+    p.add_argument('--corpus', default=CORPUS)
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(fn=bench_phrases)
+
+    p = sub.add_parser('wire', help='binary wire format vs text')
+    p.add_argument('--messages', type=int, default=5000)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_wire)
+
+    p = sub.add_parser('archive', help='columnar archive size and access')
+    p.add_argument('--messages', type=int, default=50000)
+    p.add_argument('--chunk', type=int, default=4096)
+    p.add_argument('--lookups', type=int, default=2000)
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_archive)
+
+    p = sub.add_parser('index', help='inverted index build and query speed')
+    p.add_argument('--messages', type=int, default=50000)
+    p.add_argument('--scale', type=int, default=200,
+                   help='query a corpus this many times larger (numpy)')
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_index)
+
+    p = sub.add_parser('dispatch', help='frame dispatch tree vs linear scan')
+    p.add_argument('--handlers', type=int, nargs='+',
+                   default=[100, 1000, 10000])
+    p.add_argument('--messages', type=int, default=5000)
+    p.add_argument('--linear-max', type=int, default=1000,
+                   help='largest handler count to run the linear scan on')
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(fn=bench_dispatch)
+
+    p = sub.add_parser('metrics', help='instrumentation overhead')
+    p.add_argument('--lines', type=int, default=20000)
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(fn=bench_metrics)
+
+    p = sub.add_parser('snapshot', help='cold-start import + first lookup')
+    p.add_argument('--runs', type=int, default=15)
+    p.set_defaults(fn=bench_snapshot)
+
+    args = parser.parse_args()
+    args.fn(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,20 @@
 #!/usr/bin/env python3
 """Generate ZQX Language Specification v2.0 with 2000-word vocabulary."""
 
+import argparse
+import hashlib
+import marshal
+import os
 import string
-from itertools import product
+import sys
+from itertools import chain, count, product
+
+from agntcl_codebook import write_codebook
+from agntcl_snapshot import write_snapshot
+from agntcl_site import DEFAULT_BUDGET, build_site
+
+# Generated artifacts (spec, codebook, ledger) live next to this script.
+OUT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # ─── Tier 1: 36 single-character codes ───────────────────────────────────────
 # Mappings are intentionally scrambled — no letter matches its English phonetic.
@@ -47,24 +59,36 @@ EXCLUDED_2CHAR = {
 
 def gen_tier2_codes():
     """All available 2-char [a-z][a-z] codes, excluding English words."""
-    codes = []
     for a in string.ascii_lowercase:
         for b in string.ascii_lowercase:
             code = a + b
             if code not in EXCLUDED_2CHAR:
-                codes.append(code)
-    return codes
+                yield code
 
 CONSONANTS_20 = list('bcdfghjklmnpqrstvwxz')
 
 def gen_tier3_codes():
     """3-char consonant-only codes (no vowels, no y). 20^3 = 8000 possible."""
-    codes = []
     for a in CONSONANTS_20:
         for b in CONSONANTS_20:
             for c in CONSONANTS_20:
-                codes.append(a + b + c)
-    return codes
+                yield a + b + c
+
+# Consonant-only spellings that English nonetheless uses (interjections and
+# loanwords). Tier-3 predates this list; tier-4 skips them.
+EXCLUDED_CONSONANT_WORDS = {
+    'brrr', 'crwth', 'cwtch', 'grrr', 'hmmm', 'phpht', 'pfft', 'psst',
+    'pssst', 'shhh', 'tsktsk', 'zzzz',
+}
+
+def gen_tier4_codes():
+    """Consonant-only codes of 4+ chars, shortest first: 20^4 = 160000 of
+    length 4, then 20^5, and so on. Never exhausted."""
+    for length in count(4):
+        for letters in product(CONSONANTS_20, repeat=length):
+            code = ''.join(letters)
+            if code not in EXCLUDED_CONSONANT_WORDS:
+                yield code
 
 # ─── 2000 most common English words, by category ─────────────────────────────
 # Words already in tier-1 are noted but not re-assigned.
@@ -522,173 +546,270 @@ def build_word_list():
     return words
 
 
-def assign_codes(words):
+# ~400 highest-frequency English words that MUST get tier-2 codes
+# (beyond the 36 already in tier-1). Sorted by frequency; a word listed
+# twice ranks by its later position.
+PRIORITY = [
+    # Top function words
+    'the', 'a', 'that', 'he', 'she', 'they', 'him', 'her', 'them',
+    'his', 'its', 'our', 'their', 'who', 'which', 'an', 'some', 'any',
+    'would', 'there', 'will', 'can', 'could', 'may', 'should', 'was',
+    'were', 'are', 'been', 'had', 'has', 'does', 'did', 'must',
+    'about', 'than', 'because', 'when', 'where', 'how', 'then', 'now',
+    'here', 'also', 'very', 'just', 'only', 'too', 'so', 'still',
+    'already', 'even', 'again', 'never', 'always', 'often',
+    'after', 'before', 'into', 'over', 'out', 'down', 'off', 'up',
+    'through', 'between', 'under', 'until', 'while', 'since',
+    'although', 'however', 'though', 'yet', 'perhaps', 'both',
+    'every', 'more', 'most', 'many', 'much', 'few', 'less',
+    'these', 'those', 'one', 'something', 'anything', 'nothing',
+    'someone', 'everyone', 'myself', 'themselves',
+    # Top verbs
+    'come', 'take', 'see', 'want', 'use', 'find', 'tell', 'ask',
+    'work', 'seem', 'feel', 'try', 'leave', 'call', 'need', 'keep',
+    'let', 'begin', 'show', 'hear', 'play', 'run', 'move', 'live',
+    'believe', 'bring', 'happen', 'write', 'sit', 'stand', 'lose',
+    'pay', 'meet', 'include', 'continue', 'set', 'learn', 'change',
+    'lead', 'understand', 'watch', 'follow', 'stop', 'create',
+    'speak', 'read', 'allow', 'add', 'spend', 'grow', 'open', 'walk',
+    'win', 'offer', 'remember', 'love', 'consider', 'appear', 'buy',
+    'wait', 'serve', 'die', 'send', 'expect', 'build', 'stay', 'fall',
+    'cut', 'reach', 'kill', 'remain', 'suggest', 'raise', 'pass',
+    'sell', 'require', 'report', 'decide', 'pull', 'develop',
+    'produce', 'eat', 'draw', 'break', 'hold', 'think', 'help',
+    'start', 'turn', 'look', 'put', 'become', 'agree', 'act', 'check',
+    'close', 'carry', 'provide', 'touch', 'receive', 'choose', 'deal',
+    'mean', 'form', 'save', 'face', 'test', 'sort', 'sound', 'share',
+    'matter', 'head', 'cause', 'design', 'join', 'own', 'drive',
+    'fill', 'fit', 'fight', 'miss', 'hope', 'copy', 'wish',
+    'support', 'result', 'plan', 'train', 'return', 'point', 'claim',
+    'describe', 'force', 'cover', 'cost', 'shoot', 'state', 'enter',
+    'manage', 'record', 'prepare', 'control', 'present', 'mark',
+    'place', 'strike', 'order', 'replace', 'connect', 'delete', 'fix',
+    # Top nouns
+    'time', 'people', 'way', 'day', 'man', 'woman', 'child', 'world',
+    'life', 'hand', 'part', 'place', 'case', 'week', 'company',
+    'system', 'program', 'question', 'work', 'government', 'number',
+    'night', 'point', 'home', 'water', 'room', 'mother', 'area',
+    'money', 'story', 'fact', 'month', 'lot', 'right', 'study',
+    'book', 'eye', 'job', 'word', 'business', 'issue', 'side', 'kind',
+    'head', 'house', 'service', 'friend', 'father', 'power', 'hour',
+    'game', 'line', 'end', 'member', 'law', 'car', 'city', 'name',
+    'team', 'minute', 'idea', 'body', 'information', 'back', 'parent',
+    'face', 'level', 'office', 'door', 'health', 'person', 'art',
+    'war', 'history', 'party', 'result', 'change', 'morning',
+    'reason', 'research', 'girl', 'guy', 'moment', 'air', 'teacher',
+    'force', 'education', 'food', 'problem', 'group', 'state',
+    'family', 'school', 'country', 'market', 'report', 'class',
+    'year', 'age', 'thing', 'need', 'love', 'form',
+    'file', 'code', 'error', 'task', 'message', 'data', 'process',
+    'test', 'user', 'type', 'value', 'model', 'list', 'string',
+    'function', 'event', 'field', 'path', 'node', 'key', 'table',
+    'source', 'object', 'method', 'network', 'tool', 'server',
+    'status', 'token', 'agent', 'memory', 'input', 'output',
+    # Top adjectives
+    'good', 'new', 'first', 'last', 'long', 'great', 'little', 'own',
+    'big', 'high', 'different', 'small', 'large', 'next', 'early',
+    'young', 'important', 'public', 'bad', 'same', 'able', 'old',
+    'right', 'better', 'best', 'free', 'major', 'sure', 'real',
+    'full', 'clear', 'hard', 'possible', 'whole', 'special', 'short',
+    'single', 'personal', 'current', 'left', 'open', 'close', 'hot',
+    'cold', 'dark', 'light', 'fast', 'slow', 'simple', 'strong',
+    'easy', 'ready', 'local', 'final', 'main', 'common', 'black',
+    'white', 'red', 'blue', 'green', 'certain', 'true', 'human',
+    'available', 'recent', 'likely',
+]
+
+
+def _code_pool(reserved):
+    """(code, tier) pairs in hand-out order, tier-2 through tier-4, skipping
+    codes in `reserved`. Lazy, so only the codes actually used are built."""
+    pools = chain(((code, 2) for code in gen_tier2_codes()),
+                  ((code, 3) for code in gen_tier3_codes()),
+                  ((code, 4) for code in gen_tier4_codes()))
+    return ((code, tier) for code, tier in pools if code not in reserved)
+
+
+def _draw(pool, english):
+    """Next code from pool that doesn't phonetically match english."""
+    for code, tier in pool:
+        if code != english[:len(code)]:
+            return code, tier
+    raise ValueError("code pool exhausted")
+
+
+def assign_codes_stream(words, ledger=None):
     """
-    Assign ZQX codes to words. Returns dict: english -> (code, tier).
-    Tier-1 words get their existing codes; remaining words get tier-2 or tier-3.
-    Priority words always get tier-2 (shorter) codes.
+    Yield (english, code, tier) for each distinct english in `words`, an
+    iterable of (english, category) pairs; a repeated word keeps the code
+    of its first occurrence and is not yielded again.
+
+    This is the entry point for large vocabularies: the codes are yielded,
+    not kept, so memory holds only the set of words seen so far (about
+    100 bytes a word) instead of assign_codes()' dict. Two passes over
+    `words`: the first collects the PRIORITY words it holds; those draw
+    their codes up front, in rank order, and the second pass hands out
+    the rest in list order, so the draw order is the same as building the
+    whole list first. `words` must therefore be re-iterable: a list, or an
+    object whose __iter__ rereads a file.
+
+    `ledger` pins codes exactly as in assign_codes().
     """
-    # ~400 highest-frequency English words that MUST get tier-2 codes
-    # (beyond the 36 already in tier-1). Sorted by frequency.
-    PRIORITY = [
-        # Top function words
-        'the', 'a', 'that', 'he', 'she', 'they', 'him', 'her', 'them',
-        'his', 'its', 'our', 'their', 'who', 'which', 'an', 'some', 'any',
-        'would', 'there', 'will', 'can', 'could', 'may', 'should', 'was',
-        'were', 'are', 'been', 'had', 'has', 'does', 'did', 'must',
-        'about', 'than', 'because', 'when', 'where', 'how', 'then', 'now',
-        'here', 'also', 'very', 'just', 'only', 'too', 'so', 'still',
-        'already', 'even', 'again', 'never', 'always', 'often',
-        'after', 'before', 'into', 'over', 'out', 'down', 'off', 'up',
-        'through', 'between', 'under', 'until', 'while', 'since',
-        'although', 'however', 'though', 'yet', 'perhaps', 'both',
-        'every', 'more', 'most', 'many', 'much', 'few', 'less',
-        'these', 'those', 'one', 'something', 'anything', 'nothing',
-        'someone', 'everyone', 'myself', 'themselves',
-        # Top verbs
-        'come', 'take', 'see', 'want', 'use', 'find', 'tell', 'ask',
-        'work', 'seem', 'feel', 'try', 'leave', 'call', 'need', 'keep',
-        'let', 'begin', 'show', 'hear', 'play', 'run', 'move', 'live',
-        'believe', 'bring', 'happen', 'write', 'sit', 'stand', 'lose',
-        'pay', 'meet', 'include', 'continue', 'set', 'learn', 'change',
-        'lead', 'understand', 'watch', 'follow', 'stop', 'create',
-        'speak', 'read', 'allow', 'add', 'spend', 'grow', 'open', 'walk',
-        'win', 'offer', 'remember', 'love', 'consider', 'appear', 'buy',
-        'wait', 'serve', 'die', 'send', 'expect', 'build', 'stay', 'fall',
-        'cut', 'reach', 'kill', 'remain', 'suggest', 'raise', 'pass',
-        'sell', 'require', 'report', 'decide', 'pull', 'develop',
-        'produce', 'eat', 'draw', 'break', 'hold', 'think', 'help',
-        'start', 'turn', 'look', 'put', 'become', 'agree', 'act', 'check',
-        'close', 'carry', 'provide', 'touch', 'receive', 'choose', 'deal',
-        'mean', 'form', 'save', 'face', 'test', 'sort', 'sound', 'share',
-        'matter', 'head', 'cause', 'design', 'join', 'own', 'drive',
-        'fill', 'fit', 'fight', 'miss', 'hope', 'copy', 'wish',
-        'support', 'result', 'plan', 'train', 'return', 'point', 'claim',
-        'describe', 'force', 'cover', 'cost', 'shoot', 'state', 'enter',
-        'manage', 'record', 'prepare', 'control', 'present', 'mark',
-        'place', 'strike', 'order', 'replace', 'connect', 'delete', 'fix',
-        # Top nouns
-        'time', 'people', 'way', 'day', 'man', 'woman', 'child', 'world',
-        'life', 'hand', 'part', 'place', 'case', 'week', 'company',
-        'system', 'program', 'question', 'work', 'government', 'number',
-        'night', 'point', 'home', 'water', 'room', 'mother', 'area',
-        'money', 'story', 'fact', 'month', 'lot', 'right', 'study',
-        'book', 'eye', 'job', 'word', 'business', 'issue', 'side', 'kind',
-        'head', 'house', 'service', 'friend', 'father', 'power', 'hour',
-        'game', 'line', 'end', 'member', 'law', 'car', 'city', 'name',
-        'team', 'minute', 'idea', 'body', 'information', 'back', 'parent',
-        'face', 'level', 'office', 'door', 'health', 'person', 'art',
-        'war', 'history', 'party', 'result', 'change', 'morning',
-        'reason', 'research', 'girl', 'guy', 'moment', 'air', 'teacher',
-        'force', 'education', 'food', 'problem', 'group', 'state',
-        'family', 'school', 'country', 'market', 'report', 'class',
-        'year', 'age', 'thing', 'need', 'love', 'form',
-        'file', 'code', 'error', 'task', 'message', 'data', 'process',
-        'test', 'user', 'type', 'value', 'model', 'list', 'string',
-        'function', 'event', 'field', 'path', 'node', 'key', 'table',
-        'source', 'object', 'method', 'network', 'tool', 'server',
-        'status', 'token', 'agent', 'memory', 'input', 'output',
-        # Top adjectives
-        'good', 'new', 'first', 'last', 'long', 'great', 'little', 'own',
-        'big', 'high', 'different', 'small', 'large', 'next', 'early',
-        'young', 'important', 'public', 'bad', 'same', 'able', 'old',
-        'right', 'better', 'best', 'free', 'major', 'sure', 'real',
-        'full', 'clear', 'hard', 'possible', 'whole', 'special', 'short',
-        'single', 'personal', 'current', 'left', 'open', 'close', 'hot',
-        'cold', 'dark', 'light', 'fast', 'slow', 'simple', 'strong',
-        'easy', 'ready', 'local', 'final', 'main', 'common', 'black',
-        'white', 'red', 'blue', 'green', 'certain', 'true', 'human',
-        'available', 'recent', 'likely',
-    ]
+    if iter(words) is words:
+        raise TypeError("assign_codes_stream() needs a re-iterable, "
+                        "not a one-shot iterator")
+    pinned = ledger or {}
+    reserved = {code for code, tier in pinned.values()}
+    pool = _code_pool(reserved)
 
-    tier1_words = set(TIER1.values())
-    tier2_pool = gen_tier2_codes()
-    tier3_pool = gen_tier3_codes()
-
-    assignments = {}
+    priority_rank = {w: i for i, w in enumerate(PRIORITY)}
+    present = {english for english, category in words
+               if english in priority_rank}
+    priority = {}
+    for english in sorted(present, key=priority_rank.get):
+        if english not in TIER1_REV and english not in pinned:
+            priority[english] = _draw(pool, english)
 
-    # Register tier-1 words
     for code, english in TIER1.items():
-        assignments[english] = (code, 1)
-
-    # Collect all unique words needing codes
-    seen = set(tier1_words)
-    all_words = []
+        yield english, code, 1
+    seen = set()
     for english, category in words:
-        if english not in seen:
-            seen.add(english)
-            all_words.append((english, category))
-
-    # Build priority index (lower = more important)
-    priority_set = set(PRIORITY)
-    priority_rank = {w: i for i, w in enumerate(PRIORITY)}
-
-    # Sort: priority words first (by rank), then non-priority (by list order)
-    priority_words = []
-    other_words = []
-    for english, category in all_words:
-        if english in priority_set:
-            priority_words.append((english, category, priority_rank[english]))
-        else:
-            other_words.append((english, category))
-
-    priority_words.sort(key=lambda x: x[2])
-    sorted_words = [(e, c) for e, c, _ in priority_words] + other_words
-
-    # Assign codes
-    t2_idx = 0
-    t3_idx = 0
-
-    for english, category in sorted_words:
-        if t2_idx < len(tier2_pool):
-            # Find next code that doesn't phonetically match the word
-            while t2_idx < len(tier2_pool):
-                code = tier2_pool[t2_idx]
-                if code != english[:2]:
-                    break
-                t2_idx += 1
-            if t2_idx < len(tier2_pool):
-                assignments[english] = (code, 2)
-                t2_idx += 1
-            else:
-                code = tier3_pool[t3_idx]
-                assignments[english] = (code, 3)
-                t3_idx += 1
+        if english in TIER1_REV or english in seen:
+            continue
+        seen.add(english)
+        if english in pinned:
+            code, tier = pinned[english]
+        elif english in priority:
+            code, tier = priority[english]
         else:
-            code = tier3_pool[t3_idx]
-            assignments[english] = (code, 3)
-            t3_idx += 1
+            code, tier = _draw(pool, english)
+        yield english, code, tier
 
-    return assignments
 
+def assign_codes(words, ledger=None):
+    """
+    Assign ZQX codes to words. Returns dict: english -> (code, tier).
+    Tier-1 words get their existing codes; remaining words get tier-2, then
+    tier-3, then variable-length tier-4 codes in order of appearance.
+    Priority words always get tier-2 (shorter) codes.
 
-def generate_document(assignments, words):
-    """Generate the complete ZQX specification document."""
-
-    # Build sorted vocabulary for the table
-    all_entries = []
-    seen = set()
-    # Add tier-1 entries
-    for code, english in sorted(TIER1.items(), key=lambda x: x[1]):
-        all_entries.append((english, code, 1))
-        seen.add(english)
-    # Add the rest
-    for english, category in words:
-        if english not in seen and english in assignments:
-            seen.add(english)
-            code, tier = assignments[english]
-            all_entries.append((english, code, tier))
-
-    # Sort alphabetically by english word
-    all_entries.sort(key=lambda x: x[0])
-
-    # Count tiers
-    t1_count = sum(1 for _, _, t in all_entries if t == 1)
-    t2_count = sum(1 for _, _, t in all_entries if t == 2)
-    t3_count = sum(1 for _, _, t in all_entries if t == 3)
-    total = len(all_entries)
+    `ledger` (english -> (code, tier), see load_ledger) pins earlier
+    bindings: those words keep their codes, every code in the ledger stays
+    reserved, and only new words draw fresh codes from the pools.
 
-    # --- Build document ---
+    `words` may be any iterable; a one-shot iterator is read into a list
+    first. The whole assignment is held in memory, so vocabularies too
+    large for that must use assign_codes_stream().
+    """
+    if iter(words) is words:
+        words = list(words)
+    return {english: (code, tier) for english, code, tier
+            in assign_codes_stream(words, ledger)}
+
+
+# §8.2 semantic primitives by domain: the building blocks of `:` compositions
+# (rendered in §8.2, searched by agntcl_compose.py).
+PRIMITIVES = [
+    ('Physical properties', (
+        'big', 'small', 'hot', 'cold', 'fast', 'slow', 'hard', 'soft', 'heavy',
+        'light', 'long', 'short', 'wide', 'thin', 'deep', 'flat', 'round',
+        'sharp', 'smooth', 'rough',
+    )),
+    ('Colors', (
+        'red', 'blue', 'green', 'pink', 'black', 'white', 'yellow', 'brown',
+    )),
+    ('Elements', (
+        'water', 'fire', 'air', 'glass', 'stone', 'earth', 'light', 'wood',
+        'metal', 'ice',
+    )),
+    ('Body', (
+        'body', 'face', 'hand', 'eye', 'head', 'arm', 'leg', 'mouth',
+    )),
+    ('Core actions', (
+        'move', 'take', 'break', 'hold', 'open', 'close', 'cut', 'make',
+        'give', 'put', 'build', 'push', 'pull', 'turn', 'throw',
+    )),
+    ('Perception', (
+        'see', 'hear', 'feel', 'think', 'show', 'speak', 'touch', 'watch',
+        'know', 'believe',
+    )),
+    ('States', (
+        'good', 'bad', 'new', 'live', 'full', 'dead', 'old', 'strong', 'weak',
+        'clean',
+    )),
+    ('Spatial', (
+        'above', 'below', 'near', 'far', 'inside', 'outside',
+    )),
+    ('Quantity', (
+        'one', 'many', 'few', 'none', 'all', 'some',
+    )),
+    ('Social', (
+        'love', 'fear', 'help', 'fight', 'friend', 'war',
+    )),
+    ('Abstract', (
+        'time', 'place', 'thing', 'force', 'power', 'way', 'cause', 'change',
+        'end', 'start',
+    )),
+]
+
+
+# ─── Allocation ledger ────────────────────────────────────────────────────────
+# Append-only record of every tier-2/3 binding ever handed out, one
+# "english<TAB>code<TAB>tier" line each. Feeding it back into assign_codes()
+# keeps existing codes stable when words are added to the lists.
+
+LEDGER_HEADER = "# AGNTCL allocation ledger v1 — append-only, do not edit\n"
+
+
+def load_ledger(path):
+    """Read a ledger into english -> (code, tier). Missing file = empty."""
+    ledger = {}
+    codes = {}
+    try:
+        f = open(path)
+    except FileNotFoundError:
+        return ledger
+    with f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip() or line.startswith('#'):
+                continue
+            english, code, tier = line.rstrip('\n').split('\t')
+            if english in ledger or code in codes:
+                raise ValueError(f"{path}:{lineno}: {english!r} -> {code!r} "
+                                 "rebinds an existing ledger entry")
+            ledger[english] = (code, int(tier))
+            codes[code] = english
+    return ledger
+
+
+def append_ledger(path, ledger, assignments):
+    """Append bindings from assignments that the ledger doesn't hold yet.
+
+    Returns the list of (english, code, tier) rows written.
+    """
+    new = [(english, code, tier)
+           for english, (code, tier) in assignments.items()
+           if tier > 1 and english not in ledger]
+    if not new:
+        return new
+    exists = os.path.exists(path)
+    with open(path, 'a') as f:
+        if not exists:
+            f.write(LEDGER_HEADER)
+        for english, code, tier in new:
+            f.write(f"{english}\t{code}\t{tier}\n")
+    return new
+
+
+def load_assignments(ledger_path=None):
+    """assign_codes() for the built-in word list, pinned by the ledger."""
+    if ledger_path is None:
+        ledger_path = os.path.join(OUT_DIR, 'agntcl.ledger')
+    return assign_codes(build_word_list(), ledger=load_ledger(ledger_path))
+
+
+def _section_purpose(ctx):
+    """§1 Purpose (and the document title)."""
     doc = []
 
     doc.append("# ZQX Language Specification v2.0")
@@ -709,17 +830,25 @@ def generate_document(assignments, words):
     doc.append("")
     doc.append("---")
     doc.append("")
+    return doc
+
+
+def _section_encoding(ctx):
+    """§2 Encoding Scheme."""
+    t1_count, t2_count, t3_count, t4_count = ctx.tier_counts()
+    total = t1_count + t2_count + t3_count + t4_count
+    doc = []
 
-    # Section 2: Encoding Scheme
     doc.append("## 2. Encoding Scheme")
     doc.append("")
-    doc.append("Three tiers of codes, assigned by word frequency:")
+    doc.append("Four tiers of codes, assigned by word frequency:")
     doc.append("")
     doc.append("| Tier | Format | Count | Char length | Coverage |")
     doc.append("|------|--------|-------|-------------|----------|")
     doc.append(f"| 1 | Single char `[a-z0-9]` | {t1_count} | 1 | ~55% of text |")
     doc.append(f"| 2 | Two chars `[a-z][a-z]` | {t2_count} | 2 | ~35% of text |")
     doc.append(f"| 3 | Three consonants `[bcdfghjklmnpqrstvwxz]³` | {t3_count} | 3 | ~10% of text |")
+    doc.append(f"| 4 | Four or more consonants `[bcdfghjklmnpqrstvwxz]⁴⁺` | {t4_count} | 4+ | domain vocabularies |")
     doc.append(f"| | **Total** | **{total}** | | |")
     doc.append("")
     doc.append("**Tier rules:**")
@@ -731,6 +860,8 @@ def generate_document(assignments, words):
                "`re`, `sh`, `so`, `to`, `uh`, `um`, `un`, `up`, `us`, `we`, `ye`, `yo`)")
     doc.append("- Tier-3 codes use consonants only (no `a,e,i,o,u,y`) — "
                "no English word can be formed without vowels")
+    doc.append("- Tier-4 codes extend tier-3 to any length, shortest first (160,000 of length 4), "
+               "skipping the few vowelless English spellings (`psst`, `pfft`, `hmmm`, ...)")
     doc.append("- Codes are assigned to avoid phonetic resemblance to their English meanings")
     doc.append("- Remaining rare/domain words not in the 2000: use quoted strings (`\"kubernetes\"`)")
     doc.append("")
@@ -742,6 +873,7 @@ def generate_document(assignments, words):
     doc.append("| 1 digit `[0-9]` | Tier-1 code | `1` → true |")
     doc.append("| 2 letters `[a-z]{2}` | Tier-2 code | `zc` → about |")
     doc.append("| 3 consonants | Tier-3 code | `bcf` → afraid |")
+    doc.append("| 4+ consonants | Tier-4 code | `bcdf` → domain term |")
     doc.append("| 2+ digits | Literal number | `42` → forty-two |")
     doc.append("| `\"...\"` | Literal string | `\"prod\"` → prod |")
     doc.append("| Word + digits | Reference | `kr1` → ref #1 |")
@@ -750,8 +882,13 @@ def generate_document(assignments, words):
     doc.append("")
     doc.append("---")
     doc.append("")
+    return doc
+
+
+def _section_grammar(ctx):
+    """§3 Grammar."""
+    doc = []
 
-    # Section 3: Grammar
     doc.append("## 3. Grammar")
     doc.append("")
     doc.append("Five rules. No exceptions.")
@@ -797,15 +934,30 @@ def generate_document(assignments, words):
     doc.append("")
     doc.append("---")
     doc.append("")
+    return doc
+
+
+def _section_vocabulary(ctx):
+    """§4 Complete Vocabulary."""
+    all_entries = ctx.entries
+    total = len(all_entries)
+    doc = []
 
-    # Section 4: Complete Vocabulary
     doc.append("## 4. Complete Vocabulary")
     doc.append("")
     doc.append(f"**{total} entries** — alphabetical by English word. "
                "Three columns per row for density.")
     doc.append("")
+    doc.extend(vocabulary_table(all_entries))
+    doc.append("")
+    doc.append("---")
+    doc.append("")
+    return doc
+
 
-    # Build 3-column table
+def vocabulary_table(all_entries):
+    """The §4 markdown table, three entries per row."""
+    doc = []
     doc.append("| English | ZQX | T | English | ZQX | T | English | ZQX | T |")
     doc.append("|---------|-----|---|---------|-----|---|---------|-----|---|")
 
@@ -823,12 +975,45 @@ def generate_document(assignments, words):
             else:
                 cols.append("| | | ")
         doc.append("".join(cols) + "|")
+    return doc
 
-    doc.append("")
-    doc.append("---")
-    doc.append("")
 
-    # Section 5: Operations
+def vocabulary_pages(all_entries, fits):
+    """Split the §4 table into alphabetical pages for which fits(text) holds.
+
+    Returns (first_word, text) per page; each page takes as many rows as
+    still fit (binary search on the row count).
+    """
+    def render(entries):
+        return "\n".join([
+            f"## 4. Complete Vocabulary ({entries[0][0]} – {entries[-1][0]})",
+            "",
+            *vocabulary_table(entries),
+            "",
+        ])
+
+    pages = []
+    start = 0
+    while start < len(all_entries):
+        if not fits(render(all_entries[start:start + 3])):
+            raise ValueError("a single vocabulary row exceeds the budget")
+        lo, hi = start + 3, len(all_entries)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if fits(render(all_entries[start:mid])):
+                lo = mid
+            else:
+                hi = mid - 1
+        pages.append((all_entries[start][0], render(all_entries[start:lo])))
+        start = lo
+    return pages
+
+
+def _section_operations(ctx):
+    """§5 Operations."""
+    lk = ctx.lk
+    doc = []
+
     doc.append("## 5. Operations")
     doc.append("")
     doc.append("Structured agent commands use S-expression syntax: `(verb arg ...)`.")
@@ -842,13 +1027,6 @@ def generate_document(assignments, words):
     doc.append("### 5.2 Core Operations")
     doc.append("")
 
-    # Look up specific codes for the operations section
-    def lk(word):
-        """Look up ZQX code for an English word."""
-        if word in assignments:
-            return assignments[word][0]
-        return f'"{word}"'
-
     doc.append("**File I/O:**")
     doc.append("```")
     doc.append(f"({lk('read')} <ref>)                     — read")
@@ -887,8 +1065,14 @@ def generate_document(assignments, words):
     doc.append("")
     doc.append("---")
     doc.append("")
+    return doc
+
+
+def _section_references(ctx):
+    """§6 Reference System."""
+    lk = ctx.lk
+    doc = []
 
-    # Section 6: Reference System
     doc.append("## 6. Reference System")
     doc.append("")
     doc.append("Bind labels with `->` for reuse. References = word + digits.")
@@ -912,8 +1096,14 @@ def generate_document(assignments, words):
     doc.append("")
     doc.append("---")
     doc.append("")
+    return doc
+
+
+def _section_patterns(ctx):
+    """§7 Patterns."""
+    lk = ctx.lk
+    doc = []
 
-    # Section 7: Patterns
     doc.append("## 7. Patterns")
     doc.append("")
     doc.append("### Pattern 1 — Read-Modify-Write")
@@ -952,8 +1142,14 @@ def generate_document(assignments, words):
     doc.append("")
     doc.append("---")
     doc.append("")
+    return doc
+
+
+def _section_composition(ctx):
+    """§8 Semantic Composition."""
+    lk = ctx.lk
+    doc = []
 
-    # Section 8: Semantic Composition
     doc.append("## 8. Semantic Composition")
     doc.append("")
     doc.append("The vocabulary maps common words 1:1. For concepts **outside** the vocabulary,")
@@ -1003,17 +1199,9 @@ def generate_document(assignments, words):
     doc.append("")
     doc.append("| Domain | Count | Examples |")
     doc.append("|--------|-------|---------|")
-    doc.append(f"| Physical properties | 20 | big/`{lk('big')}`, small/`{lk('small')}`, hot/`{lk('hot')}`, cold/`{lk('cold')}`, fast/`{lk('fast')}`, slow/`{lk('slow')}`, hard/`{lk('hard')}`, soft/`{lk('soft')}`, heavy/`{lk('heavy')}`, light/`{lk('light')}`, long/`{lk('long')}`, short/`{lk('short')}`, wide/`{lk('wide')}`, thin/`{lk('thin')}`, deep/`{lk('deep')}`, flat/`{lk('flat')}`, round/`{lk('round')}`, sharp/`{lk('sharp')}`, smooth/`{lk('smooth')}`, rough/`{lk('rough')}` |")
-    doc.append(f"| Colors | 8 | red/`{lk('red')}`, blue/`{lk('blue')}`, green/`{lk('green')}`, pink/`{lk('pink')}`, black/`{lk('black')}`, white/`{lk('white')}`, yellow/`{lk('yellow')}`, brown/`{lk('brown')}` |")
-    doc.append(f"| Elements | 10 | water/`{lk('water')}`, fire/`{lk('fire')}`, air/`{lk('air')}`, glass/`{lk('glass')}`, stone/`{lk('stone')}`, earth/`{lk('earth')}`, light/`{lk('light')}`, wood/`{lk('wood')}`, metal/`{lk('metal')}`, ice/`{lk('ice')}` |")
-    doc.append(f"| Body | 8 | body/`{lk('body')}`, face/`{lk('face')}`, hand/`{lk('hand')}`, eye/`{lk('eye')}`, head/`{lk('head')}`, arm/`{lk('arm')}`, leg/`{lk('leg')}`, mouth/`{lk('mouth')}` |")
-    doc.append(f"| Core actions | 15 | move/`{lk('move')}`, take/`{lk('take')}`, break/`{lk('break')}`, hold/`{lk('hold')}`, open/`{lk('open')}`, close/`{lk('close')}`, cut/`{lk('cut')}`, make/`{lk('make')}`, give/`{lk('give')}`, put/`{lk('put')}`, build/`{lk('build')}`, push/`{lk('push')}`, pull/`{lk('pull')}`, turn/`{lk('turn')}`, throw/`{lk('throw')}` |")
-    doc.append(f"| Perception | 10 | see/`{lk('see')}`, hear/`{lk('hear')}`, feel/`{lk('feel')}`, think/`{lk('think')}`, show/`{lk('show')}`, speak/`{lk('speak')}`, touch/`{lk('touch')}`, watch/`{lk('watch')}`, know/`{lk('know')}`, believe/`{lk('believe')}` |")
-    doc.append(f"| States | 10 | good/`{lk('good')}`, bad/`{lk('bad')}`, new/`{lk('new')}`, live/`{lk('live')}`, full/`{lk('full')}`, dead/`{lk('dead')}`, old/`{lk('old')}`, strong/`{lk('strong')}`, weak/`{lk('weak')}`, clean/`{lk('clean')}` |")
-    doc.append(f"| Spatial | 6 | above/`{lk('above')}`, below/`{lk('below')}`, near/`{lk('near')}`, far/`{lk('far')}`, inside/`{lk('inside')}`, outside/`{lk('outside')}` |")
-    doc.append(f"| Quantity | 6 | one/`{lk('one')}`, many/`{lk('many')}`, few/`{lk('few')}`, none/`{lk('none')}`, all/`{lk('all')}`, some/`{lk('some')}` |")
-    doc.append(f"| Social | 6 | love/`{lk('love')}`, fear/`{lk('fear')}`, help/`{lk('help')}`, fight/`{lk('fight')}`, friend/`{lk('friend')}`, war/`{lk('war')}` |")
-    doc.append(f"| Abstract | 10 | time/`{lk('time')}`, place/`{lk('place')}`, thing/`{lk('thing')}`, force/`{lk('force')}`, power/`{lk('power')}`, way/`{lk('way')}`, cause/`{lk('cause')}`, change/`{lk('change')}`, end/`{lk('end')}`, start/`{lk('start')}` |")
+    for domain, words in PRIMITIVES:
+        examples = ", ".join(f"{w}/`{lk(w)}`" for w in words)
+        doc.append(f"| {domain} | {len(words)} | {examples} |")
     doc.append("")
 
     # §8.3 Intent Frames
@@ -1108,8 +1296,14 @@ def generate_document(assignments, words):
     doc.append("")
     doc.append("---")
     doc.append("")
+    return doc
+
+
+def _section_examples(ctx):
+    """§9 Examples."""
+    lk = ctx.lk
+    doc = []
 
-    # Section 9: Examples (was §8)
     doc.append("## 9. Examples")
     doc.append("")
 
@@ -1200,8 +1394,13 @@ def generate_document(assignments, words):
     doc.append("")
     doc.append("---")
     doc.append("")
+    return doc
+
+
+def _section_bnf(ctx):
+    """§10 Grammar Specification (BNF)."""
+    doc = []
 
-    # Section 10: BNF
     doc.append("## 10. Grammar Specification (BNF)")
     doc.append("")
     doc.append("```bnf")
@@ -1235,6 +1434,7 @@ def generate_document(assignments, words):
     doc.append("<word>         ::= <tier1>")
     doc.append("               |   <tier2>")
     doc.append("               |   <tier3>")
+    doc.append("               |   <tier4>")
     doc.append("               |   <composition>")
     doc.append("               |   <reference>")
     doc.append("")
@@ -1246,6 +1446,8 @@ def generate_document(assignments, words):
     doc.append("")
     doc.append("<tier3>        ::= <consonant>{3}")
     doc.append("")
+    doc.append("<tier4>        ::= <consonant>{4,}    /* excluding vowelless English words */")
+    doc.append("")
     doc.append("<reference>    ::= <word> [0-9]+")
     doc.append("")
     doc.append("<consonant>    ::= [bcdfghjklmnpqrstvwxz]")
@@ -1271,15 +1473,147 @@ def generate_document(assignments, words):
     doc.append("| `?` | Question prefix |")
     doc.append("| `->` | Binding operator |")
     doc.append("| ` ` | Token delimiter |")
+    return doc
+
+
+# Rendering order. Each renderer takes a _DocContext and returns its lines.
+SECTIONS = [
+    ('purpose', _section_purpose),
+    ('encoding', _section_encoding),
+    ('grammar', _section_grammar),
+    ('vocabulary', _section_vocabulary),
+    ('operations', _section_operations),
+    ('references', _section_references),
+    ('patterns', _section_patterns),
+    ('composition', _section_composition),
+    ('examples', _section_examples),
+    ('bnf', _section_bnf),
+]
+
+def vocabulary_entries(assignments, words):
+    """Sorted (english, code, tier) rows for the §4 table."""
+    all_entries = []
+    seen = set()
+    # Add tier-1 entries
+    for code, english in sorted(TIER1.items(), key=lambda x: x[1]):
+        all_entries.append((english, code, 1))
+        seen.add(english)
+    # Add the rest
+    for english, category in words:
+        if english not in seen and english in assignments:
+            seen.add(english)
+            code, tier = assignments[english]
+            all_entries.append((english, code, tier))
+
+    # Sort alphabetically by english word
+    all_entries.sort(key=lambda x: x[0])
+    return all_entries
+
 
-    return "\n".join(doc)
+class _DocContext:
+    """Renderer inputs: the assignments, the word list and the §4 rows."""
+
+    def __init__(self, assignments, words):
+        self.assignments = assignments
+        self.words = words
+        self._entries = None
+
+    def lk(self, word):
+        """Look up ZQX code for an English word."""
+        if word in self.assignments:
+            return self.assignments[word][0]
+        return f'"{word}"'
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = vocabulary_entries(self.assignments, self.words)
+        return self._entries
+
+    def tier_counts(self):
+        entries = self.entries
+        return tuple(sum(1 for _, _, t in entries if t == tier)
+                     for tier in (1, 2, 3, 4))
+
+
+def generate_sections(assignments, words):
+    """Render the specification as a list of (section name, text)."""
+    ctx = _DocContext(assignments, words)
+    return [(name, "\n".join(render(ctx))) for name, render in SECTIONS]
+
+
+def generate_document(assignments, words):
+    """Generate the complete ZQX specification document."""
+    return "\n".join(text for _, text in generate_sections(assignments, words))
+
+
+# ─── Build cache ──────────────────────────────────────────────────────────────
+# Rendering every section takes a few milliseconds; what makes a rebuild
+# slow is the derived output. The codebook's perfect hash (about a second)
+# depends only on the assignments, and the site's paging and compression
+# only on the rendered text. The cache records the assignment digest the
+# codebook was built from and, per piece of content, its gzip size and
+# compressed forms, so a small edit redoes only the affected pieces.
+
+BUILD_CACHE = os.path.join(OUT_DIR, '.zqx.cache')
+BUILD_CACHE_VERSION = 1
+
+
+def load_build_cache(path=BUILD_CACHE):
+    try:
+        with open(path, 'rb') as f:
+            version, cache = marshal.loads(f.read())
+        if version == BUILD_CACHE_VERSION and isinstance(cache, dict):
+            return cache
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    return {}
+
+
+def save_build_cache(cache, path=BUILD_CACHE):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            marshal.dump((BUILD_CACHE_VERSION, cache), f)
+        os.replace(tmp, path)
+    except OSError:
+        pass                    # read-only checkout: rebuild in full next time
+
+
+def assignments_digest(assignments):
+    h = hashlib.sha256()
+    for english, (code, tier) in sorted(assignments.items()):
+        h.update(f"{english}\t{code}\t{tier}\n".encode())
+    return h.hexdigest()
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def codebook_current(path, assignments, cache):
+    """Whether the codebook at path was built from these assignments."""
+    entry = cache.get('codebook')
+    return (entry is not None and _file_stamp(path) is not None
+            and entry == (assignments_digest(assignments), _file_stamp(path)))
 
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET,
+                        help='max gzipped bytes per page of the site build')
+    args = parser.parse_args()
+
     words = build_word_list()
-    assignments = assign_codes(words)
+    ledger_path = os.path.join(OUT_DIR, 'agntcl.ledger')
+    ledger = load_ledger(ledger_path)
+    assignments = assign_codes(words, ledger=ledger)
 
     # Stats
     tier1_words = set(TIER1.values())
@@ -1295,6 +1629,10 @@ def main():
     print(f"Total mapped: {total}")
     print(f"Total assignments: {len(assignments)}")
 
+    # Pin every new binding so later word-list edits can't shift it
+    new = append_ledger(ledger_path, ledger, assignments)
+    print(f"New ledger bindings: {len(new)}")
+
     # Verify no code collisions
     code_to_word = {}
     for eng, (code, tier) in assignments.items():
@@ -1308,14 +1646,46 @@ def main():
             print(f"BAD TIER-2: {code} is an English word")
 
     # Generate document
-    document = generate_document(assignments, words)
+    sections = generate_sections(assignments, words)
+    document = "\n".join(text for _, text in sections)
 
     # Write to file
-    with open('/Users/tgriek/dev/t1m/zqx.md', 'w') as f:
+    with open(os.path.join(OUT_DIR, 'zqx.md'), 'w') as f:
         f.write(document)
 
     print(f"\nWritten to zqx.md ({len(document)} chars)")
 
+    # Binary codebook for worker processes (see agntcl_codebook.py)
+    cache = load_build_cache()
+    codebook = os.path.join(OUT_DIR, 'agntcl.codebook')
+    if codebook_current(codebook, assignments, cache):
+        print("agntcl.codebook is up to date")
+    else:
+        size = write_codebook(codebook, assignments)
+        cache['codebook'] = (assignments_digest(assignments),
+                             _file_stamp(codebook))
+        print(f"Written to agntcl.codebook ({size} bytes)")
+
+    # Frozen maps for short-lived tools (see agntcl_snapshot.py)
+    size = write_snapshot(assignments)
+    print(f"Written to agntcl.snapshot ({size} chars)")
+
+    # Paged, precompressed site: agents fetch only the pages they need
+    entries = vocabulary_entries(assignments, words)
+    try:
+        manifest = build_site(
+            os.path.join(OUT_DIR, 'site'), sections, assignments, args.budget,
+            splitters={'vocabulary':
+                       lambda fits: vocabulary_pages(entries, fits)},
+            cache=cache.setdefault('site', {}))
+    except ValueError as exc:
+        sys.exit(f"site build failed: {exc}")
+    save_build_cache(cache)
+    pages = sorted(p for p in manifest if p.endswith('.md'))
+    largest = max(manifest[p + '.gz']['bytes'] for p in pages)
+    print(f"Written to site/ ({len(pages)} pages, largest "
+          f"{largest} bytes gzipped, budget {args.budget})")
+
 
 if __name__ == '__main__':
     main()